@@ -0,0 +1,64 @@
+"""
+Measure how parse_git_diff_incremental's cost follows the changed part of a diff.
+
+Parses a synthetic diff once, then re-parses versions of it in which 0%, 1%, 10%,
+50% and 100% of the file sections were edited, comparing against a full parse:
+
+    python benchmarks/bench_incremental.py [--files N] [--changed 0 1 10 50 100]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
+from gitdiffstats.diffstats import parse_git_diff
+from gitdiffstats.incremental import parse_git_diff_incremental
+
+from synthetic import generate_diff
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def edit_sections(text: str, percent: float, seed: int = 0) -> str:
+    """Return text with the first context line of `percent`% of its files turned into an added line."""
+    sections = text.split("\ndiff --git ")
+    rng = random.Random(seed)
+    chosen = rng.sample(range(len(sections)), round(len(sections) * percent / 100))
+    for i in chosen:
+        # The hunk header's counts no longer match, which the parser tolerates
+        head, sep, tail = sections[i].partition("\n ")
+        if sep:
+            sections[i] = head + "\n+" + tail
+    return "\ndiff --git ".join(sections)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--files', type=int, default=4000)
+    parser.add_argument('--changed', type=float, nargs='+', default=[0, 1, 10, 50, 100],
+                        help="percentages of file sections to edit")
+    parser.add_argument('--detail', default='full')
+    args = parser.parse_args()
+
+    text = generate_diff(files=args.files, hunks_per_file=4, lines_per_hunk=30, seed=7)
+    print(f"input: {args.files:,} files, {len(text) / 2 ** 20:.1f} MiB, detail={args.detail}")
+    previous, elapsed = timed(parse_git_diff_incremental, text, detail=args.detail)
+    print(f"first parse       {elapsed:6.3f}s")
+
+    for percent in args.changed:
+        edited = edit_sections(text, percent)
+        expected, full = timed(parse_git_diff, edited, args.detail)
+        current, incremental = timed(parse_git_diff_incremental, edited, previous, detail=args.detail)
+        assert current.result == expected, "incremental result differs from a full parse"
+        print(f"{percent:5.1f}% changed  {incremental:6.3f}s  ({current.parsed:,} of {current.sections:,} "
+              f"sections parsed)  full parse {full:6.3f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Compare parse_git_diff (nested dicts) with parse_git_diff_compact (__slots__/array model).
+
+Reports parse time and tracemalloc peak for a synthetic diff of about a million lines:
+
+    python benchmarks/bench_model.py [--lines N]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
+from gitdiffstats.diffstats import parse_git_diff, parse_git_diff_compact
+
+from synthetic import generate_diff
+
+
+def make_diff(total_lines: int, seed: int = 0) -> str:
+    """A diff of roughly total_lines lines: files with 20 hunks of 30 lines each."""
+    lines_per_file = 4 + 20 * 31
+    return generate_diff(files=max(1, total_lines // lines_per_file), hunks_per_file=20,
+                         lines_per_hunk=30, seed=seed)
+
+
+def measure(func, text):
+    """Return (seconds, peak bytes, retained bytes); timing is taken without tracemalloc."""
+    start = time.perf_counter()
+    result = func(text)
+    elapsed = time.perf_counter() - start
+    del result
+
+    tracemalloc.start()
+    result = func(text)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return elapsed, peak, retained
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--lines', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    text = make_diff(args.lines)
+    print(f"input: {text.count(chr(10)):,} lines, {len(text) / 2 ** 20:.1f} MiB")
+
+    for name, func in (("dict", parse_git_diff), ("compact", parse_git_diff_compact)):
+        elapsed, peak, retained = measure(func, text)
+        print(f"{name:8s} time {elapsed:6.2f}s  peak {peak / 2 ** 20:8.1f} MiB  "
+              f"result {retained / 2 ** 20:8.1f} MiB")
+
+
+if __name__ == '__main__':
+    main()
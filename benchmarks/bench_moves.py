@@ -0,0 +1,61 @@
+"""
+Measure how detect_moves scales with the number of changed lines.
+
+Builds diffs in which blocks of code are moved between files, with some edited
+lines mixed in, and times the move detection on them:
+
+    python benchmarks/bench_moves.py [--lines 10000 100000 400000] [--k 3]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
+from gitdiffstats.diffstats import parse_git_diff_compact
+from gitdiffstats.moves import detect_moves
+
+
+def file_section(path: str, removed, added) -> str:
+    lines = [f"diff --git a/{path} b/{path}", f"--- a/{path}", f"+++ b/{path}",
+             f"@@ -1,{len(removed)} +1,{len(added)} @@"]
+    lines.extend(f"-{line}" for line in removed)
+    lines.extend(f"+{line}" for line in added)
+    return "\n".join(lines) + "\n"
+
+
+def moved_code_diff(lines: int, block: int = 200, edited: float = 0.1, seed: int = 0) -> str:
+    """Return a diff removing `lines` lines from old files and adding them, shuffled by block, to new ones."""
+    rng = random.Random(seed)
+    code = [f"{' ' * rng.choice((0, 4, 8))}value_{i} = compute({rng.random():.6f})" for i in range(lines)]
+    blocks = [code[i:i + block] for i in range(0, lines, block)]
+    moved = []
+    for lines_of_block in blocks:
+        # Re-indent the block and edit some of its lines, as a refactoring would
+        moved.append([f"    {line}" if rng.random() >= edited else f"{line}  # edited"
+                      for line in lines_of_block])
+    rng.shuffle(moved)
+    return ("".join(file_section(f"old/{i}.py", lines_of_block, []) for i, lines_of_block in enumerate(blocks))
+            + "".join(file_section(f"new/{i}.py", [], lines_of_block) for i, lines_of_block in enumerate(moved)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--lines', type=int, nargs='+', default=[10_000, 100_000, 400_000],
+                        help="lines moved per diff")
+    parser.add_argument('--k', type=int, default=3)
+    args = parser.parse_args()
+
+    for lines in args.lines:
+        result = parse_git_diff_compact(moved_code_diff(lines))
+        start = time.perf_counter()
+        moves = detect_moves(result, k=args.k)
+        elapsed = time.perf_counter() - start
+        changed = result.total_lines_added + result.total_lines_removed
+        print(f"{changed:>9,} changed lines  {elapsed:6.3f}s  ({elapsed / changed * 1e6:5.2f} us/line)  "
+              f"{moves['moved_lines']:,} moved in {len(moves['blocks']):,} blocks")
+
+
+if __name__ == '__main__':
+    main()
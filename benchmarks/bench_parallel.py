@@ -0,0 +1,54 @@
+"""
+Measure how parse_git_diff_parallel scales with the number of workers.
+
+Parses a synthetic diff with thousands of files serially and with 1, 4, 8 and 16
+process workers, both from a string and from a file on disk:
+
+    python benchmarks/bench_parallel.py [--lines N] [--workers 1 4 8 16]
+"""
+import argparse
+import os
+import pathlib
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
+from gitdiffstats.diffstats import parse_git_diff
+from gitdiffstats.parallel import parse_git_diff_parallel
+
+from bench_model import make_diff
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--lines', type=int, default=2_000_000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8, 16])
+    parser.add_argument('--detail', default='files')
+    args = parser.parse_args()
+
+    text = make_diff(args.lines)
+    print(f"input: {text.count('diff --git'):,} files, {len(text) / 2 ** 20:.1f} MiB, "
+          f"{os.cpu_count()} CPUs, detail={args.detail}")
+
+    expected, serial = timed(parse_git_diff, text, args.detail)
+    print(f"serial           {serial:6.2f}s")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = pathlib.Path(tmpdir, 'bench.diff')
+        path.write_text(text)
+        for workers in args.workers:
+            for label, source in (("str", text), ("file", path)):
+                result, elapsed = timed(parse_git_diff_parallel, source, workers=workers, detail=args.detail)
+                assert result == expected, "parallel result differs from serial"
+                print(f"{workers:3d} workers {label:4s} {elapsed:6.2f}s  speedup {serial / elapsed:5.2f}x")
+
+
+if __name__ == '__main__':
+    main()
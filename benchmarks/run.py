@@ -0,0 +1,220 @@
+"""
+Benchmark runner with stored baselines and regression thresholds.
+
+Parses synthetic diffs (see synthetic.py) with several parser entry points and
+reports throughput in MB/s and lines/s, plus peak memory from tracemalloc:
+
+    python benchmarks/run.py                              # print results
+    python benchmarks/run.py --save baseline.json         # store a baseline
+    python benchmarks/run.py --compare baseline.json      # exit 1 on regressions
+    python benchmarks/run.py --compare baseline.json --threshold 0.25 --case mixed
+
+With --profile the timed runs are skipped; each case is parsed once with
+instrumentation instead:
+
+    python benchmarks/run.py --profile stats              # line classes, phase times
+    python benchmarks/run.py --profile cprofile --parser dict-full
+    python benchmarks/run.py --profile tracemalloc --case large-hunks
+"""
+import argparse
+import cProfile
+import json
+import os
+import platform
+import pstats
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
+from gitdiffstats.diffstats import parse_git_diff, parse_git_diff_compact
+from gitdiffstats.profiling import parse_git_diff_with_stats
+
+from synthetic import generate_diff
+
+# Synthetic inputs, scaled by --scale through the number of files
+CASES = {
+    'many-small-files': dict(files=4000, hunks_per_file=2, lines_per_hunk=8, seed=1),
+    'large-hunks': dict(files=40, hunks_per_file=20, lines_per_hunk=400, seed=2),
+    'mixed': dict(files=600, hunks_per_file=6, lines_per_hunk=30, tab_ratio=0.1,
+                  trailing_space_ratio=0.1, new_file_ratio=0.1, deleted_file_ratio=0.05, seed=3),
+}
+
+# Parser entry points; each takes the diff as str and as bytes
+PARSERS = {
+    'dict-full': lambda text, data: parse_git_diff(text),
+    'dict-files': lambda text, data: parse_git_diff(text, detail='files'),
+    'compact-full': lambda text, data: parse_git_diff_compact(text),
+    'bytes-full': lambda text, data: parse_git_diff_compact(data),
+    'bytes-totals': lambda text, data: parse_git_diff_compact(data, detail='totals'),
+}
+
+DEFAULT_THRESHOLD = 0.15
+
+PROFILE_MODES = ('stats', 'cprofile', 'tracemalloc')
+
+
+def scaled(case: Dict, scale: float) -> Dict:
+    params = dict(case)
+    params['files'] = max(1, int(params['files'] * scale))
+    return params
+
+
+def measure(parse: Callable, text: str, data: bytes, repeat: int) -> Dict:
+    """Time parse (best of `repeat`) and measure its peak memory in a separate traced run."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = parse(text, data)
+        best = min(best, time.perf_counter() - start)
+        del result
+
+    tracemalloc.start()
+    result = parse(text, data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+
+    lines = text.count('\n')
+    return {
+        'seconds': best,
+        'mb_per_s': len(data) / best / 1e6,
+        'lines_per_s': lines / best,
+        'peak_bytes': peak,
+    }
+
+
+def run(case_names: List[str], parser_names: List[str], scale: float = 1.0, repeat: int = 3) -> Dict:
+    results = {}
+    for case_name in case_names:
+        text = generate_diff(**scaled(CASES[case_name], scale))
+        data = text.encode('utf-8')
+        for parser_name in parser_names:
+            results[f"{case_name}/{parser_name}"] = measure(PARSERS[parser_name], text, data, repeat)
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'machine': platform.machine(),
+            'scale': scale,
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+def compare(baseline: Dict, current: Dict, threshold: float = DEFAULT_THRESHOLD) -> List[str]:
+    """
+    Return a message for every benchmark that regressed beyond threshold.
+
+    Throughput may drop and peak memory may grow by at most `threshold` (a fraction)
+    relative to the baseline. Benchmarks missing from either side are ignored.
+    """
+    regressions = []
+    for name, now in current['results'].items():
+        before = baseline['results'].get(name)
+        if before is None:
+            continue
+        if now['mb_per_s'] < before['mb_per_s'] * (1 - threshold):
+            regressions.append(f"{name}: throughput {now['mb_per_s']:.2f} MB/s < "
+                               f"baseline {before['mb_per_s']:.2f} MB/s")
+        if now['peak_bytes'] > before['peak_bytes'] * (1 + threshold):
+            regressions.append(f"{name}: peak memory {now['peak_bytes'] / 2 ** 20:.1f} MiB > "
+                               f"baseline {before['peak_bytes'] / 2 ** 20:.1f} MiB")
+    return regressions
+
+
+def report(results: Dict, baseline: Dict = None) -> None:
+    print(f"{'benchmark':32s} {'MB/s':>8s} {'lines/s':>12s} {'peak MiB':>9s}")
+    for name, res in results['results'].items():
+        line = (f"{name:32s} {res['mb_per_s']:8.2f} {res['lines_per_s']:12,.0f} "
+                f"{res['peak_bytes'] / 2 ** 20:9.1f}")
+        before = baseline and baseline['results'].get(name)
+        if before:
+            line += f"  ({res['mb_per_s'] / before['mb_per_s'] - 1:+.0%} MB/s vs baseline)"
+        print(line)
+
+
+def _snapshot_holding(result) -> tracemalloc.Snapshot:
+    """Take a tracemalloc snapshot while result is still referenced, so its memory is counted."""
+    return tracemalloc.take_snapshot()
+
+
+def profile(case_names: List[str], parser_names: List[str], modes: List[str],
+            scale: float = 1.0, top: int = 20) -> None:
+    """
+    Print where each case spends its time instead of timing it.
+
+    "stats" reports parse_git_diff_with_stats' line classes, phase times and largest
+    files per case; "cprofile" and "tracemalloc" run each parser once under the
+    respective tool and print the `top` functions by cumulative time or the `top`
+    source lines by allocated memory.
+    """
+    for case_name in case_names:
+        text = generate_diff(**scaled(CASES[case_name], scale))
+        data = text.encode('utf-8')
+        if 'stats' in modes:
+            _, stats = parse_git_diff_with_stats(text, top=5)
+            print(f"== {case_name}: parse_git_diff_with_stats")
+            print(stats.format())
+        for parser_name in parser_names:
+            parse = PARSERS[parser_name]
+            if 'cprofile' in modes:
+                print(f"== {case_name}/{parser_name}: cProfile")
+                profiler = cProfile.Profile()
+                profiler.runcall(parse, text, data)
+                pstats.Stats(profiler, stream=sys.stdout).sort_stats('cumulative').print_stats(top)
+            if 'tracemalloc' in modes:
+                print(f"== {case_name}/{parser_name}: tracemalloc")
+                tracemalloc.start()
+                snapshot = _snapshot_holding(parse(text, data))
+                tracemalloc.stop()
+                for stat in snapshot.statistics('lineno')[:top]:
+                    print(f"  {stat}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--case', dest='cases', action='append', choices=sorted(CASES),
+                        help="run only this case (repeatable)")
+    parser.add_argument('--parser', dest='parsers', action='append', choices=sorted(PARSERS),
+                        help="run only this parser (repeatable)")
+    parser.add_argument('--scale', type=float, default=1.0, help="multiply the number of files per case")
+    parser.add_argument('--repeat', type=int, default=3, help="timed runs per benchmark, best is kept")
+    parser.add_argument('--save', metavar='PATH', help="write results as JSON")
+    parser.add_argument('--compare', metavar='PATH', help="baseline JSON to check for regressions")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed relative regression (default: %(default)s)")
+    parser.add_argument('--profile', dest='profile_modes', action='append', choices=PROFILE_MODES,
+                        help="profile each case once instead of timing it (repeatable)")
+    parser.add_argument('--top', type=int, default=20, help="entries per --profile report")
+    args = parser.parse_args(argv)
+
+    if args.profile_modes:
+        profile(args.cases or list(CASES), args.parsers or list(PARSERS), args.profile_modes,
+                args.scale, args.top)
+        return 0
+
+    results = run(args.cases or list(CASES), args.parsers or list(PARSERS), args.scale, args.repeat)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    report(results, baseline)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if baseline is not None:
+        regressions = compare(baseline, results, args.threshold)
+        for message in regressions:
+            print(f"REGRESSION {message}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
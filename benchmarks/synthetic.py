@@ -0,0 +1,101 @@
+"""
+Reproducible synthetic git diffs for benchmarks and tests.
+
+The same arguments (including the seed) always produce the same diff. Hunk
+headers are consistent with the lines they contain.
+"""
+import random
+import string
+from typing import Iterator
+
+_WORDS = string.ascii_lowercase + string.digits + "_"
+
+
+def _content(rng: random.Random, length: int, tab_ratio: float, trailing_space_ratio: float) -> str:
+    indent = "\t" if rng.random() < tab_ratio else "    " * rng.randint(0, 3)
+    body = "".join(rng.choice(_WORDS) for _ in range(max(1, length - len(indent))))
+    if rng.random() < trailing_space_ratio:
+        body += " " * rng.randint(1, 3)
+    return indent + body
+
+
+def iter_diff_lines(files: int = 100, hunks_per_file: int = 5, lines_per_hunk: int = 20,
+                    line_length: int = 60, add_ratio: float = 0.25, remove_ratio: float = 0.25,
+                    context_ratio: float = 0.5, tab_ratio: float = 0.0, trailing_space_ratio: float = 0.0,
+                    new_file_ratio: float = 0.0, deleted_file_ratio: float = 0.0,
+                    seed: int = 0) -> Iterator[str]:
+    """
+    Yield the lines (without terminators) of a synthetic git diff.
+
+    Args:
+        files (int): Number of file sections.
+        hunks_per_file (int): Hunks per modified file. Added and deleted files have one hunk.
+        lines_per_hunk (int): Changed and context lines per hunk.
+        line_length (int): Approximate length of each content line.
+        add_ratio, remove_ratio, context_ratio (float): Relative weights of added, removed
+            and context lines in modified files.
+        tab_ratio (float): Share of content lines indented with a tab, and of file headers
+            whose paths are followed by a tab.
+        trailing_space_ratio (float): Share of content lines and file headers with trailing spaces.
+        new_file_ratio (float): Share of files that are newly added.
+        deleted_file_ratio (float): Share of files that are deleted.
+        seed (int): Random seed.
+    """
+    rng = random.Random(seed)
+    weights = (add_ratio, remove_ratio, context_ratio)
+
+    for file_no in range(files):
+        path = f"src/pkg_{file_no % 17}/module_{file_no}.py"
+        suffix = ""
+        if rng.random() < tab_ratio:
+            suffix = "\t"
+        elif rng.random() < trailing_space_ratio:
+            suffix = "  "
+
+        kind = rng.random()
+        if kind < new_file_ratio:
+            count = hunks_per_file * lines_per_hunk
+            yield f"diff --git a/{path}{suffix} b/{path}{suffix}"
+            yield "new file mode 100644"
+            yield "index 0000000..1111111"
+            yield "--- /dev/null"
+            yield f"+++ b/{path}{suffix}"
+            yield f"@@ -0,0 +1,{count} @@"
+            for _ in range(count):
+                yield "+" + _content(rng, line_length, tab_ratio, trailing_space_ratio)
+            continue
+
+        if kind < new_file_ratio + deleted_file_ratio:
+            count = hunks_per_file * lines_per_hunk
+            yield f"diff --git a/{path}{suffix} b/{path}{suffix}"
+            yield "deleted file mode 100644"
+            yield "index 1111111..0000000"
+            yield f"--- a/{path}{suffix}"
+            yield "+++ /dev/null"
+            yield f"@@ -1,{count} +0,0 @@"
+            for _ in range(count):
+                yield "-" + _content(rng, line_length, tab_ratio, trailing_space_ratio)
+            continue
+
+        yield f"diff --git a/{path}{suffix} b/{path}{suffix}"
+        yield "index 1111111..2222222 100644"
+        yield f"--- a/{path}{suffix}"
+        yield f"+++ b/{path}{suffix}"
+        old_line = new_line = 1
+        for hunk_no in range(hunks_per_file):
+            gap = rng.randint(3, 40)
+            old_line += gap
+            new_line += gap
+            kinds = rng.choices("+- ", weights=weights, k=lines_per_hunk)
+            old_count = kinds.count("-") + kinds.count(" ")
+            new_count = kinds.count("+") + kinds.count(" ")
+            yield f"@@ -{old_line},{old_count} +{new_line},{new_count} @@ def function_{hunk_no}():"
+            for prefix in kinds:
+                yield prefix + _content(rng, line_length, tab_ratio, trailing_space_ratio)
+            old_line += old_count
+            new_line += new_count
+
+
+def generate_diff(**kwargs) -> str:
+    """Return a synthetic git diff as one string; see iter_diff_lines for the arguments."""
+    return "\n".join(iter_diff_lines(**kwargs)) + "\n"
@@ -0,0 +1,135 @@
+import asyncio
+import os
+import subprocess
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from .cache import DiffCache
+from .diffstats import DETAIL_FULL, DiffParser, _result_dict
+
+# Bytes requested from git's stdout per read
+_READ_SIZE = 64 * 1024
+
+
+def _git_diff_command(repo_path: Union[str, os.PathLike], rev_range: Union[str, Sequence[str], None],
+                      git_args: Sequence[str], git: str) -> List[str]:
+    # Keep the output parseable regardless of the user's git configuration:
+    # no colors, no external diff drivers and UTF-8 paths left unquoted.
+    command = [git, '-C', os.fspath(repo_path), '-c', 'core.quotePath=false',
+               'diff', '--no-color', '--no-ext-diff', *git_args]
+    if isinstance(rev_range, str):
+        command.append(rev_range)
+    elif rev_range is not None:
+        command.extend(rev_range)
+    command.append('--')
+    return command
+
+
+# Options that make `git diff` depend on the index or working tree, not just on commits
+_UNCACHEABLE_ARGS = ('--cached', '--staged', '--no-index')
+
+
+async def _resolve_revisions(repo_path: Union[str, os.PathLike], rev_range: Union[str, Sequence[str]],
+                             git: str) -> List[str]:
+    """Resolve a revision range to commit ids (e.g. "a..b" -> [b_sha, "^" + a_sha])."""
+    revs = [rev_range] if isinstance(rev_range, str) else list(rev_range)
+    command = [git, '-C', os.fspath(repo_path), 'rev-parse', *revs, '--']
+    process = await asyncio.create_subprocess_exec(
+        *command, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    stdout, stderr = await process.communicate()
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, command, stdout, stderr)
+    return [line for line in stdout.decode('utf-8', errors='replace').splitlines() if line != '--']
+
+
+async def diff_stats(repo_path: Union[str, os.PathLike], rev_range: Union[str, Sequence[str], None] = None,
+                     detail: str = DETAIL_FULL, git_args: Sequence[str] = (), git: str = 'git',
+                     read_size: int = _READ_SIZE, cache: Optional[DiffCache] = None) -> Dict:
+    """
+    Run `git diff` in a repository and parse its output while it is being produced.
+
+    Args:
+        repo_path (Union[str, os.PathLike]): Path of the git repository.
+        rev_range (Union[str, Sequence[str], None]): Revisions to diff, e.g. "main...feature" or
+            ["v1.0", "v1.1"]. None diffs the working tree against the index.
+        detail (str): How much to materialize: "totals", "files", "hunks" or "full".
+        git_args (Sequence[str]): Extra options for `git diff`, e.g. ["-U0"] or ["--cached"].
+        git (str): The git executable.
+        read_size (int): Bytes read from git's stdout at a time.
+        cache (Optional[DiffCache]): Cache results keyed by the repository and the commit ids
+            rev_range resolves to. Only diffs between two or more revisions are cached, since
+            anything involving the index or working tree can change without new commits.
+
+    Returns:
+        Dict: The same shape of dictionary as parse_git_diff.
+
+    Raises:
+        subprocess.CalledProcessError: If git exits with a non-zero status.
+    """
+    key = None
+    if cache is not None and rev_range is not None and not any(
+            arg.startswith(_UNCACHEABLE_ARGS) for arg in git_args):
+        revisions = await _resolve_revisions(repo_path, rev_range, git)
+        if len(revisions) >= 2:
+            key = cache.key_for_revisions(repo_path, revisions, detail, git_args)
+            result = cache.get(key)
+            if result is not None:
+                return result
+
+    command = _git_diff_command(repo_path, rev_range, git_args, git)
+
+    files_stats = {}
+
+    def on_file(record):
+        files_stats[record.path] = record.to_dict()
+
+    parser = DiffParser(detail, on_file=on_file)
+    process = await asyncio.create_subprocess_exec(
+        *command, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        # Drain stderr alongside stdout so a chatty git cannot block on a full pipe
+        stderr_task = asyncio.ensure_future(process.stderr.read())
+        while True:
+            chunk = await process.stdout.read(read_size)
+            if not chunk:
+                break
+            parser.feed(chunk)
+        stderr = await stderr_task
+        returncode = await process.wait()
+    finally:
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, command, stderr=stderr)
+
+    totals = parser.close()
+    result = _result_dict(totals.total_files_changed, totals.total_lines_added, totals.total_lines_removed, files_stats)
+    if key is not None:
+        cache.put(key, result)
+    return result
+
+
+async def diff_stats_many(jobs: Iterable[Tuple[Union[str, os.PathLike], Union[str, Sequence[str], None]]],
+                          concurrency: int = 8, return_exceptions: bool = False, **kwargs) -> List:
+    """
+    Run diff_stats for many (repo_path, rev_range) pairs with at most `concurrency` git processes.
+
+    Args:
+        jobs (Iterable[Tuple]): (repo_path, rev_range) pairs.
+        concurrency (int): Maximum number of git processes running at once.
+        return_exceptions (bool): Return exceptions in place of failed results instead of raising,
+            as with asyncio.gather.
+        **kwargs: Passed on to diff_stats (detail, git_args, ...).
+
+    Returns:
+        List: One result per job, in the order of jobs.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(repo_path, rev_range):
+        async with semaphore:
+            return await diff_stats(repo_path, rev_range, **kwargs)
+
+    return await asyncio.gather(*(run(repo_path, rev_range) for repo_path, rev_range in jobs),
+                                return_exceptions=return_exceptions)
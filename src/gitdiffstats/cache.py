@@ -0,0 +1,167 @@
+import hashlib
+import json
+import os
+import zlib
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Union
+
+from .diffstats import DETAIL_FULL, _detail_level, parse_git_diff
+
+# Bytes hashed at a time, so hashing a str never encodes all of it at once
+_HASH_BLOCK = 1 << 20
+
+
+def _estimate_size(result: Dict) -> int:
+    """Rough number of bytes a parse_git_diff result occupies in memory."""
+    size = 400
+    for path, file_stats in result['files'].items():
+        size += 400 + len(path)
+        for hunk in file_stats['hunks']:
+            size += 500 + len(hunk['header'])
+            for change in hunk['changes']:
+                size += 300 + len(change['content'])
+    return size
+
+
+class DiffCache:
+    """
+    Content-addressed cache of parse_git_diff results.
+
+    Entries live in an in-memory LRU bounded by entry count and (estimated)
+    bytes. With a directory, every entry is also written there as
+    zlib-compressed JSON and memory misses fall back to it, so results survive
+    restarts and can be shared between processes.
+
+    Cached results are shared between callers and must be treated as read-only.
+
+    Attributes:
+        hits (int): Lookups answered from memory.
+        disk_hits (int): Lookups answered from the directory.
+        misses (int): Lookups not found anywhere.
+        evictions (int): Entries dropped from memory to respect the bounds.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 256 * 1024 * 1024,
+                 directory: Optional[Union[str, os.PathLike]] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.directory = None if directory is None else os.fspath(directory)
+        if self.directory is not None:
+            os.makedirs(self.directory, exist_ok=True)
+
+        self._entries = OrderedDict()  # key -> (result, size)
+        self.current_bytes = 0
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key_for_text(diff_text: Union[str, bytes], detail: str = DETAIL_FULL) -> str:
+        """Return the cache key for parsing diff_text at the given detail level."""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"text\0{detail}\0".encode('ascii'))
+        if isinstance(diff_text, str):
+            for start in range(0, len(diff_text), _HASH_BLOCK):
+                digest.update(diff_text[start:start + _HASH_BLOCK].encode('utf-8', errors='surrogatepass'))
+        else:
+            digest.update(diff_text)
+        return digest.hexdigest()
+
+    @staticmethod
+    def key_for_revisions(repo_path: Union[str, os.PathLike], revisions: Iterable[str],
+                          detail: str = DETAIL_FULL, git_args: Iterable[str] = ()) -> str:
+        """Return the cache key for a diff between resolved revisions (commit ids) of a repository."""
+        parts = ["revs", os.path.abspath(os.fspath(repo_path)), detail, *git_args, "\0", *revisions]
+        return hashlib.blake2b("\0".join(parts).encode('utf-8'), digest_size=16).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + '.json.z')
+
+    def _remember(self, key: str, result: Dict) -> None:
+        size = _estimate_size(result)
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self.current_bytes -= self._entries.pop(key)[1]
+        self._entries[key] = (result, size)
+        self.current_bytes += size
+        while len(self._entries) > self.max_entries or self.current_bytes > self.max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self.current_bytes -= evicted_size
+            self.evictions += 1
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return the cached result for key, or None."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+        if self.directory is not None:
+            try:
+                with open(self._path(key), 'rb') as f:
+                    result = json.loads(zlib.decompress(f.read()))
+            except (OSError, ValueError, zlib.error):
+                pass
+            else:
+                self.disk_hits += 1
+                self._remember(key, result)
+                return result
+
+        self.misses += 1
+        return None
+
+    def put(self, key: str, result: Dict) -> None:
+        """Store result under key in memory and, if configured, on disk."""
+        self._remember(key, result)
+        if self.directory is not None:
+            path = self._path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            data = zlib.compress(json.dumps(result, separators=(',', ':')).encode('utf-8'))
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+    def parse(self, diff_text: Union[str, bytes], detail: str = DETAIL_FULL) -> Dict:
+        """
+        parse_git_diff with caching keyed by a hash of diff_text.
+
+        Args:
+            diff_text (Union[str, bytes]): A string or bytes-like object containing the git diff.
+            detail (str): How much to materialize: "totals", "files", "hunks" or "full".
+
+        Returns:
+            Dict: The (possibly shared) result of parse_git_diff.
+        """
+        _detail_level(detail)
+        if diff_text is None:
+            diff_text = ""
+        key = self.key_for_text(diff_text, detail)
+        result = self.get(key)
+        if result is None:
+            result = parse_git_diff(diff_text, detail)
+            self.put(key, result)
+        return result
+
+    def clear(self) -> None:
+        """Drop all in-memory entries (the directory is left untouched)."""
+        self._entries.clear()
+        self.current_bytes = 0
+
+    def stats(self) -> Dict:
+        """Return the counters and current size, for sizing the cache."""
+        return {
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(self._entries),
+            'bytes': self.current_bytes,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
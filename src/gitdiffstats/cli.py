@@ -0,0 +1,239 @@
+"""
+gitdiffstats: print the statistics of git diffs read from stdin or files.
+
+    git diff main... | gitdiffstats                        # JSON Lines, one per file + totals
+    gitdiffstats --stats-only nightly.diff                 # only the totals
+    gitdiffstats --format tsv --exclude '*.lock' a.diff b.diff --workers 4
+"""
+import argparse
+import json
+import mmap
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, TextIO, Tuple, Union
+
+from .diffstats import (DETAIL_FILES, DETAIL_FULL, DETAIL_HUNKS, DETAIL_TOTALS, _iter_buffer_records,
+                        _strip_bounds, iter_git_diff)
+from .filters import FileFilter
+from .model import DiffTotals, FileDiff
+
+FORMATS = ('jsonl', 'json', 'tsv')
+
+# Name of the standard input in the list of inputs
+STDIN = '-'
+
+
+def _iter_input(name: str, detail: str,
+                file_filter: Optional[FileFilter]) -> Iterator[Union[FileDiff, DiffTotals]]:
+    """Yield the records of one input as they complete, reading files through a memory map."""
+    if name == STDIN:
+        yield from iter_git_diff(sys.stdin.buffer, detail, file_filter=file_filter)
+        return
+
+    with open(name, 'rb') as diff_file:
+        if os.fstat(diff_file.fileno()).st_size == 0:
+            buf = b''
+        else:
+            buf = mmap.mmap(diff_file.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        # Records are converted before the next one is read, so the map can be closed after
+        yield from _iter_buffer_records(buf, detail, *_strip_bounds(buf), file_filter)
+    finally:
+        if isinstance(buf, mmap.mmap):
+            buf.close()
+
+
+def _parse_input(name: str, detail: str,
+                 file_filter: Optional[FileFilter]) -> Tuple[List[Tuple[str, Dict]], DiffTotals]:
+    """Parse a whole input in a worker, returning its (path, stats) pairs and totals."""
+    files = []
+    totals = None
+    for record in _iter_input(name, detail, file_filter):
+        if isinstance(record, DiffTotals):
+            totals = record
+        else:
+            files.append((record.path, record.to_dict()))
+    return files, totals
+
+
+def _iter_results(names: List[str], detail: str, file_filter: Optional[FileFilter],
+                  workers: int) -> Iterator[Tuple[str, Union[Tuple[str, Dict], DiffTotals]]]:
+    """
+    Yield (input name, (path, stats) or DiffTotals) for every input, in input order.
+
+    With one worker, records are streamed as they are parsed; otherwise each input
+    is parsed whole in a process pool and its records are yielded once all inputs
+    before it are done. Standard input is parsed in this process, as pool workers
+    do not inherit it.
+    """
+    if workers <= 1 or len(names) <= 1:
+        for name in names:
+            for record in _iter_input(name, detail, file_filter):
+                if isinstance(record, DiffTotals):
+                    yield name, record
+                else:
+                    yield name, (record.path, record.to_dict())
+        return
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(names))) as executor:
+        futures = [None if name == STDIN else executor.submit(_parse_input, name, detail, file_filter)
+                   for name in names]
+        for name, future in zip(names, futures):
+            if future is None:
+                files, totals = _parse_input(name, detail, file_filter)
+            else:
+                files, totals = future.result()
+            for entry in files:
+                yield name, entry
+            yield name, totals
+
+
+def _totals_dict(totals: DiffTotals) -> Dict:
+    return {
+        'total_files_changed': totals.total_files_changed,
+        'total_lines_added': totals.total_lines_added,
+        'total_lines_removed': totals.total_lines_removed,
+    }
+
+
+def _tsv_field(value: str) -> str:
+    """Quote values containing tabs or newlines, as git does for such paths."""
+    if '\t' in value or '\n' in value or '\r' in value or value.startswith('"'):
+        return json.dumps(value)
+    return value
+
+
+class _Writer:
+    """Formats records for one output format; files are written as they arrive."""
+
+    def __init__(self, out: TextIO, output_format: str, names: List[str]):
+        self.out = out
+        self.format = output_format
+        self.names = names
+        self.with_input = len(names) > 1
+        self.results = {}
+
+    def begin(self) -> None:
+        if self.format == 'tsv':
+            columns = ['path', 'added', 'removed', 'change_type']
+            self._row(['input'] + columns if self.with_input else columns)
+
+    def _row(self, fields: List) -> None:
+        self.out.write('\t'.join(_tsv_field(str(field)) for field in fields) + '\n')
+
+    def file(self, name: str, path: str, stats: Dict) -> None:
+        if self.format == 'jsonl':
+            record = {'input': name} if self.with_input else {}
+            record['path'] = path
+            record.update(stats)
+            self.out.write(json.dumps(record) + '\n')
+        elif self.format == 'tsv':
+            fields = [path, stats['added'], stats['removed'], stats['change_type']]
+            self._row([name] + fields if self.with_input else fields)
+        else:
+            self._result(name)['files'][path] = stats
+
+    def totals(self, name: str, totals: DiffTotals) -> None:
+        if self.format == 'json':
+            self._result(name).update(_totals_dict(totals))
+
+    def _result(self, name: str) -> Dict:
+        result = self.results.get(name)
+        if result is None:
+            result = self.results[name] = {'files': {}}
+        return result
+
+    def end(self, totals: DiffTotals) -> None:
+        if self.format == 'jsonl':
+            self.out.write(json.dumps(_totals_dict(totals)) + '\n')
+        elif self.format == 'tsv':
+            fields = ['', totals.total_lines_added, totals.total_lines_removed, 'total']
+            self._row([''] + fields if self.with_input else fields)
+        else:
+            document = _totals_dict(totals)
+            if self.with_input:
+                document['inputs'] = {name: self._order(self.results[name]) for name in self.names}
+            else:
+                document['files'] = self.results[self.names[0]]['files']
+            json.dump(document, self.out, indent=2)
+            self.out.write('\n')
+
+    @staticmethod
+    def _order(result: Dict) -> Dict:
+        # parse_git_diff's key order: totals first, then files
+        files = result.pop('files')
+        result['files'] = files
+        return result
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='gitdiffstats', description=__doc__.strip().splitlines()[0].partition(': ')[2],
+        formatter_class=argparse.RawDescriptionHelpFormatter, epilog='\n'.join(__doc__.strip().splitlines()[1:]))
+    parser.add_argument('inputs', nargs='*', metavar='DIFF',
+                        help=f"diff files to read ('{STDIN}' or none: standard input)")
+    parser.add_argument('--format', choices=FORMATS, default='jsonl',
+                        help="jsonl: one line per file as it completes, then a totals line (default); "
+                             "json: one document shaped like parse_git_diff's result; "
+                             "tsv: path, added, removed and change type per file, then a total row")
+    parser.add_argument('--stats-only', action='store_true',
+                        help="print only the totals; file sections are not materialized")
+    parser.add_argument('--detail', choices=(DETAIL_FILES, DETAIL_HUNKS, DETAIL_FULL), default=DETAIL_FILES,
+                        help="how much of each file to include in JSON output (default: %(default)s)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="parse this many input files at once in separate processes")
+    parser.add_argument('--include', action='append', metavar='GLOB', help="only parse matching paths")
+    parser.add_argument('--exclude', action='append', metavar='GLOB', help="skip matching paths")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None, out: Optional[TextIO] = None) -> int:
+    """
+    Run the gitdiffstats command.
+
+    Args:
+        argv (Optional[List[str]]): The command-line arguments, defaults to sys.argv[1:].
+        out (Optional[TextIO]): Where to write the output, defaults to sys.stdout.
+
+    Returns:
+        int: The exit status: 0 on success, 1 if an input could not be read.
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if out is None:
+        out = sys.stdout
+
+    names = args.inputs or [STDIN]
+    if names.count(STDIN) > 1:
+        parser.error("standard input can only be read once")
+    detail = DETAIL_TOTALS if args.stats_only else args.detail
+    file_filter = None
+    if args.include or args.exclude:
+        file_filter = FileFilter(include=args.include, exclude=args.exclude)
+
+    writer = _Writer(out, args.format, names)
+    files_changed = added = removed = 0
+    try:
+        writer.begin()
+        for name, record in _iter_results(names, detail, file_filter, args.workers):
+            if isinstance(record, DiffTotals):
+                writer.totals(name, record)
+                files_changed += record.total_files_changed
+                added += record.total_lines_added
+                removed += record.total_lines_removed
+            else:
+                writer.file(name, *record)
+        writer.end(DiffTotals(files_changed, added, removed))
+        out.flush()
+    except OSError as error:
+        if isinstance(error, BrokenPipeError):
+            # The reader went away (e.g. `| head`); stop quietly, also at interpreter exit
+            if out is sys.stdout:
+                os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            return 0
+        print(f"gitdiffstats: {error}", file=sys.stderr)
+        return 1
+    return 0
@@ -0,0 +1,175 @@
+from array import array
+from typing import Dict, Iterable, List, Union
+
+from .diffstats import _BUFFER_TYPES, DETAIL_HUNKS, _iter_records
+from .model import DiffResult, DiffTotals, FileDiff
+
+# Codes stored in the 'change_type' file column
+CHANGE_TYPES = ("modified", "added", "deleted")
+CHANGE_TYPE_CODES = {change_type: code for code, change_type in enumerate(CHANGE_TYPES)}
+
+
+def _require_numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError(
+            "Columnar export needs NumPy: pip install 'gitdiffstats_oliverRamirez[numpy]'"
+        ) from None
+    return numpy
+
+
+class DiffColumns:
+    """
+    Diff statistics as NumPy columns, one row per diff, file and hunk.
+
+    Each table is a dict of equally long arrays, so it can be handed straight
+    to pandas.DataFrame or used with NumPy's vectorized operations.
+
+    Attributes:
+        paths (List[str]): Interned path table; the 'path' file column indexes it.
+        diffs (Dict[str, ndarray]): Per-diff rows: 'files_changed', 'lines_added',
+            'lines_removed'. Row i is the i-th diff parsed.
+        files (Dict[str, ndarray]): Per-file rows: 'diff' (row in diffs), 'path',
+            'change_type' (index into CHANGE_TYPES), 'added', 'removed', 'hunks' (hunk count)
+            and 'binary' (1 for binary files).
+        hunks (Dict[str, ndarray]): Per-hunk rows: 'file' (row in files), 'old_start',
+            'old_count', 'new_start' and 'new_count'.
+    """
+    __slots__ = ('paths', 'diffs', 'files', 'hunks')
+
+    def __init__(self, paths: List[str], diffs: Dict, files: Dict, hunks: Dict):
+        self.paths = paths
+        self.diffs = diffs
+        self.files = files
+        self.hunks = hunks
+
+    def file_paths(self) -> List[str]:
+        """Return the path of every file row."""
+        paths = self.paths
+        return [paths[path_id] for path_id in self.files['path'].tolist()]
+
+    def __repr__(self) -> str:
+        return (f"DiffColumns(diffs={len(self.diffs['files_changed'])}, "
+                f"files={len(self.files['path'])}, hunks={len(self.hunks['file'])})")
+
+
+class _ColumnBuilder:
+    """Collects rows in stdlib arrays and converts them to NumPy arrays once at the end."""
+
+    def __init__(self):
+        self.paths = []
+        self._path_ids = {}
+        self.diffs = {name: array('q') for name in ('files_changed', 'lines_added', 'lines_removed')}
+        self.files = {name: array('q') for name in ('diff', 'path', 'added', 'removed', 'hunks')}
+        self.files['change_type'] = array('b')
+        self.files['binary'] = array('b')
+        self.hunks = {name: array('q') for name in ('file', 'old_start', 'old_count',
+                                                   'new_start', 'new_count')}
+
+    def _path_id(self, path: str) -> int:
+        path_id = self._path_ids.get(path)
+        if path_id is None:
+            path_id = self._path_ids[path] = len(self.paths)
+            self.paths.append(path)
+        return path_id
+
+    def add_file(self, path: str, change_type: str, added: int, removed: int,
+                 hunks: Iterable[tuple], binary: bool = False) -> None:
+        """Add a file row for the diff being built; hunks are (old_start, old_count, new_start, new_count)."""
+        files = self.files
+        file_row = len(files['path'])
+        hunk_count = 0
+        for old_start, old_count, new_start, new_count in hunks:
+            self.hunks['file'].append(file_row)
+            self.hunks['old_start'].append(old_start)
+            self.hunks['old_count'].append(old_count)
+            self.hunks['new_start'].append(new_start)
+            self.hunks['new_count'].append(new_count)
+            hunk_count += 1
+
+        files['diff'].append(len(self.diffs['files_changed']))
+        files['path'].append(self._path_id(path))
+        files['change_type'].append(CHANGE_TYPE_CODES[change_type])
+        files['added'].append(added)
+        files['removed'].append(removed)
+        files['hunks'].append(hunk_count)
+        files['binary'].append(binary)
+
+    def add_record(self, record: FileDiff) -> None:
+        self.add_file(record.path, record.change_type, record.added, record.removed,
+                      ((hunk.old_start, hunk.old_count, hunk.new_start, hunk.new_count)
+                       for hunk in record.hunks), record.binary)
+
+    def end_diff(self, files_changed: int, lines_added: int, lines_removed: int) -> None:
+        """Close the diff whose file rows were just added."""
+        self.diffs['files_changed'].append(files_changed)
+        self.diffs['lines_added'].append(lines_added)
+        self.diffs['lines_removed'].append(lines_removed)
+
+    def build(self) -> DiffColumns:
+        numpy = _require_numpy()
+
+        def convert(table):
+            return {name: numpy.frombuffer(column, dtype=numpy.int8 if column.typecode == 'b'
+                                           else numpy.int64)
+                    for name, column in table.items()}
+
+        return DiffColumns(self.paths, convert(self.diffs), convert(self.files), convert(self.hunks))
+
+
+def to_columns(result: Union[DiffResult, Dict]) -> DiffColumns:
+    """
+    Convert one parsed diff into NumPy columns.
+
+    Args:
+        result (Union[DiffResult, Dict]): A DiffResult or a dict returned by parse_git_diff.
+
+    Returns:
+        DiffColumns: A single diff row plus its file and hunk rows.
+    """
+    _require_numpy()
+    builder = _ColumnBuilder()
+    if isinstance(result, DiffResult):
+        for record in result.files.values():
+            builder.add_record(record)
+        builder.end_diff(result.total_files_changed, result.total_lines_added,
+                         result.total_lines_removed)
+    else:
+        for path, file_stats in result['files'].items():
+            builder.add_file(path, file_stats['change_type'], file_stats['added'],
+                             file_stats['removed'],
+                             ((hunk['old_start'], hunk['old_count'], hunk['new_start'], hunk['new_count'])
+                              for hunk in file_stats['hunks']),
+                             file_stats.get('binary', False))
+        builder.end_diff(result['total_files_changed'], result['total_lines_added'],
+                         result['total_lines_removed'])
+    return builder.build()
+
+
+def parse_many_to_columns(diffs: Iterable, detail: str = DETAIL_HUNKS) -> DiffColumns:
+    """
+    Parse many diffs straight into NumPy columns without building per-file dicts.
+
+    Args:
+        diffs (Iterable): Diffs in any form parse_git_diff or iter_git_diff accepts (str,
+            bytes-like objects, file objects or iterables of lines). The n-th diff becomes
+            row n of the diffs table.
+        detail (str): "hunks" (the default) fills the hunk table, "files" leaves it
+            empty and "totals" only fills the diffs table. "full" gives the same columns
+            as "hunks", only slower.
+
+    Returns:
+        DiffColumns: The rows of all diffs, sharing one path table.
+    """
+    _require_numpy()
+    builder = _ColumnBuilder()
+    for diff in diffs:
+        if diff is None:
+            diff = ""
+        for record in _iter_records(diff, detail, strip=isinstance(diff, (str,) + _BUFFER_TYPES)):
+            if isinstance(record, DiffTotals):
+                builder.end_diff(*record)
+            else:
+                builder.add_record(record)
+    return builder.build()
@@ -1,150 +1,1024 @@
+import mmap
+import os
 import re
-from typing import Dict, List, Optional, Tuple
+import sys
+from collections import deque
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
-def parse_git_diff(diff_text: str) -> Dict:
+from .filters import FileFilter
+from .model import KIND_ADD, KIND_CONTEXT, KIND_REMOVE, DiffResult, DiffTotals, FileDiff, Hunk
+
+# Detail levels, from cheapest to most complete. Nothing below the requested
+# level is allocated while parsing.
+DETAIL_TOTALS = "totals"  # overall counts only, 'files' is left empty
+DETAIL_FILES = "files"    # per-file counts and change type, no hunks
+DETAIL_HUNKS = "hunks"    # hunk headers and ranges, no per-line changes
+DETAIL_FULL = "full"      # everything, including every changed/context line
+
+_DETAIL_LEVELS = {
+    DETAIL_TOTALS: 0,
+    DETAIL_FILES: 1,
+    DETAIL_HUNKS: 2,
+    DETAIL_FULL: 3,
+}
+
+
+def _detail_level(detail: str) -> int:
+    try:
+        return _DETAIL_LEVELS[detail]
+    except KeyError:
+        raise ValueError(
+            f"Unknown detail level {detail!r}, expected one of {', '.join(_DETAIL_LEVELS)}"
+        ) from None
+
+
+def _files_detail(detail: str) -> str:
     """
-    Parse a given git diff string to extract overall statistics and per-file statistics.
-    
+    Return the detail level to parse at when every file's record is needed.
+
+    "totals" produces no per-file records, so callers that count the paths or
+    build something from the files parse at "files" and drop them afterwards.
+    """
+    return DETAIL_FILES if _detail_level(detail) < _DETAIL_LEVELS[DETAIL_FILES] else detail
+
+
+def _result_dict(files_changed: int, lines_added: int, lines_removed: int, files: Dict) -> Dict:
+    """Return the dictionary parse_git_diff and the other dict-returning parsers produce."""
+    return {
+        'total_files_changed': files_changed,
+        'total_lines_added': lines_added,
+        'total_lines_removed': lines_removed,
+        'files': files
+    }
+
+
+# Header patterns. They are only consulted for lines that cannot be changes,
+# which in a well-formed diff means the header region of each file section.
+_DIFF_GIT_PATTERN = re.compile(r'^diff --git a/(.*?) b/(.*)$')
+# Paths with special characters are C-quoted: diff --git "a/x y" "b/x y"
+_DIFF_GIT_QUOTED_PATTERN = re.compile(r'^diff --git (?:"a/(?:[^"\\]|\\.)*"|a/.*?) ("b/(?:[^"\\]|\\.)*"|b/.*)$')
+_NEW_FILE_PATTERN = re.compile(r'^new file mode')
+_DELETED_FILE_PATTERN = re.compile(r'^deleted file mode')
+_PLUS_FILE_PATTERN = re.compile(r'^\+\+\+ b/(.*)$')
+_MINUS_FILE_PATTERN = re.compile(r'^--- (.*)$')
+_HUNK_HEADER_PATTERN = re.compile(r'^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@')
+
+# Returned by _DiffState.header() for lines that are not headers
+_NOT_HEADER = object()
+
+# How a file section starts in snippets without 'diff --git' lines
+_SNIPPET_HEADER = "+++ b/"
+
+_C_ESCAPES = {'a': 7, 'b': 8, 't': 9, 'n': 10, 'v': 11, 'f': 12, 'r': 13, '"': 34, '\\': 92}
+
+
+def _unquote_path(path: str) -> str:
+    """Undo git's C-style quoting of a path with special characters, if it is quoted."""
+    if len(path) < 2 or path[0] != '"' or path[-1] != '"':
+        return path
+    body = path[1:-1]
+    raw = bytearray()
+    i = 0
+    while i < len(body):
+        char = body[i]
+        if char == '\\' and i + 1 < len(body):
+            escape = body[i + 1]
+            if escape in _C_ESCAPES:
+                raw.append(_C_ESCAPES[escape])
+                i += 2
+                continue
+            if body[i + 1:i + 4].isdigit():
+                raw.append(int(body[i + 1:i + 4], 8) & 0xff)
+                i += 4
+                continue
+        raw += char.encode('utf-8')
+        i += 1
+    return raw.decode('utf-8', errors='replace')
+
+
+class _DiffState:
+    """
+    Line-by-line state machine shared by iter_git_diff and parse_git_diff.
+
+    Lines are fed without their line terminator, either through scan() or one
+    at a time through push(). A file record is handed back as soon as the
+    line that ends it (the next file header) is seen; finish() flushes the
+    last record. At the totals detail level no file records are handed back
+    at all.
+
+    Lines are classified by their first character. Inside a hunk, ' ', '+'
+    and '-' lines are changes and never reach the header patterns; '+++' and
+    '---' lines only count as file headers once the hunk header's line counts
+    are used up, so removed or added content starting with them is counted.
+
+    When a buffer is given, hunks reference it and store the offsets of
+    each change's content instead of a copy (see _iter_buffer_records).
+    """
+
+    def __init__(self, detail: str = DETAIL_FULL, buffer=None,
+                 file_filter: Optional[FileFilter] = None):
+        level = _detail_level(detail)
+        self.emit_files = level >= _DETAIL_LEVELS[DETAIL_FILES]
+        self.keep_hunks = level >= _DETAIL_LEVELS[DETAIL_HUNKS]
+        self.keep_changes = level >= _DETAIL_LEVELS[DETAIL_FULL]
+
+        self.file_filter = file_filter
+        # Set while an excluded file section is skipped: how the header that started it begins
+        self.skip_marker = None
+        # Whether the current file's changes are kept, and what is left of its limits
+        self.recording = self.keep_changes
+        self.capped = self.keep_changes and file_filter is not None and file_filter.capped
+        self.lines_left = 0
+        self.bytes_left = 0
+
+        self.total_added = 0
+        self.total_removed = 0
+        self.paths = set()
+
+        self.current_file = None
+        self.change_type = "modified"
+        self.current_hunk = None
+        self.hunk_contents = []
+        self.buffer = buffer
+        self.in_hunk = False
+        self.old_line_pos = 0
+        self.new_line_pos = 0
+        # Old/new lines the current hunk header announced but that were not seen yet
+        self.old_remaining = 0
+        self.new_remaining = 0
+
+    def _start_file(self, path: str, header: str = "diff --git") -> Optional[FileDiff]:
+        """
+        Begin a new file record, returning the one it replaces (if any).
+
+        header is how the file's header line starts; for a file the filter excludes,
+        every line up to the next file header is skipped (see _skip_lines).
+        """
+        done = self._finish_file()
+        file_filter = self.file_filter
+        if file_filter is not None:
+            if not file_filter.accepts(path):
+                self.skip_marker = header
+                return done
+            if self.capped:
+                self.recording = True
+                self.lines_left = (sys.maxsize if file_filter.max_lines_per_file is None
+                                   else file_filter.max_lines_per_file)
+                self.bytes_left = (sys.maxsize if file_filter.max_content_bytes is None
+                                   else file_filter.max_content_bytes)
+        self.paths.add(path)
+        self.current_file = FileDiff(path, self.change_type)
+        return done
+
+    def _within_budget(self, size: int) -> bool:
+        """Charge one change of size bytes to the file's limits; False once they are exceeded."""
+        if not self.recording:
+            return False
+        self.lines_left -= 1
+        self.bytes_left -= size
+        if self.lines_left >= 0 and self.bytes_left >= 0:
+            return True
+        self.recording = False
+        self.current_file.truncated = True
+        return False
+
+    def _close_hunk(self) -> None:
+        if self.current_hunk is not None and self.keep_changes and self.buffer is None:
+            self.current_hunk.seal(self.hunk_contents)
+            self.hunk_contents = []
+        self.current_hunk = None
+        self.in_hunk = False
+        self.old_remaining = 0
+        self.new_remaining = 0
+
+    def _finish_file(self) -> Optional[FileDiff]:
+        # Hunks never continue across a file header
+        self._close_hunk()
+        current = self.current_file
+        if current is None:
+            return None
+        self.current_file = None
+        if not self.emit_files:
+            return None
+        return current
+
+    def _skip_lines(self, lines: Iterator[str]) -> Optional[str]:
+        """
+        Consume the lines of an excluded file section, returning the file header that ends it.
+
+        A section started by 'diff --git' ends at the next 'diff --git' line. One
+        started by '+++ b/' is preceded by the next file's '---' line (and maybe
+        'diff --git' and mode lines), so its hunks are followed by their line
+        counts and it ends at the first of those once they are used up. Returns
+        None if lines run out first; the hunk counts are kept for the next call.
+        """
+        marker = self.skip_marker
+        if marker != _SNIPPET_HEADER:
+            for line in lines:
+                if line.startswith(marker):
+                    return line
+            return None
+
+        old_remaining = self.old_remaining
+        new_remaining = self.new_remaining
+        try:
+            for line in lines:
+                if old_remaining > 0 or new_remaining > 0:
+                    first = line[:1]
+                    if first == '+':
+                        if new_remaining > 0 or not line.startswith('+++'):
+                            new_remaining -= 1
+                            continue
+                    elif first == '-':
+                        if old_remaining > 0 or not line.startswith('---'):
+                            old_remaining -= 1
+                            continue
+                    elif first == '\\':
+                        continue
+                    elif not line.startswith("diff --git"):
+                        # Context, with or without its ' ' prefix
+                        old_remaining -= 1
+                        new_remaining -= 1
+                        continue
+                elif line.startswith("@@"):
+                    hunk_match = _HUNK_HEADER_PATTERN.match(line)
+                    if hunk_match:
+                        old_count, new_count = hunk_match.group(2, 4)
+                        old_remaining = int(old_count) if old_count else 1
+                        new_remaining = int(new_count) if new_count else 1
+                        continue
+
+                if line.startswith("diff --git") or line.startswith("--- ") or line.startswith(_SNIPPET_HEADER):
+                    old_remaining = new_remaining = 0
+                    return line
+            return None
+        finally:
+            self.old_remaining = old_remaining
+            self.new_remaining = new_remaining
+
+    def push(self, line: str) -> Optional[FileDiff]:
+        """
+        Feed a single diff line into the state machine.
+
+        Args:
+            line (str): One line of the diff, without its line terminator.
+
+        Returns:
+            Optional[FileDiff]: The previous file's record if this line started a new file.
+        """
+        for done in self.scan((line,)):
+            return done
+        return None
+
+    def scan(self, lines: Iterable[str]) -> Iterator[FileDiff]:
+        """
+        Feed lines into the state machine, yielding file records as they complete.
+
+        This is the hot loop of the text parsers: the parser state is kept in
+        local variables and only written back to self around header lines,
+        which are the only lines that can complete a record.
+
+        Args:
+            lines (Iterable[str]): Diff lines without their line terminators.
+
+        Yields:
+            FileDiff: The previous file's record whenever a line starts a new file.
+        """
+        lines = iter(lines)
+        header = self.header
+        capped = self.capped
+        within_budget = self._within_budget
+        total_added = self.total_added
+        total_removed = self.total_removed
+        in_hunk = False
+
+        while True:
+            if self.skip_marker is not None:
+                # Excluded file section: jump to the next file header
+                line = self._skip_lines(lines)
+                if line is None:
+                    break
+                self.skip_marker = None
+                done = header(line)
+                if done is not None:
+                    yield done
+                continue
+
+            # (Re)load the per-hunk state
+            keep_changes = self.recording
+            in_hunk = self.in_hunk
+            current_file = self.current_file
+            added = current_file.added if in_hunk else 0
+            removed = current_file.removed if in_hunk else 0
+            old_pos = self.old_line_pos
+            new_pos = self.new_line_pos
+            old_remaining = self.old_remaining
+            new_remaining = self.new_remaining
+            if in_hunk and keep_changes:
+                hunk = self.current_hunk
+                kinds_append = hunk.kinds.append
+                old_append = hunk.old_lines.append
+                new_append = hunk.new_lines.append
+                content_append = self.hunk_contents.append
+
+            for line in lines:
+                first = line[:1]
+                if in_hunk:
+                    if first == ' ':
+                        old_remaining -= 1
+                        new_remaining -= 1
+                        if keep_changes and (not capped or within_budget(len(line))):
+                            kinds_append(KIND_CONTEXT)
+                            old_append(old_pos)
+                            new_append(new_pos)
+                            content_append(line)
+                        old_pos += 1
+                        new_pos += 1
+                        continue
+                    if first == '+':
+                        if new_remaining > 0 or not line.startswith('+++'):
+                            total_added += 1
+                            added += 1
+                            new_remaining -= 1
+                            if keep_changes and (not capped or within_budget(len(line) - 1)):
+                                kinds_append(KIND_ADD)
+                                old_append(old_pos)
+                                new_append(new_pos)
+                                content_append(line[1:])  # Remove the '+' prefix
+                            new_pos += 1
+                            continue
+                    elif first == '-':
+                        if old_remaining > 0 or not line.startswith('---'):
+                            total_removed += 1
+                            removed += 1
+                            old_remaining -= 1
+                            if keep_changes and (not capped or within_budget(len(line) - 1)):
+                                kinds_append(KIND_REMOVE)
+                                old_append(old_pos)
+                                new_append(new_pos)
+                                content_append(line[1:])  # Remove the '-' prefix
+                            old_pos += 1
+                            continue
+                elif first == '+':
+                    if not line.startswith('+++'):
+                        total_added += 1
+                        continue
+                elif first == '-':
+                    if not line.startswith('---'):
+                        total_removed += 1
+                        continue
+
+                # Anything else is a header, or context such as a bare empty line
+                self.total_added = total_added
+                self.total_removed = total_removed
+                if in_hunk:
+                    current_file.added = added
+                    current_file.removed = removed
+                    self.old_line_pos = old_pos
+                    self.new_line_pos = new_pos
+                    self.old_remaining = old_remaining
+                    self.new_remaining = new_remaining
+
+                done = header(line)
+                if done is _NOT_HEADER:
+                    self.change(KIND_CONTEXT, line)
+                elif done is not None:
+                    yield done
+                break
+            else:
+                break
+
+        self.total_added = total_added
+        self.total_removed = total_removed
+        if in_hunk:
+            current_file.added = added
+            current_file.removed = removed
+            self.old_line_pos = old_pos
+            self.new_line_pos = new_pos
+            self.old_remaining = old_remaining
+            self.new_remaining = new_remaining
+
+    def header(self, line: str):
+        """
+        Handle line if it is a file or hunk header.
+
+        Returns:
+            The previous file's record (or None) if the line was a header, otherwise _NOT_HEADER.
+        """
+        first = line[:1]
+
+        if first == 'd':
+            # Start of a new file diff
+            if line.startswith("diff --git"):
+                match = _DIFF_GIT_PATTERN.match(line)
+                if match:
+                    a_path, b_path = match.groups()
+                    self.change_type = "modified"  # default assumption
+                    return self._start_file(b_path.strip())  # we use the destination path
+                match = _DIFF_GIT_QUOTED_PATTERN.match(line)
+                if match:
+                    self.change_type = "modified"
+                    return self._start_file(_unquote_path(match.group(1))[2:])
+                return None
+
+            if _DELETED_FILE_PATTERN.match(line):
+                return self._set_change_type("deleted")
+            return _NOT_HEADER
+
+        # Detect added files
+        if first == 'n':
+            if _NEW_FILE_PATTERN.match(line):
+                return self._set_change_type("added")
+            return _NOT_HEADER
+
+        # Handle snippets with only ---/+++ headers
+        if first == '+':
+            plus_match = _PLUS_FILE_PATTERN.match(line)
+            if plus_match:
+                path = plus_match.group(1).strip()
+                if self.current_file is None or self.current_file.path != path:
+                    return self._start_file(path, _SNIPPET_HEADER)
+                return None
+            return _NOT_HEADER
+
+        if first == '-':
+            minus_match = _MINUS_FILE_PATTERN.match(line)
+            if minus_match:
+                if minus_match.group(1) == '/dev/null':
+                    self._set_change_type("added")
+                return None
+            return _NOT_HEADER
+
+        # Binary files have no hunks, only one of these lines
+        if first == 'B' or first == 'G':
+            if line.startswith("Binary files ") or line.startswith("GIT binary patch"):
+                if self.current_file is not None:
+                    self.current_file.binary = True
+                return None
+            return _NOT_HEADER
+
+        # Hunk header
+        if first == '@' and line.startswith("@@"):
+            hunk_match = _HUNK_HEADER_PATTERN.match(line)
+            if hunk_match and self.current_file is not None:
+                self._close_hunk()
+                self.in_hunk = True
+
+                old_start, old_count, new_start, new_count = hunk_match.groups()
+                old_count = int(old_count) if old_count else 1
+                new_count = int(new_count) if new_count else 1
+                self.old_remaining = old_count
+                self.new_remaining = new_count
+                if not self.keep_hunks:
+                    return None
+
+                old_start = int(old_start)
+                new_start = int(new_start)
+                self.current_hunk = Hunk(old_start, old_count, new_start, new_count, line)
+                if self.buffer is not None and self.keep_changes:
+                    self.current_hunk._content = self.buffer
+                self.current_file.hunks.append(self.current_hunk)
+
+                # Initialize counters for tracking current line positions within the hunk
+                self.old_line_pos = old_start
+                self.new_line_pos = new_start
+            return None
+
+        return _NOT_HEADER
+
+    def _set_change_type(self, change_type: str) -> None:
+        self.change_type = change_type
+        if self.current_file is not None:
+            self.current_file.change_type = change_type
+
+    def change(self, kind: int, content, end: int = 0) -> None:
+        """
+        Count and record one added, removed or context line.
+
+        content is the line's text, or when parsing a buffer, the offset of the
+        text in self.buffer with end as the offset just past it.
+        """
+        if kind == KIND_ADD:
+            self.total_added += 1
+            if self.current_file is None or not self.in_hunk:
+                return
+            self.current_file.added += 1
+            self.new_remaining -= 1
+        elif kind == KIND_REMOVE:
+            self.total_removed += 1
+            if self.current_file is None or not self.in_hunk:
+                return
+            self.current_file.removed += 1
+            self.old_remaining -= 1
+        elif not self.in_hunk:
+            return
+        else:
+            # A context line that lost its ' ' prefix (e.g. a blank line whose trailing
+            # whitespace was stripped) still uses up one old and one new line
+            if self.buffer is None:
+                no_newline = content[:1] == '\\'
+            else:
+                no_newline = end > content and self.buffer[content] == 92  # '\\'
+            if not no_newline:
+                self.old_remaining -= 1
+                self.new_remaining -= 1
+
+        if not self.recording:
+            return
+        if self.capped:
+            size = len(content) if self.buffer is None else end - content
+            if not self._within_budget(size):
+                return
+
+        # Record the change and track line positions
+        hunk = self.current_hunk
+        hunk.kinds.append(kind)
+        hunk.old_lines.append(self.old_line_pos)
+        hunk.new_lines.append(self.new_line_pos)
+        if self.buffer is None:
+            self.hunk_contents.append(content)
+        else:
+            hunk._starts.append(content)
+            hunk._ends.append(end)
+
+        if kind != KIND_ADD:
+            self.old_line_pos += 1
+        if kind != KIND_REMOVE:
+            self.new_line_pos += 1
+
+    def finish(self) -> Tuple[Optional[FileDiff], DiffTotals]:
+        """
+        Flush the file being built and compute the overall totals.
+
+        Returns:
+            Tuple[Optional[FileDiff], DiffTotals]: The last file record (if any) and the totals.
+        """
+        done = self._finish_file()
+        totals = DiffTotals(len(self.paths), self.total_added, self.total_removed)
+        return done, totals
+
+
+class DiffParser(_DiffState):
+    """
+    Push-style parser for diffs that arrive in arbitrary chunks, e.g. from a socket or pipe.
+
+    Chunks may split lines (and UTF-8 sequences) anywhere; only the trailing
+    partial line is buffered between feed() calls. Each file is handed to
+    on_file as soon as it is complete, or queued in `completed` when no
+    callback is given, so memory stays bounded by one partial line plus the
+    file being parsed.
+
+    The parser state is available while parsing:
+        current_file (Optional[FileDiff]): The file being parsed.
+        current_hunk (Optional[Hunk]): The hunk being parsed (below "hunks" detail: None).
+        old_line_pos / new_line_pos (int): Next old/new line number inside the hunk.
+        change_type (str): The change type pending for the next file record.
+        completed (deque): Finished FileDiff records not yet taken, if on_file is None.
+        totals (Optional[DiffTotals]): Set by close().
+    """
+
+    def __init__(self, detail: str = DETAIL_FULL, on_file: Optional[Callable[[FileDiff], None]] = None,
+                 file_filter: Optional[FileFilter] = None):
+        super().__init__(detail, file_filter=file_filter)
+        self.on_file = on_file
+        self.completed = deque()
+        self.totals = None
+        self._partial = []
+
+    def _emit(self, record: FileDiff) -> None:
+        if self.on_file is not None:
+            self.on_file(record)
+        else:
+            self.completed.append(record)
+
+    def _push_block(self, block: str) -> None:
+        if block.endswith('\r'):
+            block = block[:-1]
+        emit = self._emit
+        for done in self.scan(block.replace('\r\n', '\n').split('\n')):
+            emit(done)
+
+    def feed(self, chunk: Union[str, bytes]) -> None:
+        """
+        Parse the complete lines in chunk and buffer any trailing partial line.
+
+        Args:
+            chunk (Union[str, bytes]): The next piece of the diff. All chunks fed to one
+                parser must be of the same type; bytes are decoded as UTF-8 line by line.
+        """
+        if self.totals is not None:
+            raise ValueError("feed() called after close()")
+        if not chunk:
+            return
+
+        newline = '\n' if isinstance(chunk, str) else b'\n'
+        cut = chunk.rfind(newline)
+        if cut < 0:
+            self._partial.append(chunk)
+            return
+
+        head = chunk[:cut]
+        if self._partial:
+            self._partial.append(head)
+            head = head[:0].join(self._partial)
+        self._partial = [chunk[cut + 1:]] if cut + 1 < len(chunk) else []
+
+        if not isinstance(head, str):
+            head = bytes(head).decode('utf-8', errors='replace')
+        self._push_block(head)
+
+    def close(self) -> DiffTotals:
+        """
+        Parse the final partial line, flush the last file and return the totals.
+
+        Returns:
+            DiffTotals: The overall statistics, also stored as self.totals.
+        """
+        if self.totals is not None:
+            return self.totals
+
+        if self._partial:
+            tail = self._partial[0][:0].join(self._partial)
+            self._partial = []
+            if not isinstance(tail, str):
+                tail = bytes(tail).decode('utf-8', errors='replace')
+            self._push_block(tail)
+
+        done, self.totals = self.finish()
+        if done is not None:
+            self._emit(done)
+        return self.totals
+
+    def drain(self) -> Iterator[FileDiff]:
+        """Yield and remove the queued completed files."""
+        completed = self.completed
+        while completed:
+            yield completed.popleft()
+
+
+def _iter_lines(source: Union[str, Iterable]) -> Iterator[str]:
+    """Normalize a diff source into lines without their terminators."""
+    if isinstance(source, str):
+        return iter(source.splitlines())
+    if isinstance(source, _BUFFER_TYPES):
+        return _iter_buffer_lines(_as_buffer(source))
+    return _iter_source_lines(source)
+
+
+def _iter_buffer_lines(buf) -> Iterator[str]:
+    """Decode the lines of a bytes-like buffer one at a time, splitting on '\\n' only."""
+    find = buf.find
+    end = len(buf)
+    pos = 0
+    while pos < end:
+        newline = find(b'\n', pos)
+        if newline < 0:
+            newline = end
+        line = buf[pos:newline]
+        if line.endswith(b'\r'):
+            line = line[:-1]
+        yield line.decode('utf-8', errors='replace')
+        pos = newline + 1
+
+
+def _iter_source_lines(source: Iterable) -> Iterator[str]:
+    for line in source:
+        if isinstance(line, (bytes, bytearray)):
+            line = line.decode('utf-8', errors='replace')
+        if line.endswith('\n'):
+            line = line[:-1]
+        if line.endswith('\r'):
+            line = line[:-1]
+        yield line
+
+
+# Inputs parsed straight from their raw bytes
+_BUFFER_TYPES = (bytes, bytearray, memoryview, mmap.mmap)
+
+_ASCII_WHITESPACE = b' \t\n\r\x0b\x0c'
+
+
+def _as_buffer(source):
+    """Return a bytes-like object supporting find() and slicing for source."""
+    if isinstance(source, memoryview):
+        obj = source.obj
+        if (isinstance(obj, (bytes, bytearray, mmap.mmap)) and source.contiguous
+                and source.nbytes == len(obj)):
+            return obj
+        return source.tobytes()
+    return source
+
+
+def _strip_bounds(buf) -> Tuple[int, int]:
+    """Return the (start, end) offsets of buf without surrounding whitespace."""
+    start = 0
+    end = len(buf)
+    while start < end and buf[start] in _ASCII_WHITESPACE:
+        start += 1
+    while end > start and buf[end - 1] in _ASCII_WHITESPACE:
+        end -= 1
+    return start, end
+
+
+def _iter_buffer_lines_from(buf, pos: int, end: int, line_start: List[int]) -> Iterator[str]:
+    """Yield the decoded lines of buf[pos:end], setting line_start[0] to the offset of each."""
+    find = buf.find
+    while pos < end:
+        newline = find(b'\n', pos, end)
+        if newline < 0:
+            newline = end
+        line_end = newline
+        if line_end > pos and buf[line_end - 1] == 13:  # '\r'
+            line_end -= 1
+        line_start[0] = pos
+        yield buf[pos:line_end].decode('utf-8', errors='replace')
+        pos = newline + 1
+
+
+def _iter_buffer_records(buf, detail: str, start: int = 0, end: Optional[int] = None,
+                         file_filter: Optional[FileFilter] = None) -> Iterator[Union[FileDiff, DiffTotals]]:
+    """
+    Parse a diff held in a bytes-like buffer without decoding or copying change lines.
+
+    Lines are located with find() over buf[start:end]. Added, removed and context
+    lines are classified by their first byte and recorded as offsets into the
+    buffer; only header lines are decoded. Like _DiffState.scan(), the state is
+    kept in local variables between header lines. Sections excluded by the
+    file filter are skipped with a single find() for the next file header, or
+    line by line for sections of snippets without 'diff --git' lines.
+    """
+    if end is None:
+        end = len(buf)
+
+    state = _DiffState(detail, buffer=buf, file_filter=file_filter)
+    header = state.header
+    capped = state.capped
+    within_budget = state._within_budget
+    find = buf.find
+    total_added = 0
+    total_removed = 0
+
+    pos = start
+    while pos < end:
+        if state.skip_marker == _SNIPPET_HEADER:
+            # Excluded snippet section: its end depends on the hunk counts, so go line by line
+            line_start = [pos]
+            if state._skip_lines(_iter_buffer_lines_from(buf, pos, end, line_start)) is None:
+                break
+            state.skip_marker = None
+            pos = line_start[0]
+        elif state.skip_marker is not None:
+            # Excluded file section: jump to the next file header (pos follows a '\n')
+            found = find(b'\n' + state.skip_marker.encode(), pos - 1, end)
+            state.skip_marker = None
+            if found < 0:
+                break
+            pos = found + 1
+
+        # (Re)load the per-hunk state
+        keep_changes = state.recording
+        in_hunk = state.in_hunk
+        current_file = state.current_file
+        added = current_file.added if in_hunk else 0
+        removed = current_file.removed if in_hunk else 0
+        old_pos = state.old_line_pos
+        new_pos = state.new_line_pos
+        old_remaining = state.old_remaining
+        new_remaining = state.new_remaining
+        if in_hunk and keep_changes:
+            hunk = state.current_hunk
+            kinds_append = hunk.kinds.append
+            old_append = hunk.old_lines.append
+            new_append = hunk.new_lines.append
+            starts_append = hunk._starts.append
+            ends_append = hunk._ends.append
+
+        while pos < end:
+            newline = find(b'\n', pos, end)
+            if newline < 0:
+                newline = end
+            line_start = pos
+            line_end = newline
+            pos = newline + 1
+            if line_end > line_start and buf[line_end - 1] == 13:  # '\r'
+                line_end -= 1
+            first = buf[line_start] if line_end > line_start else -1
+            # Whether the line starts with '+++' or '---'
+            triple = (first == 43 or first == 45) and line_end - line_start >= 3 \
+                and buf[line_start + 1] == first and buf[line_start + 2] == first
+
+            if in_hunk:
+                if first == 32:  # ' '
+                    old_remaining -= 1
+                    new_remaining -= 1
+                    if keep_changes and (not capped or within_budget(line_end - line_start)):
+                        kinds_append(KIND_CONTEXT)
+                        old_append(old_pos)
+                        new_append(new_pos)
+                        starts_append(line_start)
+                        ends_append(line_end)
+                    old_pos += 1
+                    new_pos += 1
+                    continue
+                if first == 43:  # '+'
+                    if new_remaining > 0 or not triple:
+                        total_added += 1
+                        added += 1
+                        new_remaining -= 1
+                        if keep_changes and (not capped or within_budget(line_end - line_start - 1)):
+                            kinds_append(KIND_ADD)
+                            old_append(old_pos)
+                            new_append(new_pos)
+                            starts_append(line_start + 1)
+                            ends_append(line_end)
+                        new_pos += 1
+                        continue
+                elif first == 45:  # '-'
+                    if old_remaining > 0 or not triple:
+                        total_removed += 1
+                        removed += 1
+                        old_remaining -= 1
+                        if keep_changes and (not capped or within_budget(line_end - line_start - 1)):
+                            kinds_append(KIND_REMOVE)
+                            old_append(old_pos)
+                            new_append(new_pos)
+                            starts_append(line_start + 1)
+                            ends_append(line_end)
+                        old_pos += 1
+                        continue
+            elif first == 43:
+                if not triple:
+                    total_added += 1
+                    continue
+            elif first == 45:
+                if not triple:
+                    total_removed += 1
+                    continue
+
+            # Anything else is a header, or context such as a bare empty line
+            state.total_added = total_added
+            state.total_removed = total_removed
+            if in_hunk:
+                current_file.added = added
+                current_file.removed = removed
+                state.old_line_pos = old_pos
+                state.new_line_pos = new_pos
+                state.old_remaining = old_remaining
+                state.new_remaining = new_remaining
+
+            done = header(buf[line_start:line_end].decode('utf-8', errors='replace'))
+            if done is _NOT_HEADER:
+                state.change(KIND_CONTEXT, line_start, line_end)
+            elif done is not None:
+                yield done
+            break
+        else:
+            state.total_added = total_added
+            state.total_removed = total_removed
+            if in_hunk:
+                current_file.added = added
+                current_file.removed = removed
+
+    done, totals = state.finish()
+    if done is not None:
+        yield done
+    yield totals
+
+
+def _iter_records(source, detail: str, strip: bool = False,
+                  file_filter: Optional[FileFilter] = None) -> Iterator[Union[FileDiff, DiffTotals]]:
+    if isinstance(source, _BUFFER_TYPES):
+        buf = _as_buffer(source)
+        start, end = _strip_bounds(buf) if strip else (0, len(buf))
+        return _iter_buffer_records(buf, detail, start, end, file_filter)
+    if strip:
+        source = source.strip()
+    return _iter_text_records(source, detail, file_filter)
+
+
+def _iter_text_records(source: Union[str, Iterable], detail: str,
+                       file_filter: Optional[FileFilter] = None) -> Iterator[Union[FileDiff, DiffTotals]]:
+    state = _DiffState(detail, file_filter=file_filter)
+    yield from state.scan(_iter_lines(source))
+
+    done, totals = state.finish()
+    if done is not None:
+        yield done
+    yield totals
+
+
+def _collect(records: Iterator[Union[FileDiff, DiffTotals]]) -> DiffResult:
+    result = DiffResult()
+    for record in records:
+        if isinstance(record, DiffTotals):
+            result.total_files_changed, result.total_lines_added, result.total_lines_removed = record
+        else:
+            result.files[record.path] = record
+    return result
+
+
+def iter_git_diff(source: Union[str, Iterable], detail: str = DETAIL_FULL,
+                  file_filter: Optional[FileFilter] = None) -> Iterator[Union[FileDiff, DiffTotals]]:
+    """
+    Parse a git diff incrementally, yielding one record per file as soon as it is complete.
+
+    Args:
+        source (Union[str, bytes, Iterable]): A file object, a subprocess pipe, any iterable of
+            (str or bytes) lines, or a whole diff as a single string or bytes-like object
+            (bytes, bytearray, memoryview, mmap).
+        detail (str): How much to materialize: "totals", "files", "hunks" or "full".
+        file_filter (Optional[FileFilter]): Which file sections to parse and how much of each to keep.
+
+    Yields:
+        FileDiff: One record per file, in diff order, once the next file header is seen.
+            Not yielded at the "totals" level.
+        DiffTotals: The overall totals, always yielded last.
+    """
+    return _iter_records(source, detail, file_filter=file_filter)
+
+
+def parse_git_diff_compact(diff_text: Union[str, bytes], detail: str = DETAIL_FULL,
+                           file_filter: Optional[FileFilter] = None) -> DiffResult:
+    """
+    Parse a git diff string into the compact DiffResult model.
+
+    Hunks keep their changes column-wise in arrays instead of one dict per line,
+    which uses a fraction of the memory of parse_git_diff on large diffs.
+    DiffResult.to_dict() returns exactly what parse_git_diff would.
+
+    Bytes-like input (bytes, bytearray, memoryview, mmap) is scanned in place: change
+    contents stay offsets into the buffer and are only decoded when accessed.
+
     Args:
-        diff_text (str): A string containing the git diff.
-    
+        diff_text (Union[str, bytes]): A string or bytes-like object containing the git diff.
+        detail (str): How much to materialize: "totals", "files", "hunks" or "full".
+        file_filter (Optional[FileFilter]): Which file sections to parse and how much of each to keep.
+
     Returns:
-        Dict: A dictionary with total stats and per-file stats, including detailed hunk information.
+        DiffResult: The overall totals and a FileDiff per path.
     """
-    #convert diff_text to string if it is None
     if diff_text is None:
         diff_text = ""
 
-    lines = diff_text.strip().splitlines()
+    return _collect(_iter_records(diff_text, detail, strip=True, file_filter=file_filter))
 
-    total_added = 0
-    total_removed = 0
-    files_stats = {}
 
-    current_file = None
-    change_type = "modified"
-    current_hunk = None
-
-    # Patterns
-    diff_git_pattern = re.compile(r'^diff --git a/(.*?) b/(.*)$')
-    new_file_pattern = re.compile(r'^new file mode')
-    deleted_file_pattern = re.compile(r'^deleted file mode')
-    plus_file_pattern = re.compile(r'^\+\+\+ b/(.*)$')
-    minus_file_pattern = re.compile(r'^--- (.*)$')
-    hunk_header_pattern = re.compile(r'^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@')
-
-    for line in lines:
-        # Start of a new file diff
-        if line.startswith("diff --git"):
-            match = diff_git_pattern.match(line)
-            if match:
-                a_path, b_path = match.groups()
-                current_file = b_path.strip()  # we use the destination path
-                change_type = "modified"  # default assumption
-                files_stats[current_file] = {
-                    'added': 0, 
-                    'removed': 0, 
-                    'change_type': change_type,
-                    'hunks': []  # Store information about each hunk
-                }
-            continue
+def parse_git_diff_file(path: Union[str, os.PathLike], detail: str = DETAIL_FULL,
+                        file_filter: Optional[FileFilter] = None) -> DiffResult:
+    """
+    Parse a git diff stored in a file by memory-mapping it.
 
-        # Detect added or deleted files
-        if new_file_pattern.match(line):
-            change_type = "added"
-            if current_file:
-                files_stats[current_file]['change_type'] = change_type
-            continue
+    Nothing is read into memory up front and change lines are never decoded
+    during parsing, so files that are not valid UTF-8 parse fine. At the "full"
+    detail level the hunks keep the mapping open and decode content on access.
 
-        if deleted_file_pattern.match(line):
-            change_type = "deleted"
-            if current_file:
-                files_stats[current_file]['change_type'] = change_type
-            continue
+    Args:
+        path (Union[str, os.PathLike]): Path to a file containing git diff output.
+        detail (str): How much to materialize: "totals", "files", "hunks" or "full".
+        file_filter (Optional[FileFilter]): Which file sections to parse and how much of each to keep.
 
-        # Handle snippets with only ---/+++ headers
-        if plus_file_pattern.match(line):
-            plus_match = plus_file_pattern.match(line)
-            current_file = plus_match.group(1).strip()
-            if current_file not in files_stats:
-                files_stats[current_file] = {
-                    'added': 0, 
-                    'removed': 0, 
-                    'change_type': change_type,
-                    'hunks': []
-                }
-            continue
+    Returns:
+        DiffResult: The overall totals and a FileDiff per path.
+    """
+    with open(path, 'rb') as diff_file:
+        if os.fstat(diff_file.fileno()).st_size == 0:
+            return DiffResult()
+        buf = mmap.mmap(diff_file.fileno(), 0, access=mmap.ACCESS_READ)
 
-        if minus_file_pattern.match(line):
-            minus_match = minus_file_pattern.match(line)
-            if minus_match.group(1) == '/dev/null':
-                change_type = "added"
-                if current_file:
-                    files_stats[current_file]['change_type'] = change_type
-            continue
+    result = _collect(_iter_buffer_records(buf, detail, *_strip_bounds(buf), file_filter))
+    if _detail_level(detail) < _DETAIL_LEVELS[DETAIL_FULL]:
+        # Nothing references the mapping below the full level
+        buf.close()
+    return result
 
-        # Hunk header
-        if line.startswith("@@"):
-            hunk_match = hunk_header_pattern.match(line)
-            if hunk_match and current_file:
-                old_start = int(hunk_match.group(1))
-                old_count = int(hunk_match.group(2)) if hunk_match.group(2) else 1
-                new_start = int(hunk_match.group(3))
-                new_count = int(hunk_match.group(4)) if hunk_match.group(4) else 1
-                
-                current_hunk = {
-                    'old_start': old_start,
-                    'old_count': old_count,
-                    'new_start': new_start,
-                    'new_count': new_count,
-                    'header': line,
-                    'changes': []
-                }
-                files_stats[current_file]['hunks'].append(current_hunk)
-                
-                # Initialize counters for tracking current line positions within the hunk
-                old_line_pos = old_start
-                new_line_pos = new_start
-            continue
 
-        # Count added lines and track their position
-        if line.startswith("+") and not line.startswith("+++"):
-            total_added += 1
-            if current_file and current_hunk is not None:
-                files_stats[current_file]['added'] += 1
-                current_hunk['changes'].append({
-                    'type': 'add',
-                    'line_number': new_line_pos,
-                    'content': line[1:]  # Remove the '+' prefix
-                })
-                new_line_pos += 1
-
-        # Count removed lines and track their position
-        elif line.startswith("-") and not line.startswith("---"):
-            total_removed += 1
-            if current_file and current_hunk is not None:
-                files_stats[current_file]['removed'] += 1
-                current_hunk['changes'].append({
-                    'type': 'remove',
-                    'line_number': old_line_pos,
-                    'content': line[1:]  # Remove the '-' prefix
-                })
-                old_line_pos += 1
-
-        # Context lines (unchanged) - need to track position
-        elif current_hunk is not None:
-            current_hunk['changes'].append({
-                'type': 'context',
-                'old_line_number': old_line_pos,
-                'new_line_number': new_line_pos,
-                'content': line
-            })
-            old_line_pos += 1
-            new_line_pos += 1
+def parse_git_diff(diff_text: Union[str, bytes], detail: str = DETAIL_FULL,
+                   file_filter: Optional[FileFilter] = None) -> Dict:
+    """
+    Parse a given git diff string to extract overall statistics and per-file statistics.
 
-    return {
-        'total_files_changed': len(files_stats),
-        'total_lines_added': total_added,
-        'total_lines_removed': total_removed,
-        'files': files_stats
-    }
\ No newline at end of file
+    Args:
+        diff_text (Union[str, bytes]): A string or bytes-like object containing the git diff.
+        detail (str): How much to materialize. "totals" leaves 'files' empty, "files" leaves
+            every 'hunks' list empty, "hunks" leaves every 'changes' list empty and "full"
+            (the default) keeps everything.
+        file_filter (Optional[FileFilter]): Which file sections to parse and how much of each
+            to keep. Excluded files are left out of 'files' and the totals.
+
+    Returns:
+        Dict: A dictionary with total stats and per-file stats, including detailed hunk information.
+    """
+    #convert diff_text to string if it is None
+    if diff_text is None:
+        diff_text = ""
+
+    files_stats = {}
+    totals = None
+
+    for record in _iter_records(diff_text, detail, strip=True, file_filter=file_filter):
+        if isinstance(record, DiffTotals):
+            totals = record
+            continue
+        files_stats[record.path] = record.to_dict()
+
+    return _result_dict(totals.total_files_changed, totals.total_lines_added, totals.total_lines_removed, files_stats)
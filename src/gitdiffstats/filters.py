@@ -0,0 +1,77 @@
+import fnmatch
+import re
+from typing import Callable, Iterable, Optional, Union
+
+
+def _compile_globs(patterns: Optional[Union[str, Iterable[str]]]):
+    """Compile glob patterns into one regex, or None if there are none."""
+    if patterns is None:
+        return None
+    if isinstance(patterns, str):
+        patterns = [patterns]
+    patterns = list(patterns)
+    if not patterns:
+        return None
+    return re.compile('|'.join(f'(?:{fnmatch.translate(pattern)})' for pattern in patterns))
+
+
+class FileFilter:
+    """
+    Which file sections of a diff to parse, and how much of each to keep.
+
+    Paths are matched against shell-style globs (fnmatch, case-sensitive) where
+    '*' also matches '/', so "*.lock" matches "web/yarn.lock" and "vendor/*"
+    matches everything below vendor/. A path is parsed if it matches one of
+    the include patterns (or there are none), none of the exclude patterns and
+    the predicate (if any) returns True for it. The decision is made at the
+    file's header; excluded sections are skipped up to the next file header
+    and are left out of the totals too.
+
+    max_lines_per_file and max_content_bytes limit how many change lines, and
+    how many bytes of their content (characters for str input), are kept per
+    file at the "full" detail level. Counts stay exact; files that hit a limit
+    are marked as truncated.
+
+    Args:
+        include (Optional[Union[str, Iterable[str]]]): Glob(s) of paths to parse.
+        exclude (Optional[Union[str, Iterable[str]]]): Glob(s) of paths to skip.
+        predicate (Optional[Callable[[str], bool]]): Called with each remaining path;
+            the section is skipped when it returns False.
+        max_lines_per_file (Optional[int]): Most change lines kept per file.
+        max_content_bytes (Optional[int]): Most bytes of change content kept per file.
+    """
+    __slots__ = ('include', 'exclude', 'predicate', 'max_lines_per_file', 'max_content_bytes',
+                 '_include', '_exclude')
+
+    def __init__(self, include: Optional[Union[str, Iterable[str]]] = None,
+                 exclude: Optional[Union[str, Iterable[str]]] = None,
+                 predicate: Optional[Callable[[str], bool]] = None,
+                 max_lines_per_file: Optional[int] = None,
+                 max_content_bytes: Optional[int] = None):
+        self.include = include
+        self.exclude = exclude
+        self.predicate = predicate
+        self.max_lines_per_file = max_lines_per_file
+        self.max_content_bytes = max_content_bytes
+        self._include = _compile_globs(include)
+        self._exclude = _compile_globs(exclude)
+
+    def accepts(self, path: str) -> bool:
+        """Return whether the file section for path should be parsed."""
+        if self._include is not None and not self._include.match(path):
+            return False
+        if self._exclude is not None and self._exclude.match(path):
+            return False
+        if self.predicate is not None and not self.predicate(path):
+            return False
+        return True
+
+    @property
+    def capped(self) -> bool:
+        """Whether content retention is limited."""
+        return self.max_lines_per_file is not None or self.max_content_bytes is not None
+
+    def __repr__(self) -> str:
+        return (f"FileFilter(include={self.include!r}, exclude={self.exclude!r}, "
+                f"predicate={self.predicate!r}, max_lines_per_file={self.max_lines_per_file!r}, "
+                f"max_content_bytes={self.max_content_bytes!r})")
@@ -0,0 +1,151 @@
+import hashlib
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+from .diffstats import (DETAIL_FULL, DETAIL_TOTALS, _BUFFER_TYPES, _as_buffer, _detail_level, _files_detail,
+                        _iter_buffer_records, _iter_text_records, _result_dict, _strip_bounds)
+from .filters import FileFilter
+from .lazy import _section_bounds
+from .model import DiffTotals
+
+
+class _ParsedSection:
+    """The parsed files and line counts of one file section."""
+    __slots__ = ('files', 'added', 'removed')
+
+    def __init__(self, files: List[Tuple[str, Dict]], added: int, removed: int):
+        self.files = files
+        self.added = added
+        self.removed = removed
+
+
+def _fingerprint(section: Union[str, bytes]) -> bytes:
+    if isinstance(section, str):
+        section = section.encode('utf-8', errors='surrogatepass')
+    return hashlib.blake2b(section, digest_size=16).digest()
+
+
+def _parse_section(source, start: int, end: int, detail: str,
+                   file_filter: Optional[FileFilter]) -> _ParsedSection:
+    if isinstance(source, str):
+        records = _iter_text_records(source[start:end], detail, file_filter)
+    else:
+        records = _iter_buffer_records(source, detail, start, end, file_filter)
+    files = []
+    totals = None
+    for record in records:
+        if isinstance(record, DiffTotals):
+            totals = record
+        else:
+            files.append((record.path, record.to_dict()))
+    return _ParsedSection(files, totals.total_lines_added, totals.total_lines_removed)
+
+
+class IncrementalResult:
+    """
+    A parse result that remembers the fingerprint of every file section it came from.
+
+    Pass it as `previous` to the next parse_git_diff_incremental call. Per-file
+    dicts of unchanged sections are shared between results, so treat them as
+    read-only.
+
+    Attributes:
+        result (Dict): The dictionary parse_git_diff returns for the diff.
+        sections (int): Number of file sections in the diff.
+        reused (int): Sections taken over from the previous result without parsing.
+        parsed (int): Sections parsed by this call.
+    """
+    __slots__ = ('result', 'sections', 'reused', 'parsed', 'detail', 'file_filter', '_parsed')
+
+    def __init__(self, result: Dict, detail: str, file_filter: Optional[FileFilter],
+                 parsed_sections: Dict[bytes, _ParsedSection], sections: int, reused: int, parsed: int):
+        self.result = result
+        self.detail = detail
+        self.file_filter = file_filter
+        self._parsed = parsed_sections
+        self.sections = sections
+        self.reused = reused
+        self.parsed = parsed
+
+    def __repr__(self) -> str:
+        return (f"IncrementalResult(sections={self.sections}, reused={self.reused}, parsed={self.parsed}, "
+                f"files={self.result['total_files_changed']})")
+
+
+def parse_git_diff_incremental(diff_text: Union[str, bytes], previous: Optional[IncrementalResult] = None,
+                               detail: str = DETAIL_FULL,
+                               file_filter: Optional[FileFilter] = None) -> IncrementalResult:
+    """
+    Parse a new version of a diff, reusing the file sections that did not change.
+
+    The diff is cut at its `diff --git` headers and each section is fingerprinted
+    (BLAKE2b of its text). Sections whose fingerprint occurs in the previous result
+    reuse its per-file entries; only new or changed sections are parsed, and the
+    totals are recomputed from all sections. Hashing is much cheaper than parsing,
+    so the cost is dominated by the changed part of the diff.
+
+    Args:
+        diff_text (Union[str, bytes]): The new diff as a string or bytes-like object.
+        previous (Optional[IncrementalResult]): What this function returned for an earlier
+            version of the diff. It is only used when detail and file_filter (the same
+            object) are those of this call; otherwise everything is parsed.
+        detail (str): How much to materialize: "totals", "files", "hunks" or "full".
+        file_filter (Optional[FileFilter]): Which file sections to parse and how much of each
+            to keep.
+
+    Returns:
+        IncrementalResult: parse_git_diff's dictionary as .result, plus the fingerprints
+            to pass to the next call.
+    """
+    _detail_level(detail)
+    inner_detail = _files_detail(detail)
+
+    if diff_text is None:
+        diff_text = ""
+    if isinstance(diff_text, _BUFFER_TYPES):
+        source = _as_buffer(diff_text)
+        start, end = _strip_bounds(source)
+    else:
+        source = diff_text.strip()
+        start, end = 0, len(source)
+
+    known = {}
+    if previous is not None and previous.detail == detail and previous.file_filter is file_filter:
+        known = previous._parsed
+
+    parsed_sections = {}
+    files_stats = {}
+    paths: Set[str] = set()
+    total_added = 0
+    total_removed = 0
+    sections = reused = parsed = 0
+    bounds = _section_bounds(source, start, end)
+    for section_start, section_end in zip(bounds, bounds[1:]):
+        # A section parses the same with or without its final newline, which the
+        # last section of a stripped diff lacks
+        hash_end = section_end
+        if source[section_end - 1:section_end] in ('\n', b'\n'):
+            hash_end -= 1
+        key = _fingerprint(source[section_start:hash_end])
+        section = parsed_sections.get(key)
+        if section is None:
+            section = known.get(key)
+            if section is None:
+                section = _parse_section(source, section_start, section_end, inner_detail, file_filter)
+                parsed += 1
+            else:
+                reused += 1
+            parsed_sections[key] = section
+        else:
+            reused += 1
+        sections += 1
+
+        total_added += section.added
+        total_removed += section.removed
+        for path, file_stats in section.files:
+            paths.add(path)
+            files_stats[path] = file_stats
+
+    if detail == DETAIL_TOTALS:
+        files_stats = {}
+    result = _result_dict(len(paths), total_added, total_removed, files_stats)
+    return IncrementalResult(result, detail, file_filter, parsed_sections, sections, reused, parsed)
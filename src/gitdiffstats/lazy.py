@@ -0,0 +1,203 @@
+import mmap
+import os
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional, Union
+
+from .diffstats import (DETAIL_FILES, DETAIL_FULL, DETAIL_HUNKS, _BUFFER_TYPES, _DIFF_GIT_PATTERN,
+                        _DIFF_GIT_QUOTED_PATTERN, _as_buffer, _iter_buffer_records, _iter_text_records,
+                        _result_dict, _strip_bounds)
+from .filters import FileFilter
+from .model import DiffTotals
+
+# Detail levels hunks can be materialized at
+_LAZY_DETAILS = (DETAIL_HUNKS, DETAIL_FULL)
+
+
+def _section_bounds(source, start: int, end: int) -> List[int]:
+    """
+    Return the offsets of every file header in source[start:end], plus start and end.
+
+    Only lines the parser itself treats as the start of a new file are used, so
+    each section parses exactly as it does as part of the whole diff.
+    """
+    is_bytes = not isinstance(source, str)
+    marker = b'\ndiff --git ' if is_bytes else '\ndiff --git '
+    newline = b'\n' if is_bytes else '\n'
+    find = source.find
+
+    bounds = [start]
+    pos = start
+    while True:
+        found = find(marker, pos, end)
+        if found < 0:
+            break
+        cut = found + 1
+        line_end = find(newline, cut, end)
+        line = source[cut:end if line_end < 0 else line_end]
+        if is_bytes:
+            line = line.decode('utf-8', errors='replace')
+        line = line.rstrip('\r')
+        if _DIFF_GIT_PATTERN.match(line) or _DIFF_GIT_QUOTED_PATTERN.match(line):
+            if cut > bounds[-1]:
+                bounds.append(cut)
+        pos = cut
+    bounds.append(end)
+    return bounds
+
+
+class _Section:
+    """One file section of the source, parsed in full the first time its hunks are needed."""
+    __slots__ = ('source', 'start', 'end', 'detail', 'file_filter', 'capped', '_files')
+
+    def __init__(self, source, start: int, end: int, detail: str, file_filter: Optional[FileFilter]):
+        self.source = source
+        self.start = start
+        self.end = end
+        self.detail = detail
+        self.file_filter = file_filter
+        self.capped = detail == DETAIL_FULL and file_filter is not None and file_filter.capped
+        self._files = None
+
+    def records(self, detail: str):
+        if isinstance(self.source, str):
+            return _iter_text_records(self.source[self.start:self.end], detail, self.file_filter)
+        return _iter_buffer_records(self.source, detail, self.start, self.end, self.file_filter)
+
+    def files(self) -> Dict[str, Dict]:
+        """Return the full per-file dicts of the section's files, parsing it on first use."""
+        if self._files is None:
+            self._files = {record.path: record.to_dict() for record in self.records(self.detail)
+                           if not isinstance(record, DiffTotals)}
+        return self._files
+
+
+class LazyFileStats(Mapping):
+    """
+    A per-file dict of parse_git_diff whose 'hunks' are parsed on first access.
+
+    The counts, change type and flags come from the first pass. Reading 'hunks'
+    parses the file's section of the source once and memoizes the result. The
+    object compares equal to the dict parse_git_diff returns for the file.
+    """
+    __slots__ = ('_stats', '_path', '_section')
+
+    def __init__(self, stats: Dict, path: str, section: _Section):
+        self._stats = stats
+        self._path = path
+        self._section = section
+
+    def _load(self) -> None:
+        if 'hunks' not in self._stats:
+            # Key order stays that of parse_git_diff: 'hunks' follows 'change_type'
+            full = self._section.files()[self._path]
+            self._stats.clear()
+            self._stats.update(full)
+
+    @property
+    def hunks_loaded(self) -> bool:
+        """Whether 'hunks' has been materialized."""
+        return 'hunks' in self._stats
+
+    def __getitem__(self, key: str):
+        if key == 'hunks' or key == 'truncated' and self._section.capped:
+            self._load()
+        return self._stats[key]
+
+    def _keys(self) -> Dict:
+        # Content limits may add 'truncated', which is only known once the hunks are parsed
+        if self._section.capped:
+            self._load()
+            return self._stats
+        if 'hunks' in self._stats:
+            return self._stats
+        keys = dict.fromkeys(('added', 'removed', 'change_type', 'hunks'))
+        keys.update(dict.fromkeys(self._stats))
+        return keys
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._keys()))
+
+    def __len__(self) -> int:
+        return len(self._keys())
+
+    def __contains__(self, key) -> bool:
+        return key in self._keys()
+
+    def to_dict(self) -> Dict:
+        """Return the file's stats as a plain dict, materializing the hunks."""
+        self._load()
+        return dict(self._stats)
+
+    def __repr__(self) -> str:
+        if self.hunks_loaded:
+            return f"LazyFileStats({self._stats!r})"
+        return f"LazyFileStats({self._stats!r}, hunks=<not loaded>)"
+
+
+def _open_source(diff_text):
+    if isinstance(diff_text, os.PathLike):
+        with open(diff_text, 'rb') as diff_file:
+            if os.fstat(diff_file.fileno()).st_size == 0:
+                return b''
+            return mmap.mmap(diff_file.fileno(), 0, access=mmap.ACCESS_READ)
+    if diff_text is None:
+        return ""
+    if isinstance(diff_text, _BUFFER_TYPES):
+        return _as_buffer(diff_text)
+    return diff_text
+
+
+def parse_git_diff_lazy(diff_text: Union[str, bytes, os.PathLike], detail: str = DETAIL_FULL,
+                        file_filter: Optional[FileFilter] = None) -> Dict:
+    """
+    Parse a diff's file headers and counts now, and each file's hunks when they are read.
+
+    The first pass cuts the diff at its file headers and parses every section at
+    the "files" detail level, remembering where the section starts and ends in
+    the source. result['files'][path] is a LazyFileStats mapping; reading its
+    'hunks' parses only that file's section, once. The source (or, for paths, the
+    memory-mapped file) is kept alive as long as the result is.
+
+    Everything compares equal to parse_git_diff's result, but the per-file values
+    are Mappings rather than dicts; call to_dict() on them (or dict(...)) where a
+    real dict is needed, e.g. for json.dumps.
+
+    Args:
+        diff_text (Union[str, bytes, os.PathLike]): The diff as a string or bytes-like
+            object, or the path of a file holding it given as os.PathLike.
+        detail (str): What the hunks are materialized with: "hunks" or "full" (the default).
+        file_filter (Optional[FileFilter]): Which file sections to parse and how much of each
+            to keep.
+
+    Returns:
+        Dict: The totals and a 'files' dict of LazyFileStats, like parse_git_diff's result.
+    """
+    if detail not in _LAZY_DETAILS:
+        raise ValueError(f"Unknown lazy detail level {detail!r}, expected one of {', '.join(_LAZY_DETAILS)}")
+
+    source = _open_source(diff_text)
+    if isinstance(source, str):
+        source = source.strip()
+        start, end = 0, len(source)
+    else:
+        start, end = _strip_bounds(source)
+
+    files_stats = {}
+    paths = set()
+    total_added = 0
+    total_removed = 0
+    bounds = _section_bounds(source, start, end)
+    for section_start, section_end in zip(bounds, bounds[1:]):
+        section = _Section(source, section_start, section_end, detail, file_filter)
+        for record in section.records(DETAIL_FILES):
+            if isinstance(record, DiffTotals):
+                total_added += record.total_lines_added
+                total_removed += record.total_lines_removed
+                continue
+            stats = record.to_dict()
+            del stats['hunks']
+            paths.add(record.path)
+            # A later section for the same path replaces the earlier one, as in parse_git_diff
+            files_stats[record.path] = LazyFileStats(stats, record.path, section)
+
+    return _result_dict(len(paths), total_added, total_removed, files_stats)
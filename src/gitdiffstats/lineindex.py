@@ -0,0 +1,159 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, Optional, Union
+
+from .model import KIND_CONTEXT, DiffResult, FileDiff, Hunk
+
+_SIDES = ("old", "new")
+
+
+def _span(start: int, count: int):
+    """Return the [lo, hi) line range of one side of a hunk."""
+    # An empty side ("-5,0") sits after line `start`
+    lo = start if count else start + 1
+    return lo, lo + count
+
+
+def _hunk_numbers(hunk):
+    """Return (old_start, old_count, new_start, new_count) of a Hunk or hunk dict."""
+    if isinstance(hunk, Hunk):
+        return hunk.old_start, hunk.old_count, hunk.new_start, hunk.new_count
+    return hunk['old_start'], hunk['old_count'], hunk['new_start'], hunk['new_count']
+
+
+def _context_pairs(hunk):
+    """Yield the (old, new) line numbers of a hunk's context lines."""
+    if isinstance(hunk, Hunk):
+        content = hunk._content
+        starts = hunk._starts
+        kinds = hunk.kinds
+        for i in range(len(kinds)):
+            # Skip "\ No newline at end of file" markers, which are not lines
+            if kinds[i] == KIND_CONTEXT and content[starts[i]:starts[i] + 1] not in ('\\', b'\\'):
+                yield hunk.old_lines[i], hunk.new_lines[i]
+    else:
+        for change in hunk['changes']:
+            if change['type'] == 'context' and not change['content'].startswith('\\'):
+                yield change['old_line_number'], change['new_line_number']
+
+
+class LineIndex:
+    """
+    Sorted hunk ranges of one file for O(log n) line lookups.
+
+    Lines outside every hunk are mapped by adding up how much the hunks before
+    them grew or shrank the file. Lines inside a hunk are mapped through its
+    context lines, which needs the changes (the "full" detail level); without
+    them such lines map to None, as do removed and added lines.
+    """
+    __slots__ = ('hunks', '_old_lo', '_old_hi', '_new_lo', '_new_hi', '_delta',
+                 '_context_old', '_context_new')
+
+    def __init__(self, file_diff: Union[FileDiff, Dict]):
+        """
+        Args:
+            file_diff (Union[FileDiff, Dict]): A FileDiff or one of the per-file dicts of
+                parse_git_diff, parsed at the "hunks" detail level or above.
+        """
+        hunks = file_diff.hunks if isinstance(file_diff, FileDiff) else file_diff['hunks']
+        self.hunks = sorted(hunks, key=_hunk_numbers)
+
+        self._old_lo = array('q')
+        self._old_hi = array('q')
+        self._new_lo = array('q')
+        self._new_hi = array('q')
+        # _delta[i]: how many lines hunks 0..i-1 added in total (negative if they removed)
+        self._delta = array('q', [0])
+        self._context_old = []
+        self._context_new = []
+
+        for hunk in self.hunks:
+            old_start, old_count, new_start, new_count = _hunk_numbers(hunk)
+            old_lo, old_hi = _span(old_start, old_count)
+            new_lo, new_hi = _span(new_start, new_count)
+            self._old_lo.append(old_lo)
+            self._old_hi.append(old_hi)
+            self._new_lo.append(new_lo)
+            self._new_hi.append(new_hi)
+            self._delta.append(self._delta[-1] + new_count - old_count)
+
+            context_old = array('q')
+            context_new = array('q')
+            for old, new in _context_pairs(hunk):
+                context_old.append(old)
+                context_new.append(new)
+            self._context_old.append(context_old)
+            self._context_new.append(context_new)
+
+    def _locate(self, line: int, side: str):
+        """Return (i, inside): the hunk at or after line and whether line falls in it."""
+        if side == "old":
+            lo, hi = self._old_lo, self._old_hi
+        elif side == "new":
+            lo, hi = self._new_lo, self._new_hi
+        else:
+            raise ValueError(f"Unknown side {side!r}, expected one of {', '.join(_SIDES)}")
+        i = bisect_right(hi, line)
+        return i, i < len(lo) and lo[i] <= line
+
+    def hunk_at(self, line: int, side: str = "new") -> Optional[Union[Hunk, Dict]]:
+        """
+        Return the hunk touching a line, if any.
+
+        Args:
+            line (int): A 1-based line number.
+            side (str): "new" if line is in the new version of the file, "old" for the old one.
+
+        Returns:
+            Optional[Union[Hunk, Dict]]: The hunk whose range contains line, or None.
+        """
+        i, inside = self._locate(line, side)
+        return self.hunks[i] if inside else None
+
+    def _map(self, line: int, side: str, sources, targets) -> Optional[int]:
+        i, inside = self._locate(line, side)
+        if not inside:
+            delta = self._delta[i]
+            return line + delta if side == "old" else line - delta
+
+        sources = sources[i]
+        j = bisect_left(sources, line)
+        if j < len(sources) and sources[j] == line:
+            return targets[i][j]
+        return None
+
+    def map_old_to_new(self, line: int) -> Optional[int]:
+        """
+        Return the new line number of old line `line`, or None if it was removed.
+
+        Also None for lines inside a hunk parsed without its changes.
+        """
+        return self._map(line, "old", self._context_old, self._context_new)
+
+    def map_new_to_old(self, line: int) -> Optional[int]:
+        """
+        Return the old line number of new line `line`, or None if it was added.
+
+        Also None for lines inside a hunk parsed without its changes.
+        """
+        return self._map(line, "new", self._context_new, self._context_old)
+
+    def __len__(self) -> int:
+        return len(self.hunks)
+
+    def __repr__(self) -> str:
+        return f"LineIndex({len(self.hunks)} hunks)"
+
+
+def build_line_indexes(result: Union[DiffResult, Dict]) -> Dict[str, LineIndex]:
+    """
+    Build a LineIndex for every file of a parsed diff.
+
+    Args:
+        result (Union[DiffResult, Dict]): A DiffResult or the dict returned by parse_git_diff.
+
+    Returns:
+        Dict[str, LineIndex]: One index per path.
+    """
+    files = result.files if isinstance(result, DiffResult) else result['files']
+    return {path: LineIndex(file_diff) for path, file_diff in files.items()}
@@ -0,0 +1,182 @@
+import re
+from itertools import chain
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+from .diffstats import DETAIL_FILES, _DiffState, _iter_lines
+from .filters import FileFilter
+from .model import CommitDiff
+
+# `git log -p` commit header, optionally followed by decorations or "(from <parent>)"
+_COMMIT_PATTERN = re.compile(r'^commit ([0-9a-f]{4,64})(?: |$)')
+# mbox separator `git format-patch` writes before every patch
+_PATCH_PATTERN = re.compile(r'^From ([0-9a-f]{4,64}) ')
+# "[PATCH]", "[PATCH v2 3/7]", ... prefixed to format-patch subjects
+_SUBJECT_PREFIX_PATTERN = re.compile(r'^\[[^\]]*\]\s*')
+
+# Signature separator format-patch appends after the last hunk
+_PATCH_SIGNATURE = "-- "
+
+
+def _until_boundary(lines: Iterator[str], pattern: re.Pattern, first: str, patch: bool,
+                    stop: List[str]) -> Iterator[str]:
+    """
+    Yield lines until the next commit header (or patch signature), which goes to stop.
+
+    Empty lines are held back until a later line shows they belong to the diff, so
+    the blank line git log puts between commits is not taken for a context line.
+    """
+    blank = 0
+    for line in lines:
+        if not line:
+            blank += 1
+            continue
+        if line[:1] == first and pattern.match(line) or patch and line == _PATCH_SIGNATURE:
+            stop.append(line)
+            return
+        while blank:
+            blank -= 1
+            yield ""
+        yield line
+
+
+class _LogReader:
+    """Splits a stream of log lines into commits, parsing one commit at a time."""
+
+    def __init__(self, lines: Iterator[str], detail: str, file_filter: Optional[FileFilter] = None):
+        self.lines = lines
+        self.detail = detail
+        self.file_filter = file_filter
+
+    def _read_metadata(self, commit: CommitDiff, patch: bool, pattern: re.Pattern) -> Optional[str]:
+        """
+        Read the commit's headers and message.
+
+        Returns:
+            Optional[str]: The line that ended the metadata: the first "diff --git" line, the
+                next commit header, or None at the end of the input.
+        """
+        message = []
+        in_headers = True
+        in_message = True
+        last_key = None
+        for line in self.lines:
+            if line.startswith("diff --git"):
+                break
+            if pattern.match(line):
+                break
+
+            if in_headers:
+                if not line:
+                    in_headers = False
+                    if patch and message:
+                        message.append("")
+                    continue
+                if patch and line[:1] in (" ", "\t") and last_key == "Subject":
+                    # Folded Subject header
+                    message[-1] += " " + line.strip()
+                    continue
+                key, _, value = line.partition(":")
+                last_key = key
+                if key == "Author" or patch and key == "From":
+                    commit.author = value.strip()
+                elif key in ("Date", "AuthorDate") and commit.date is None:
+                    commit.date = value.strip()
+                elif patch and key == "Subject":
+                    message.append(_SUBJECT_PREFIX_PATTERN.sub("", value.strip()))
+            elif not in_message:
+                continue
+            elif patch:
+                # The message ends at the "---" line in front of the diffstat
+                if line == "---":
+                    in_message = False
+                else:
+                    message.append(line)
+            elif line.startswith("    ") or not line:
+                message.append(line[4:])
+            else:
+                # Whatever follows the indented message, e.g. a combined (--cc) diff
+                in_message = False
+        else:
+            line = None
+
+        commit.message = "\n".join(message).strip()
+        return line
+
+    def read_commit(self, header: str) -> Tuple[CommitDiff, Optional[str]]:
+        """Parse the commit starting at header; return it and the next commit's header, if any."""
+        patch = header.startswith("From ")
+        pattern = _PATCH_PATTERN if patch else _COMMIT_PATTERN
+        commit = CommitDiff(pattern.match(header).group(1))
+
+        line = self._read_metadata(commit, patch, pattern)
+        if line is None or not line.startswith("diff --git"):
+            return commit, line
+
+        # The commit's diff, parsed like any other until the next commit header
+        state = _DiffState(self.detail, file_filter=self.file_filter)
+        files = commit.files
+        lines = chain((line,), self.lines)
+        while True:
+            stop = []
+            for record in state.scan(_until_boundary(lines, pattern, header[0], patch, stop)):
+                files[record.path] = record
+            line = stop[0] if stop else None
+            if line != _PATCH_SIGNATURE or state.old_remaining <= 0:
+                break
+            # A removed "- " line rather than the signature; the hunk still expects it
+            done = state.push(line)
+            if done is not None:
+                files[done.path] = done
+            lines = self.lines
+
+        done, totals = state.finish()
+        if done is not None:
+            files[done.path] = done
+        commit.total_files_changed, commit.total_lines_added, commit.total_lines_removed = totals
+
+        if line == _PATCH_SIGNATURE:
+            # Skip the signature (the git version) up to the next patch
+            for line in self.lines:
+                if pattern.match(line):
+                    return commit, line
+            return commit, None
+        return commit, line
+
+
+def iter_git_log(source: Union[str, bytes, Iterable],
+                 detail: str = DETAIL_FILES,
+                 file_filter: Optional[FileFilter] = None) -> Iterator[CommitDiff]:
+    """
+    Parse `git log -p` or `git format-patch` output, yielding one commit at a time.
+
+    Only the commit being parsed is held in memory, so the whole history of a
+    repository can be streamed from a pipe in one pass. Each commit's diff is
+    parsed on its own, so a file changed by several commits shows up in each.
+    Commits without a diff (e.g. merges, unless -m is used) have no files;
+    combined diffs (--cc) are skipped.
+
+    Args:
+        source (Union[str, bytes, Iterable]): The log output as a string or bytes-like
+            object, or any iterable of (str or bytes) lines such as a file object or
+            a subprocess pipe.
+        detail (str): How much of each diff to keep: "totals", "files" (the default),
+            "hunks" or "full".
+        file_filter (Optional[FileFilter]): Which file sections of each commit to parse and
+            how much of each to keep.
+
+    Yields:
+        CommitDiff: The sha, author, date and message of each commit, in log order,
+            with its totals and per-file statistics.
+    """
+    lines = _iter_lines(source)
+    reader = _LogReader(lines, detail, file_filter)
+
+    header = None
+    for line in lines:
+        if _COMMIT_PATTERN.match(line) or _PATCH_PATTERN.match(line):
+            header = line
+            break
+
+    while header is not None:
+        commit, header = reader.read_commit(header)
+        yield commit
@@ -0,0 +1,209 @@
+from array import array
+from typing import Dict, List, NamedTuple, Optional, Union
+
+# Change kinds as stored in Hunk.kinds
+KIND_CONTEXT = 0
+KIND_ADD = 1
+KIND_REMOVE = 2
+
+
+class DiffTotals(NamedTuple):
+    """
+    Overall statistics, yielded by iter_git_diff after the last FileDiff.
+    """
+    total_files_changed: int
+    total_lines_added: int
+    total_lines_removed: int
+
+
+class Hunk:
+    """
+    A single hunk with its changes stored column-wise.
+
+    Change i has kind kinds[i] (one of KIND_CONTEXT, KIND_ADD, KIND_REMOVE),
+    old/new line positions old_lines[i]/new_lines[i] and its content at
+    _content[_starts[i]:_ends[i]]. While the hunk is being parsed, contents
+    are collected in a list and joined into a single string by seal().
+
+    Hunks parsed from bytes or a memory-mapped file instead keep a reference
+    to that buffer in _content and decode a change's content only when it
+    is accessed.
+    """
+    __slots__ = ('old_start', 'old_count', 'new_start', 'new_count', 'header',
+                 'kinds', 'old_lines', 'new_lines', '_content', '_starts', '_ends')
+
+    def __init__(self, old_start: int, old_count: int, new_start: int, new_count: int, header: str):
+        self.old_start = old_start
+        self.old_count = old_count
+        self.new_start = new_start
+        self.new_count = new_count
+        self.header = header
+        self.kinds = array('B')
+        self.old_lines = array('I')
+        self.new_lines = array('I')
+        self._content = ''
+        self._starts = array('Q')
+        self._ends = array('Q')
+
+    def seal(self, contents: List[str]) -> None:
+        """Store the collected change contents as one string plus offsets."""
+        starts = self._starts
+        ends = self._ends
+        pos = 0
+        for text in contents:
+            starts.append(pos)
+            pos += len(text)
+            ends.append(pos)
+        self._content = ''.join(contents)
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def raw_content(self, i: int) -> Union[str, bytes]:
+        """Return the content of change i without decoding it."""
+        return self._content[self._starts[i]:self._ends[i]]
+
+    def content(self, i: int) -> str:
+        """Return the content of change i."""
+        text = self._content[self._starts[i]:self._ends[i]]
+        if isinstance(text, str):
+            return text
+        return text.decode('utf-8', errors='replace')
+
+    def changes(self) -> List[Dict]:
+        """Return the changes as the list of dicts parse_git_diff has always produced."""
+        content = self._content
+        if isinstance(content, str):
+            texts = [content[start:end] for start, end in zip(self._starts, self._ends)]
+        else:
+            texts = [content[start:end].decode('utf-8', errors='replace')
+                     for start, end in zip(self._starts, self._ends)]
+
+        changes = []
+        append = changes.append
+        for kind, old, new, text in zip(self.kinds, self.old_lines, self.new_lines, texts):
+            if kind == KIND_ADD:
+                append({'type': 'add', 'line_number': new, 'content': text})
+            elif kind == KIND_REMOVE:
+                append({'type': 'remove', 'line_number': old, 'content': text})
+            else:
+                append({'type': 'context', 'old_line_number': old, 'new_line_number': new,
+                        'content': text})
+        return changes
+
+    def to_dict(self) -> Dict:
+        return {
+            'old_start': self.old_start,
+            'old_count': self.old_count,
+            'new_start': self.new_start,
+            'new_count': self.new_count,
+            'header': self.header,
+            'changes': self.changes()
+        }
+
+    def __repr__(self) -> str:
+        return f"Hunk({self.header!r}, {len(self)} changes)"
+
+
+class FileDiff:
+    """
+    A completed per-file record produced by iter_git_diff.
+
+    binary is True for files git reports as binary ("Binary files ... differ"),
+    which have no line counts or hunks. truncated is True when a FileFilter
+    limit stopped the file's changes from being kept; its counts are still exact.
+    """
+    __slots__ = ('path', 'change_type', 'added', 'removed', 'hunks', 'binary', 'truncated')
+
+    def __init__(self, path: str, change_type: str = "modified", added: int = 0, removed: int = 0,
+                 hunks: Optional[List[Hunk]] = None, binary: bool = False, truncated: bool = False):
+        self.path = path
+        self.change_type = change_type
+        self.added = added
+        self.removed = removed
+        self.hunks = [] if hunks is None else hunks
+        self.binary = binary
+        self.truncated = truncated
+
+    def to_dict(self) -> Dict:
+        """Return the per-file dict of parse_git_diff; 'binary' and 'truncated' are only added when True."""
+        file_stats = {
+            'added': self.added,
+            'removed': self.removed,
+            'change_type': self.change_type,
+            'hunks': [hunk.to_dict() for hunk in self.hunks]
+        }
+        if self.binary:
+            file_stats['binary'] = True
+        if self.truncated:
+            file_stats['truncated'] = True
+        return file_stats
+
+    def __repr__(self) -> str:
+        return (f"FileDiff({self.path!r}, {self.change_type!r}, added={self.added}, "
+                f"removed={self.removed}, hunks={len(self.hunks)}"
+                f"{', binary=True' if self.binary else ''}{', truncated=True' if self.truncated else ''})")
+
+
+class DiffResult:
+    """
+    Compact equivalent of the dictionary returned by parse_git_diff.
+    """
+    __slots__ = ('total_files_changed', 'total_lines_added', 'total_lines_removed', 'files')
+
+    def __init__(self, total_files_changed: int = 0, total_lines_added: int = 0,
+                 total_lines_removed: int = 0, files: Optional[Dict[str, FileDiff]] = None):
+        self.total_files_changed = total_files_changed
+        self.total_lines_added = total_lines_added
+        self.total_lines_removed = total_lines_removed
+        self.files = {} if files is None else files
+
+    def to_dict(self) -> Dict:
+        """Return exactly what parse_git_diff returns for the same input."""
+        return {
+            'total_files_changed': self.total_files_changed,
+            'total_lines_added': self.total_lines_added,
+            'total_lines_removed': self.total_lines_removed,
+            'files': {path: file_diff.to_dict() for path, file_diff in self.files.items()}
+        }
+
+    def to_columns(self):
+        """Return the result as NumPy columns (see gitdiffstats.columns); needs NumPy."""
+        from .columns import to_columns
+        return to_columns(self)
+
+    def __repr__(self) -> str:
+        return (f"DiffResult(files={self.total_files_changed}, added={self.total_lines_added}, "
+                f"removed={self.total_lines_removed})")
+
+
+class CommitDiff(DiffResult):
+    """
+    One commit of `git log -p` or `git format-patch` output with its diff statistics.
+
+    The totals and files are those of the commit's own diff, as DiffResult has them.
+    """
+    __slots__ = ('sha', 'author', 'date', 'message')
+
+    def __init__(self, sha: str, author: Optional[str] = None, date: Optional[str] = None,
+                 message: str = "", total_files_changed: int = 0, total_lines_added: int = 0,
+                 total_lines_removed: int = 0, files: Optional[Dict[str, FileDiff]] = None):
+        super().__init__(total_files_changed, total_lines_added, total_lines_removed, files)
+        self.sha = sha
+        self.author = author
+        self.date = date
+        self.message = message
+
+    def to_dict(self) -> Dict:
+        """Return the commit metadata plus what parse_git_diff returns for the commit's diff."""
+        return {
+            'sha': self.sha,
+            'author': self.author,
+            'date': self.date,
+            'message': self.message,
+            **super().to_dict()
+        }
+
+    def __repr__(self) -> str:
+        return (f"CommitDiff({self.sha[:12]!r}, files={self.total_files_changed}, "
+                f"added={self.total_lines_added}, removed={self.total_lines_removed})")
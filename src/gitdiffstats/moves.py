@@ -0,0 +1,253 @@
+import re
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from .diffstats import DETAIL_FULL, _BUFFER_TYPES, parse_git_diff_compact
+from .filters import FileFilter
+from .model import KIND_ADD, KIND_REMOVE, DiffResult
+
+# Rolling hash over the per-line hashes of a window: polynomial modulo a Mersenne prime
+_MODULUS = (1 << 61) - 1
+_BASE = 1_000_003
+
+# Index entries tried per window; bounds the work on highly repetitive code
+_MAX_CANDIDATES = 8
+
+# A window of lines without any word character ("}", "", "*/") is not evidence of a move
+_SIGNIFICANT = re.compile(r'\w')
+
+
+class _Run:
+    """Consecutive added (or removed) lines of one file, with their normalized contents."""
+    __slots__ = ('path', 'start', 'lines', 'used')
+
+    def __init__(self, path: str, start: int):
+        self.path = path
+        self.start = start
+        self.lines: List[str] = []
+        # Which lines already belong to a block, set up once the run is complete
+        self.used = bytearray()
+
+
+def _iter_changes(result: Union[DiffResult, Dict]) -> Iterator[Tuple[str, List[Tuple[int, int, str]]]]:
+    """Yield each file's path and its (kind, line number, content) added and removed lines."""
+    if isinstance(result, DiffResult):
+        for path, record in result.files.items():
+            lines = []
+            for hunk in record.hunks:
+                for i, kind in enumerate(hunk.kinds):
+                    if kind == KIND_ADD:
+                        lines.append((kind, hunk.new_lines[i], hunk.content(i)))
+                    elif kind == KIND_REMOVE:
+                        lines.append((kind, hunk.old_lines[i], hunk.content(i)))
+            yield path, lines
+        return
+
+    kinds = {'add': KIND_ADD, 'remove': KIND_REMOVE}
+    for path, file_stats in result['files'].items():
+        lines = []
+        for hunk in file_stats.get('hunks', ()):
+            for change in hunk['changes']:
+                kind = kinds.get(change['type'])
+                if kind is not None:
+                    lines.append((kind, change['line_number'], change['content']))
+        yield path, lines
+
+
+def _has_contents(result: Union[DiffResult, Dict]) -> bool:
+    """Return False if result was parsed at a detail level that drops the line contents."""
+    if isinstance(result, DiffResult):
+        changed = result.total_lines_added or result.total_lines_removed
+        files = [(record.added or record.removed, record.truncated, [len(hunk) for hunk in record.hunks])
+                 for record in result.files.values()]
+    else:
+        changed = result['total_lines_added'] or result['total_lines_removed']
+        files = [(file_stats['added'] or file_stats['removed'], file_stats.get('truncated', False),
+                  [len(hunk['changes']) for hunk in file_stats['hunks']])
+                 for file_stats in result['files'].values()]
+    if changed and not files:
+        return False  # "totals"
+    for file_changed, truncated, hunk_sizes in files:
+        if truncated:
+            continue  # A FileFilter cap may leave hunks without any kept change
+        if not all(hunk_sizes):
+            return False  # "hunks"
+        if file_changed and not hunk_sizes:
+            return False  # "files"
+    return True
+
+
+def _build_runs(result: Union[DiffResult, Dict], ignore_whitespace: bool) -> Tuple[List[_Run], List[_Run]]:
+    """Split every file's removed and added lines into runs of consecutive line numbers."""
+    removed_runs = []
+    added_runs = []
+    for path, lines in _iter_changes(result):
+        previous = {KIND_ADD: None, KIND_REMOVE: None}
+        runs = {KIND_ADD: added_runs, KIND_REMOVE: removed_runs}
+        for kind, line_number, content in lines:
+            if ignore_whitespace:
+                content = ' '.join(content.split())
+            if previous[kind] is None or line_number != previous[kind] + 1:
+                runs[kind].append(_Run(path, line_number))
+            runs[kind][-1].lines.append(content)
+            previous[kind] = line_number
+    for run in removed_runs:
+        run.used = bytearray(len(run.lines))
+    return removed_runs, added_runs
+
+
+def _window_hashes(lines: List[str], k: int) -> List[int]:
+    """
+    Return the rolling hash of every k-line window of lines, or -1 for insignificant windows.
+    """
+    count = len(lines) - k + 1
+    if count <= 0:
+        return []
+    line_hashes = [hash(line) % _MODULUS for line in lines]
+    significant = [1 if _SIGNIFICANT.search(line) else 0 for line in lines]
+    top = pow(_BASE, k - 1, _MODULUS)
+
+    value = 0
+    words = 0
+    for i in range(k):
+        value = (value * _BASE + line_hashes[i]) % _MODULUS
+        words += significant[i]
+    hashes = [value if words else -1]
+    for i in range(1, count):
+        value = ((value - line_hashes[i - 1] * top) * _BASE + line_hashes[i + k - 1]) % _MODULUS
+        words += significant[i + k - 1] - significant[i - 1]
+        hashes.append(value if words else -1)
+    return hashes
+
+
+def _extend(added: _Run, i: int, removed: _Run, offset: int, k: int) -> int:
+    """Return how many lines match from added.lines[i] and removed.lines[offset] on, or 0 if fewer than k."""
+    a_lines, r_lines, used = added.lines, removed.lines, removed.used
+    if a_lines[i:i + k] != r_lines[offset:offset + k] or any(used[offset:offset + k]):
+        return 0
+    length = k
+    limit = min(len(a_lines) - i, len(r_lines) - offset)
+    while length < limit and not used[offset + length] and a_lines[i + length] == r_lines[offset + length]:
+        length += 1
+    return length
+
+
+def detect_moves(diff: Union[str, bytes, Dict, DiffResult], k: int = 3, min_lines: Optional[int] = None,
+                 ignore_whitespace: bool = True, file_filter: Optional[FileFilter] = None) -> Dict:
+    """
+    Find blocks of lines that were removed in one place and added in another.
+
+    Removed and added lines are normalized (whitespace collapsed) and split into
+    runs of consecutive lines per file. Every k-line window of the removed runs
+    is put in a hash index keyed by a rolling hash; the added runs are then
+    scanned window by window, and each hit whose lines really are equal is
+    extended as far as both sides match. Each line belongs to at most one
+    block. The work is linear in the number of changed lines: windows made of
+    blank lines or punctuation only are not indexed, and at most a few index
+    entries are tried per window.
+
+    Moves within one file (including re-indented blocks) are reported too. The
+    net churn leaves the moved lines out of the added and removed counts.
+
+    Args:
+        diff (Union[str, bytes, Dict, DiffResult]): A diff, or what parse_git_diff or
+            parse_git_diff_compact returned for one at the "full" detail level.
+        k (int): Lines per hashed window; shorter matches are never found.
+        min_lines (Optional[int]): Smallest block to report, at least k (the default).
+        ignore_whitespace (bool): Compare lines with leading, trailing and repeated
+            whitespace collapsed; False compares them exactly.
+        file_filter (Optional[FileFilter]): Which file sections to parse, when diff is text.
+            Only the lines a capped filter keeps can be part of moved blocks.
+
+    Returns:
+        Dict: 'moved_lines' (lines in moved blocks, counted once), 'total_lines_added' and
+            'total_lines_removed', the 'net_lines_added' and 'net_lines_removed' without
+            moved lines, the 'blocks' (each with 'from_path', 'from_line', 'to_path',
+            'to_line' and 'lines', in the order of the added lines) and, for every file,
+            its 'moved_in', 'moved_out', 'net_added' and 'net_removed' counts in 'files'.
+
+    Raises:
+        ValueError: If k is less than 1, or the result was parsed without line contents.
+    """
+    if k < 1:
+        raise ValueError(f"k must be at least 1, got {k}")
+    min_lines = k if min_lines is None else max(min_lines, k)
+    if diff is None or isinstance(diff, (str, *_BUFFER_TYPES)):
+        diff = parse_git_diff_compact(diff, DETAIL_FULL, file_filter=file_filter)
+
+    if isinstance(diff, DiffResult):
+        total_added, total_removed = diff.total_lines_added, diff.total_lines_removed
+        counts = {path: (record.added, record.removed) for path, record in diff.files.items()}
+    else:
+        total_added, total_removed = diff['total_lines_added'], diff['total_lines_removed']
+        counts = {path: (file_stats['added'], file_stats['removed']) for path, file_stats in diff['files'].items()}
+    if not _has_contents(diff):
+        raise ValueError("Moved code detection needs a result parsed with detail \"full\"")
+
+    removed_runs, added_runs = _build_runs(diff, ignore_whitespace)
+
+    index: Dict[int, List[Tuple[_Run, int]]] = {}
+    for run in removed_runs:
+        for offset, value in enumerate(_window_hashes(run.lines, k)):
+            if value >= 0:
+                entries = index.get(value)
+                if entries is None:
+                    index[value] = [(run, offset)]
+                else:
+                    entries.append((run, offset))
+
+    blocks = []
+    moved_in = dict.fromkeys(counts, 0)
+    moved_out = dict.fromkeys(counts, 0)
+    for run in added_runs:
+        hashes = _window_hashes(run.lines, k)
+        i = 0
+        while i < len(hashes):
+            best = best_run = best_offset = 0
+            entries = index.get(hashes[i]) if hashes[i] >= 0 else None
+            j = tried = 0
+            while entries and j < len(entries) and tried < _MAX_CANDIDATES:
+                removed, offset = entries[j]
+                if removed.used[offset]:
+                    # Taken by an earlier block; drop it so it is not looked at again
+                    entries[j] = entries[-1]
+                    entries.pop()
+                    continue
+                j += 1
+                tried += 1
+                length = _extend(run, i, removed, offset, k)
+                if length > best:
+                    best, best_run, best_offset = length, removed, offset
+            if best < min_lines:
+                i += 1
+                continue
+
+            best_run.used[best_offset:best_offset + best] = b'\x01' * best
+            blocks.append({
+                'from_path': best_run.path,
+                'from_line': best_run.start + best_offset,
+                'to_path': run.path,
+                'to_line': run.start + i,
+                'lines': best
+            })
+            moved_out[best_run.path] += best
+            moved_in[run.path] += best
+            i += best
+
+    moved = sum(block['lines'] for block in blocks)
+    files = {}
+    for path, (added, removed) in counts.items():
+        files[path] = {
+            'moved_in': moved_in[path],
+            'moved_out': moved_out[path],
+            'net_added': added - moved_in[path],
+            'net_removed': removed - moved_out[path]
+        }
+    return {
+        'moved_lines': moved,
+        'total_lines_added': total_added,
+        'total_lines_removed': total_removed,
+        'net_lines_added': total_added - moved,
+        'net_lines_removed': total_removed - moved,
+        'blocks': blocks,
+        'files': files
+    }
@@ -0,0 +1,165 @@
+import mmap
+import os
+import sys
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple, Union
+
+from .diffstats import (DETAIL_FULL, DETAIL_TOTALS, _DIFF_GIT_PATTERN, _as_buffer, _detail_level,
+                        _files_detail, _iter_buffer_records, _iter_records, _result_dict, _strip_bounds)
+from .filters import FileFilter
+from .model import DiffTotals
+
+# Chunks handed out per worker, so uneven file sizes still balance out
+_CHUNKS_PER_WORKER = 4
+
+
+def _gil_disabled() -> bool:
+    is_gil_enabled = getattr(sys, '_is_gil_enabled', None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+
+def _chunk_bounds(buf, start: int, end: int, chunks: int) -> List[int]:
+    """
+    Split buf[start:end] into at most `chunks` contiguous pieces at file headers.
+
+    Only cuts at lines the parser itself treats as the start of a new file, so
+    every piece parses exactly as it would as part of the whole diff.
+    """
+    is_bytes = not isinstance(buf, str)
+    marker = b'\ndiff --git a/' if is_bytes else '\ndiff --git a/'
+    newline = b'\n' if is_bytes else '\n'
+    target = max(1, (end - start) // max(1, chunks))
+
+    bounds = [start]
+    pos = start + target
+    while pos < end:
+        found = buf.find(marker, pos - 1, end)
+        if found < 0:
+            break
+        cut = found + 1
+        line_end = buf.find(newline, cut, end)
+        line = buf[cut:end if line_end < 0 else line_end]
+        if is_bytes:
+            line = line.decode('utf-8', errors='replace')
+        if _DIFF_GIT_PATTERN.match(line.rstrip('\r')):
+            bounds.append(cut)
+            pos = cut + target
+        else:
+            pos = cut + 1
+    bounds.append(end)
+    return bounds
+
+
+def _summarize(records, detail: str) -> Tuple[Dict, List[str], int, int]:
+    files = {}
+    totals = None
+    for record in records:
+        if isinstance(record, DiffTotals):
+            totals = record
+        else:
+            files[record.path] = record.to_dict()
+    paths = list(files)
+    if detail == DETAIL_TOTALS:
+        files = {}
+    return files, paths, totals.total_lines_added, totals.total_lines_removed
+
+
+def _parse_chunk(chunk, detail: str, file_filter: Optional[FileFilter] = None):
+    return _summarize(_iter_records(chunk, _files_detail(detail), file_filter=file_filter), detail)
+
+
+def _parse_file_chunk(path: str, start: int, end: int, detail: str,
+                      file_filter: Optional[FileFilter] = None):
+    with open(path, 'rb') as diff_file:
+        buf = mmap.mmap(diff_file.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        return _summarize(_iter_buffer_records(buf, _files_detail(detail), start, end, file_filter), detail)
+    finally:
+        buf.close()
+
+
+def parse_git_diff_parallel(text_or_path: Union[str, bytes, os.PathLike], workers: Optional[int] = None,
+                            detail: str = DETAIL_FULL, executor: Optional[Executor] = None,
+                            file_filter: Optional[FileFilter] = None) -> Dict:
+    """
+    Parse a large git diff on several cores by splitting it at file boundaries.
+
+    File sections are independent, so the diff is cut at `diff --git` lines into
+    contiguous chunks that are parsed by a process pool (a thread pool on
+    free-threaded Python builds). The per-file results and totals are merged in
+    their original order and are identical to parse_git_diff's.
+
+    Args:
+        text_or_path (Union[str, bytes, os.PathLike]): The diff as a string or bytes-like
+            object, or the path of a file holding it. Paths must be given as os.PathLike
+            (e.g. pathlib.Path) since a plain str is treated as diff text. Workers map
+            files themselves, so only offsets are sent to them.
+        workers (Optional[int]): Number of workers, defaults to os.cpu_count().
+        detail (str): How much to materialize: "totals", "files", "hunks" or "full".
+        executor (Optional[Executor]): Run chunks on this executor instead of creating one.
+        file_filter (Optional[FileFilter]): Which file sections to parse and how much of each
+            to keep. It is sent to every worker, so with a process pool its predicate must be
+            picklable (a module-level function rather than a lambda).
+
+    Returns:
+        Dict: The same dictionary parse_git_diff returns for the whole diff.
+    """
+    _detail_level(detail)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    chunks = workers * _CHUNKS_PER_WORKER
+
+    if isinstance(text_or_path, os.PathLike):
+        path = os.fspath(text_or_path)
+        with open(path, 'rb') as diff_file:
+            if os.fstat(diff_file.fileno()).st_size == 0:
+                buf = None
+            else:
+                buf = mmap.mmap(diff_file.fileno(), 0, access=mmap.ACCESS_READ)
+        if buf is None:
+            tasks = [(_parse_chunk, (b'', detail, file_filter))]
+        else:
+            try:
+                bounds = _chunk_bounds(buf, *_strip_bounds(buf), chunks)
+            finally:
+                buf.close()
+            tasks = [(_parse_file_chunk, (path, start, end, detail, file_filter))
+                     for start, end in zip(bounds, bounds[1:])]
+    else:
+        source = "" if text_or_path is None else text_or_path
+        if isinstance(source, str):
+            source = source.strip()
+            start, end = 0, len(source)
+        else:
+            source = _as_buffer(source)
+            start, end = _strip_bounds(source)
+        bounds = _chunk_bounds(source, start, end, chunks)
+        tasks = [(_parse_chunk, (source[start:end], detail, file_filter))
+                 for start, end in zip(bounds, bounds[1:])]
+
+    if len(tasks) == 1 or (workers <= 1 and executor is None):
+        results = [func(*args) for func, args in tasks]
+    else:
+        own_executor = executor is None
+        if own_executor:
+            pool_class = ThreadPoolExecutor if _gil_disabled() else ProcessPoolExecutor
+            executor = pool_class(max_workers=workers)
+        try:
+            futures = [executor.submit(func, *args) for func, args in tasks]
+            results = [future.result() for future in futures]
+        finally:
+            if own_executor:
+                executor.shutdown()
+
+    files_stats = {}
+    paths = set()
+    total_added = 0
+    total_removed = 0
+    for files, chunk_paths, added, removed in results:
+        # Later sections for the same path replace earlier ones, as in parse_git_diff
+        files_stats.update(files)
+        paths.update(chunk_paths)
+        total_added += added
+        total_removed += removed
+
+    return _result_dict(len(paths), total_added, total_removed, files_stats)
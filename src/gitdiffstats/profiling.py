@@ -0,0 +1,199 @@
+import heapq
+import time
+from operator import length_hint
+from typing import Dict, List, Optional, Tuple, Union
+
+from .diffstats import (DETAIL_FULL, _BUFFER_TYPES, _NOT_HEADER, _DiffState, _as_buffer,
+                        _iter_buffer_lines, _result_dict, _strip_bounds)
+from .filters import FileFilter
+
+# Line classes counted by ParseStats, in report order
+LINE_CLASSES = ("header", "hunk_header", "added", "removed", "context", "skipped")
+
+# Phases timed by parse_git_diff_with_stats
+PHASES = ("split", "scan", "build")
+
+
+class ParseStats:
+    """
+    Counters and timings of one instrumented parse.
+
+    Attributes:
+        lines (int): Lines parsed.
+        bytes (int): Size of the input (characters for str input), surrounding
+            whitespace excluded.
+        line_classes (Dict[str, int]): Lines per class: "header" (file headers and
+            metadata such as index or mode lines), "hunk_header", "added", "removed",
+            "context" (including "\\ No newline" markers) and "skipped" (lines of
+            file sections a FileFilter excluded).
+        timings (Dict[str, float]): Wall time in seconds per phase: "split" (decoding
+            and splitting into lines), "scan" (the state machine) and "build" (the
+            result dictionary).
+        largest_files (List[Tuple[str, int]]): The (path, added + removed) pairs of the
+            files with the most changed lines, largest first. Empty at the "totals"
+            detail level.
+    """
+    __slots__ = ('lines', 'bytes', 'line_classes', 'timings', 'largest_files')
+
+    def __init__(self):
+        self.lines = 0
+        self.bytes = 0
+        self.line_classes = dict.fromkeys(LINE_CLASSES, 0)
+        self.timings = dict.fromkeys(PHASES, 0.0)
+        self.largest_files = []
+
+    @property
+    def seconds(self) -> float:
+        """Total wall time of all phases."""
+        return sum(self.timings.values())
+
+    def to_dict(self) -> Dict:
+        return {
+            'lines': self.lines,
+            'bytes': self.bytes,
+            'line_classes': dict(self.line_classes),
+            'timings': dict(self.timings),
+            'largest_files': [list(entry) for entry in self.largest_files],
+        }
+
+    def format(self) -> str:
+        """Return a human-readable multi-line report."""
+        seconds = self.seconds
+        rate = self.bytes / seconds / 1e6 if seconds else 0.0
+        out = [f"{self.lines:,} lines, {self.bytes:,} bytes in {seconds:.3f}s ({rate:.2f} MB/s)"]
+        for phase, elapsed in self.timings.items():
+            share = elapsed / seconds if seconds else 0.0
+            out.append(f"  {phase:12s} {elapsed:9.3f}s {share:6.1%}")
+        for line_class, count in self.line_classes.items():
+            share = count / self.lines if self.lines else 0.0
+            out.append(f"  {line_class:12s} {count:10,} {share:6.1%}")
+        if self.largest_files:
+            out.append("  largest files:")
+            for path, changed in self.largest_files:
+                out.append(f"    {changed:10,}  {path}")
+        return "\n".join(out)
+
+    def __repr__(self) -> str:
+        return (f"ParseStats(lines={self.lines}, bytes={self.bytes}, "
+                f"line_classes={self.line_classes!r}, timings={self.timings!r})")
+
+
+class _CountingState(_DiffState):
+    """
+    A _DiffState that classifies the lines reaching header().
+
+    Added, removed and in-hunk context lines never leave scan()'s inner loop,
+    so they are not counted one by one: added and removed come from the totals
+    and context is whatever remains. Skipped sections are measured from the
+    position of the line iterator, which must support length_hint().
+    """
+
+    def __init__(self, detail: str, file_filter: Optional[FileFilter], lines: List[str]):
+        super().__init__(detail, file_filter=file_filter)
+        self.lines = iter(lines)
+        self.line_count = len(lines)
+        self.headers = 0
+        self.hunk_headers = 0
+        self.skipped = 0
+        self._skip_start = None
+
+    def _position(self) -> int:
+        """Number of lines taken from self.lines so far."""
+        return self.line_count - length_hint(self.lines)
+
+    def header(self, line: str):
+        if self._skip_start is not None:
+            # The line ending a skipped section; it is counted below
+            self.skipped += self._position() - 1 - self._skip_start
+            self._skip_start = None
+
+        done = super().header(line)
+        if done is _NOT_HEADER:
+            if not self.in_hunk:
+                self.headers += 1
+        elif line[:2] == '@@' and self.in_hunk:
+            self.hunk_headers += 1
+        else:
+            self.headers += 1
+
+        if self.skip_marker is not None:
+            self._skip_start = self._position()
+        return done
+
+    def finish(self):
+        if self._skip_start is not None:
+            self.skipped += self.line_count - self._skip_start
+            self._skip_start = None
+        return super().finish()
+
+
+def _split(diff_text: Union[str, bytes]) -> Tuple[List[str], int]:
+    """Split diff_text into lines the way parse_git_diff does; also return its stripped size."""
+    if isinstance(diff_text, _BUFFER_TYPES):
+        buf = _as_buffer(diff_text)
+        start, end = _strip_bounds(buf)
+        return list(_iter_buffer_lines(buf[start:end])), end - start
+    text = diff_text.strip()
+    return text.splitlines(), len(text)
+
+
+def parse_git_diff_with_stats(diff_text: Union[str, bytes], detail: str = DETAIL_FULL,
+                              file_filter: Optional[FileFilter] = None,
+                              top: int = 10) -> Tuple[Dict, ParseStats]:
+    """
+    Parse a diff like parse_git_diff and report where the time went.
+
+    This is a separate, instrumented entry point: parse_git_diff itself carries
+    no counters, so leaving profiling off costs nothing. The instrumentation
+    hooks the header handling only, which keeps the per-line loop unchanged,
+    but the input is split into a list of lines up front so that each phase can
+    be timed on its own. Bytes input is therefore decoded line by line instead
+    of being parsed in place; the result is the same as parse_git_diff's.
+
+    For a function-level breakdown, run any parser under cProfile or tracemalloc
+    (see `python benchmarks/run.py --profile`).
+
+    Args:
+        diff_text (Union[str, bytes]): A string or bytes-like object containing the git diff.
+        detail (str): How much to materialize: "totals", "files", "hunks" or "full".
+        file_filter (Optional[FileFilter]): Which file sections to parse and how much of each
+            to keep.
+        top (int): How many of the largest files to list in the stats.
+
+    Returns:
+        Tuple[Dict, ParseStats]: parse_git_diff's dictionary and the stats of the parse.
+    """
+    if diff_text is None:
+        diff_text = ""
+    stats = ParseStats()
+    clock = time.perf_counter
+
+    started = clock()
+    lines, stats.bytes = _split(diff_text)
+    split_done = clock()
+
+    state = _CountingState(detail, file_filter, lines)
+    records = list(state.scan(state.lines))
+    done, totals = state.finish()
+    if done is not None:
+        records.append(done)
+    scan_done = clock()
+
+    files_stats = {}
+    for record in records:
+        files_stats[record.path] = record.to_dict()
+    result = _result_dict(totals.total_files_changed, totals.total_lines_added, totals.total_lines_removed, files_stats)
+    build_done = clock()
+
+    stats.lines = len(lines)
+    stats.timings.update(split=split_done - started, scan=scan_done - split_done, build=build_done - scan_done)
+    classes = stats.line_classes
+    classes['header'] = state.headers
+    classes['hunk_header'] = state.hunk_headers
+    classes['added'] = totals.total_lines_added
+    classes['removed'] = totals.total_lines_removed
+    classes['skipped'] = state.skipped
+    classes['context'] = stats.lines - sum(classes.values())
+    stats.largest_files = heapq.nlargest(top, ((record.path, record.added + record.removed)
+                                               for record in records), key=lambda entry: entry[1])
+    return result, stats
@@ -0,0 +1,195 @@
+import os
+import subprocess
+import tempfile
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple, Union
+
+from .diffstats import DETAIL_FILES, _detail_level, _DiffState, _iter_source_lines
+from .filters import FileFilter
+from .model import CommitDiff, DiffTotals, FileDiff
+from .parallel import _gil_disabled
+
+# Commits diffed per `git diff-tree --stdin` process
+_BATCH_SIZE = 32
+# Batches submitted ahead of the one being yielded, per worker
+_BATCHES_AHEAD = 2
+
+# rev-list format: sha, author, author date and raw message, unit/record separated
+_COMMIT_FORMAT = '%H%x1f%an <%ae>%x1f%ad%x1f%B%x1e'
+
+
+def _git(repo_path: Union[str, os.PathLike], git: str) -> List[str]:
+    # Keep the output parseable regardless of the user's git configuration
+    return [git, '-C', os.fspath(repo_path), '-c', 'core.quotePath=false']
+
+
+def _list_commits(repo_path: Union[str, os.PathLike], rev_range: Union[str, Sequence[str]],
+                  rev_list_args: Sequence[str], git: str) -> List[CommitDiff]:
+    """Return the commits of rev_range, in rev-list order, with their metadata but no diff."""
+    revs = [rev_range] if isinstance(rev_range, str) else list(rev_range)
+    command = [*_git(repo_path, git), 'rev-list', f'--format={_COMMIT_FORMAT}', *rev_list_args, *revs, '--']
+    process = subprocess.run(command, stdin=subprocess.DEVNULL, capture_output=True)
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, command, process.stdout, process.stderr)
+
+    commits = []
+    for record in process.stdout.decode('utf-8', errors='replace').split('\x1e'):
+        record = record.lstrip('\n')
+        if record.startswith('commit '):
+            # The "commit <sha>" line rev-list puts in front of every formatted commit
+            record = record.partition('\n')[2]
+        if not record:
+            continue
+        sha, author, date, message = record.split('\x1f', 3)
+        commits.append(CommitDiff(sha, author, date, message.strip()))
+    return commits
+
+
+def _until_commit(lines: Iterator[str], shas: Set[str], stop: List[str]) -> Iterator[str]:
+    """Yield lines until the header line of one of shas, which goes to stop."""
+    for line in lines:
+        if line in shas:
+            stop.append(line)
+            return
+        yield line
+
+
+def _finish(state: _DiffState, files: Dict[str, FileDiff]) -> Tuple[Dict[str, FileDiff], DiffTotals]:
+    done, totals = state.finish()
+    if done is not None:
+        files[done.path] = done
+    return files, totals
+
+
+def _diff_batch(repo_path: Union[str, os.PathLike], shas: List[str], detail: str, git_args: Sequence[str],
+                git: str, file_filter: Optional[FileFilter]) -> List[Tuple[Dict[str, FileDiff], DiffTotals]]:
+    """
+    Diff a batch of commits against their first parent with one `git diff-tree --stdin`.
+
+    diff-tree prints each commit id in front of its diff, and nothing at all for
+    commits without a diff (merges, empty commits), so the output is split at
+    lines equal to one of the batch's ids and parsed as it is read.
+    """
+    command = [*_git(repo_path, git), 'diff-tree', '--stdin', '-p', '-r', '--root', '--no-color',
+               '--no-ext-diff', *git_args]
+    diffs = {}
+    # A file for stderr cannot fill up and block git while stdout is being read
+    with tempfile.TemporaryFile() as stderr:
+        process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=stderr)
+        try:
+            process.stdin.write(''.join(f'{sha}\n' for sha in shas).encode('ascii'))
+            process.stdin.close()
+
+            lines = _iter_source_lines(process.stdout)
+            batch = set(shas)
+            stop = []
+            for line in _until_commit(lines, batch, stop):
+                pass  # Nothing precedes the first commit id
+            current = state = files = None
+            while stop:
+                sha = stop.pop()
+                if sha != current:
+                    if current is not None:
+                        diffs[current] = _finish(state, files)
+                    current = sha
+                    state = _DiffState(detail, file_filter=file_filter)
+                    files = {}
+                # With -m, a merge's id comes again before its diff against the next parent
+                for record in state.scan(_until_commit(lines, batch, stop)):
+                    files[record.path] = record
+            if current is not None:
+                diffs[current] = _finish(state, files)
+            returncode = process.wait()
+        finally:
+            if process.returncode is None:
+                process.kill()
+                process.wait()
+            process.stdout.close()
+        if returncode != 0:
+            stderr.seek(0)
+            raise subprocess.CalledProcessError(returncode, command, stderr=stderr.read())
+
+    empty = DiffTotals(0, 0, 0)
+    return [diffs.get(sha, ({}, empty)) for sha in shas]
+
+
+def repo_stats(repo_path: Union[str, os.PathLike], rev_range: Union[str, Sequence[str]] = 'HEAD',
+               workers: Optional[int] = None, detail: str = DETAIL_FILES, git_args: Sequence[str] = (),
+               rev_list_args: Sequence[str] = (), git: str = 'git', executor: Optional[Executor] = None,
+               file_filter: Optional[FileFilter] = None) -> Iterator[CommitDiff]:
+    """
+    Compute the diff statistics of every commit in a range of a local repository.
+
+    The commits are listed with one `git rev-list`; their diffs against the first
+    parent are produced by `git diff-tree --stdin -p` processes, each diffing a
+    batch of consecutive commits, on a pool of workers (processes, or threads on
+    free-threaded Python builds). Each process's output is parsed as it is read.
+    Only a few batches per worker are in flight at once, so long ranges are
+    streamed with bounded memory.
+
+    Args:
+        repo_path (Union[str, os.PathLike]): Path of the git repository.
+        rev_range (Union[str, Sequence[str]]): What to list, e.g. "v1.0..v2.0" or ["main", "^old"].
+        workers (Optional[int]): Number of workers, defaults to os.cpu_count(). With 1 (and no
+            executor), everything runs in the calling thread.
+        detail (str): How much of each diff to keep: "totals", "files" (the default), "hunks"
+            or "full".
+        git_args (Sequence[str]): Extra options for `git diff-tree`, e.g. ["-M"] or ["-m"].
+        rev_list_args (Sequence[str]): Extra options for `git rev-list`, e.g. ["--reverse"],
+            ["--no-merges"] or ["--first-parent"].
+        git (str): The git executable.
+        executor (Optional[Executor]): Run batches on this executor instead of creating one.
+        file_filter (Optional[FileFilter]): Which file sections to parse and how much of each
+            to keep. With a process pool its predicate must be picklable.
+
+    Yields:
+        CommitDiff: Each commit in rev-list order (newest first unless rev_list_args change
+            it) with its sha, author, date, message and diff statistics. Merges and empty
+            commits have no files; with "-m" in git_args, a merge's diffs against each of
+            its parents are combined.
+
+    Raises:
+        subprocess.CalledProcessError: If git exits with a non-zero status.
+    """
+    _detail_level(detail)
+    commits = _list_commits(repo_path, rev_range, rev_list_args, git)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    batches = [commits[i:i + _BATCH_SIZE] for i in range(0, len(commits), _BATCH_SIZE)]
+
+    def fill(batch: List[CommitDiff], diffs) -> Iterator[CommitDiff]:
+        for commit, (files, totals) in zip(batch, diffs):
+            commit.files = files
+            commit.total_files_changed, commit.total_lines_added, commit.total_lines_removed = totals
+            yield commit
+
+    def arguments(batch: List[CommitDiff]):
+        return repo_path, [commit.sha for commit in batch], detail, git_args, git, file_filter
+
+    if len(batches) <= 1 or (workers <= 1 and executor is None):
+        for batch in batches:
+            yield from fill(batch, _diff_batch(*arguments(batch)))
+        return
+
+    own_executor = executor is None
+    if own_executor:
+        pool_class = ThreadPoolExecutor if _gil_disabled() else ProcessPoolExecutor
+        executor = pool_class(max_workers=workers)
+    try:
+        in_flight = deque()
+        remaining = iter(batches)
+        for batch in remaining:
+            in_flight.append((batch, executor.submit(_diff_batch, *arguments(batch))))
+            if len(in_flight) >= workers * _BATCHES_AHEAD:
+                break
+        while in_flight:
+            batch, future = in_flight.popleft()
+            diffs = future.result()
+            for next_batch in remaining:
+                in_flight.append((next_batch, executor.submit(_diff_batch, *arguments(next_batch))))
+                break
+            yield from fill(batch, diffs)
+    finally:
+        if own_executor:
+            executor.shutdown(cancel_futures=True)
@@ -0,0 +1,332 @@
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Mapping
+from typing import BinaryIO, Dict, Iterator, List, Union
+
+from .columns import CHANGE_TYPE_CODES, CHANGE_TYPES
+from .model import KIND_ADD, KIND_CONTEXT, KIND_REMOVE, DiffResult, FileDiff, Hunk
+
+MAGIC = b'GDST'
+FORMAT_VERSION = 1
+
+# magic, version, reserved, totals (files changed, added, removed), file/hunk/change
+# counts, then the offsets of the string table (its size), file table, hunk table and
+# change columns
+_HEADER = struct.Struct('<4sHHQQQIIQQQQQQ')
+# path start, path length, change type, flags, added, removed, first hunk, hunk count
+_FILE = struct.Struct('<QIBBxxQQII')
+# old start, old count, new start, new count, header start, header length,
+# first change, change count
+_HUNK = struct.Struct('<IIIIQIQI')
+
+_FLAG_BINARY = 1
+_FLAG_TRUNCATED = 2
+
+# Change columns in file order: (name, array typecode); each column is padded to 8 bytes
+_CHANGE_COLUMNS = (('kinds', 'B'), ('old_lines', 'I'), ('new_lines', 'I'), ('starts', 'Q'), ('ends', 'Q'))
+
+# Columns are stored little-endian
+_BIG_ENDIAN = sys.byteorder == 'big'
+
+_CHANGE_KINDS = {'context': KIND_CONTEXT, 'add': KIND_ADD, 'remove': KIND_REMOVE}
+
+
+def _pad(size: int) -> int:
+    return -size % 8
+
+
+class _StringTable:
+    """Interned UTF-8 strings; offsets are absolute, as the table follows the header."""
+
+    def __init__(self):
+        self.data = bytearray()
+        self.offsets = {}
+
+    def add(self, text: Union[str, bytes]):
+        """Return the (start, end) file offsets of text."""
+        span = self.offsets.get(text)
+        if span is None:
+            raw = text.encode('utf-8', errors='surrogatepass') if isinstance(text, str) else bytes(text)
+            start = _HEADER.size + len(self.data)
+            self.data += raw
+            span = self.offsets[text] = (start, start + len(raw))
+        return span
+
+
+class _Writer:
+    """Builds the tables of the format from DiffResults or parse_git_diff dicts."""
+
+    def __init__(self):
+        self.strings = _StringTable()
+        self.files = bytearray()
+        self.hunks = bytearray()
+        self.columns = {name: array(typecode) for name, typecode in _CHANGE_COLUMNS}
+        self.file_count = 0
+        self.hunk_count = 0
+
+    def add_file(self, path: str, change_type: str, added: int, removed: int,
+                 binary: bool, truncated: bool, hunks: List) -> None:
+        path_start, path_end = self.strings.add(path)
+        flags = (_FLAG_BINARY if binary else 0) | (_FLAG_TRUNCATED if truncated else 0)
+        self.files += _FILE.pack(path_start, path_end - path_start, CHANGE_TYPE_CODES[change_type], flags,
+                                 added, removed, self.hunk_count, len(hunks))
+        self.file_count += 1
+        for hunk in hunks:
+            if isinstance(hunk, Hunk):
+                self._add_hunk(hunk)
+            else:
+                self._add_hunk_dict(hunk)
+
+    def _hunk_record(self, old_start: int, old_count: int, new_start: int, new_count: int,
+                     header: str, first_change: int) -> None:
+        header_start, header_end = self.strings.add(header)
+        self.hunks += _HUNK.pack(old_start, old_count, new_start, new_count, header_start,
+                                 header_end - header_start, first_change,
+                                 len(self.columns['kinds']) - first_change)
+        self.hunk_count += 1
+
+    def _add_hunk(self, hunk: Hunk) -> None:
+        columns = self.columns
+        first_change = len(columns['kinds'])
+        columns['kinds'].extend(hunk.kinds)
+        columns['old_lines'].extend(hunk.old_lines)
+        columns['new_lines'].extend(hunk.new_lines)
+        add = self.strings.add
+        content = hunk._content
+        starts = columns['starts']
+        ends = columns['ends']
+        for start, end in zip(hunk._starts, hunk._ends):
+            start, end = add(content[start:end])
+            starts.append(start)
+            ends.append(end)
+        self._hunk_record(hunk.old_start, hunk.old_count, hunk.new_start, hunk.new_count,
+                          hunk.header, first_change)
+
+    def _add_hunk_dict(self, hunk: Dict) -> None:
+        # Rebuild the line positions the parser tracks for every change, as Hunk keeps them
+        columns = self.columns
+        first_change = len(columns['kinds'])
+        add = self.strings.add
+        old_pos = hunk['old_start']
+        new_pos = hunk['new_start']
+        for change in hunk['changes']:
+            kind = _CHANGE_KINDS[change['type']]
+            if kind == KIND_ADD:
+                new_pos = change['line_number']
+            elif kind == KIND_REMOVE:
+                old_pos = change['line_number']
+            else:
+                old_pos = change['old_line_number']
+                new_pos = change['new_line_number']
+            start, end = add(change['content'])
+            columns['kinds'].append(kind)
+            columns['old_lines'].append(old_pos)
+            columns['new_lines'].append(new_pos)
+            columns['starts'].append(start)
+            columns['ends'].append(end)
+            if kind != KIND_ADD:
+                old_pos += 1
+            if kind != KIND_REMOVE:
+                new_pos += 1
+        self._hunk_record(hunk['old_start'], hunk['old_count'], hunk['new_start'], hunk['new_count'],
+                          hunk['header'], first_change)
+
+    def write(self, out: BinaryIO, totals) -> None:
+        strings = self.strings.data
+        strings_offset = _HEADER.size
+        files_offset = strings_offset + len(strings) + _pad(len(strings))
+        hunks_offset = files_offset + len(self.files) + _pad(len(self.files))
+        changes_offset = hunks_offset + len(self.hunks) + _pad(len(self.hunks))
+
+        out.write(_HEADER.pack(MAGIC, FORMAT_VERSION, 0, *totals, self.file_count, self.hunk_count,
+                               len(self.columns['kinds']), strings_offset, len(strings),
+                               files_offset, hunks_offset, changes_offset))
+        for section in (strings, self.files, self.hunks):
+            out.write(section)
+            out.write(bytes(_pad(len(section))))
+        for name, _ in _CHANGE_COLUMNS:
+            column = self.columns[name]
+            if _BIG_ENDIAN and column.itemsize > 1:
+                column = array(column.typecode, column)
+                column.byteswap()
+            data = column.tobytes()
+            out.write(data)
+            out.write(bytes(_pad(len(data))))
+
+
+def write_result(result: Union[DiffResult, Dict], file: Union[str, os.PathLike, BinaryIO]) -> None:
+    """
+    Store a parsed diff in the gitdiffstats binary format.
+
+    The file holds a fixed header, one table of interned UTF-8 strings (paths, hunk
+    headers and change contents), fixed-width records for files and hunks, and the
+    changes as fixed-width columns. open_result maps it back without parsing.
+
+    Args:
+        result (Union[DiffResult, Dict]): A DiffResult or the dict returned by parse_git_diff.
+        file (Union[str, os.PathLike, BinaryIO]): The path to write, or a binary file object.
+    """
+    writer = _Writer()
+    if isinstance(result, DiffResult):
+        for path, file_diff in result.files.items():
+            writer.add_file(path, file_diff.change_type, file_diff.added, file_diff.removed,
+                            file_diff.binary, file_diff.truncated, file_diff.hunks)
+        totals = (result.total_files_changed, result.total_lines_added, result.total_lines_removed)
+    else:
+        for path, file_stats in result['files'].items():
+            writer.add_file(path, file_stats['change_type'], file_stats['added'], file_stats['removed'],
+                            file_stats.get('binary', False), file_stats.get('truncated', False),
+                            file_stats['hunks'])
+        totals = (result['total_files_changed'], result['total_lines_added'], result['total_lines_removed'])
+
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, 'wb') as out:
+            writer.write(out, totals)
+    else:
+        writer.write(file, totals)
+
+
+class _StoredFiles(Mapping):
+    """Path -> FileDiff view of a stored result; records are decoded on access."""
+
+    def __init__(self, stored: 'StoredResult'):
+        self._stored = stored
+        self._index = None
+
+    def _paths(self) -> Dict[str, int]:
+        if self._index is None:
+            stored = self._stored
+            self._index = {stored._path(i): i for i in range(stored.file_count)}
+        return self._index
+
+    def __getitem__(self, path: str) -> FileDiff:
+        return self._stored._file(self._paths()[path])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._paths())
+
+    def __len__(self) -> int:
+        return self._stored.file_count
+
+    def __contains__(self, path) -> bool:
+        return path in self._paths()
+
+
+class StoredResult:
+    """
+    A diff stored by write_result, memory-mapped and decoded lazily.
+
+    Opening a file reads only its header. Looking up a file decodes that file's
+    record and hunks; change contents stay in the mapping and are decoded when
+    accessed, as for diffs parsed from bytes.
+
+    Attributes:
+        total_files_changed / total_lines_added / total_lines_removed (int): The totals.
+        files (Mapping[str, FileDiff]): The files by path, in diff order.
+    """
+
+    def __init__(self, path: Union[str, os.PathLike]):
+        with open(path, 'rb') as stored_file:
+            if os.fstat(stored_file.fileno()).st_size < _HEADER.size:
+                raise ValueError(f"{os.fspath(path)!r} is not a gitdiffstats result file")
+            self._buf = mmap.mmap(stored_file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._buf[:4] != MAGIC:
+            self._buf.close()
+            raise ValueError(f"{os.fspath(path)!r} is not a gitdiffstats result file")
+        (_, version, _, self.total_files_changed, self.total_lines_added, self.total_lines_removed,
+         self.file_count, self.hunk_count, self.change_count, _, _, self._files_offset,
+         self._hunks_offset, self._changes_offset) = _HEADER.unpack_from(self._buf)
+        if version > FORMAT_VERSION:
+            self._buf.close()
+            raise ValueError(f"Unsupported gitdiffstats result format version {version}, "
+                             f"expected at most {FORMAT_VERSION}")
+
+        # Where each change column starts
+        self._columns = {}
+        offset = self._changes_offset
+        for name, typecode in _CHANGE_COLUMNS:
+            self._columns[name] = (offset, typecode)
+            size = array(typecode).itemsize * self.change_count
+            offset += size + _pad(size)
+        self.files = _StoredFiles(self)
+
+    def _string(self, start: int, length: int) -> str:
+        return self._buf[start:start + length].decode('utf-8', errors='replace')
+
+    def _path(self, i: int) -> str:
+        path_start, path_length = struct.unpack_from('<QI', self._buf, self._files_offset + i * _FILE.size)
+        return self._string(path_start, path_length)
+
+    def _column(self, name: str, first: int, count: int) -> array:
+        offset, typecode = self._columns[name]
+        column = array(typecode)
+        start = offset + first * column.itemsize
+        column.frombytes(self._buf[start:start + count * column.itemsize])
+        if _BIG_ENDIAN and column.itemsize > 1:
+            column.byteswap()
+        return column
+
+    def _hunk(self, i: int) -> Hunk:
+        (old_start, old_count, new_start, new_count, header_start, header_length,
+         first_change, change_count) = _HUNK.unpack_from(self._buf, self._hunks_offset + i * _HUNK.size)
+        hunk = Hunk(old_start, old_count, new_start, new_count, self._string(header_start, header_length))
+        if change_count:
+            hunk.kinds = self._column('kinds', first_change, change_count)
+            hunk.old_lines = self._column('old_lines', first_change, change_count)
+            hunk.new_lines = self._column('new_lines', first_change, change_count)
+            hunk._starts = self._column('starts', first_change, change_count)
+            hunk._ends = self._column('ends', first_change, change_count)
+            hunk._content = self._buf
+        return hunk
+
+    def _file(self, i: int) -> FileDiff:
+        (path_start, path_length, change_type, flags, added, removed,
+         first_hunk, hunk_count) = _FILE.unpack_from(self._buf, self._files_offset + i * _FILE.size)
+        return FileDiff(self._string(path_start, path_length), CHANGE_TYPES[change_type], added, removed,
+                        [self._hunk(first_hunk + j) for j in range(hunk_count)],
+                        binary=bool(flags & _FLAG_BINARY), truncated=bool(flags & _FLAG_TRUNCATED))
+
+    def to_result(self) -> DiffResult:
+        """Decode every file record into a DiffResult; contents still reference the mapping."""
+        files = {}
+        for i in range(self.file_count):
+            file_diff = self._file(i)
+            files[file_diff.path] = file_diff
+        return DiffResult(self.total_files_changed, self.total_lines_added, self.total_lines_removed, files)
+
+    def to_dict(self) -> Dict:
+        """Return the dict parse_git_diff returned for the stored diff."""
+        return self.to_result().to_dict()
+
+    def close(self) -> None:
+        """Unmap the file; records decoded earlier must not be used afterwards."""
+        self._buf.close()
+
+    def __enter__(self) -> 'StoredResult':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return (f"StoredResult(files={self.total_files_changed}, added={self.total_lines_added}, "
+                f"removed={self.total_lines_removed})")
+
+
+def open_result(path: Union[str, os.PathLike]) -> StoredResult:
+    """
+    Memory-map a result stored by write_result.
+
+    Args:
+        path (Union[str, os.PathLike]): The file to open.
+
+    Returns:
+        StoredResult: The totals, plus the files decoded on access.
+
+    Raises:
+        ValueError: If the file is not in the format or is of a newer format version.
+    """
+    return StoredResult(path)
@@ -0,0 +1,209 @@
+import re
+from typing import Dict, Union
+
+from .diffstats import _result_dict, _unquote_path
+
+# `git diff --raw` status letters that tell the change type
+_RAW_CHANGE_TYPES = {'A': "added", 'D': "deleted"}
+
+# `--summary` lines: " create mode 100644 path", " delete mode 100644 path"
+_SUMMARY_PATTERN = re.compile(r'^ (create|delete) mode \d+ (.*)$')
+_SUMMARY_CHANGE_TYPES = {'create': "added", 'delete': "deleted"}
+
+# " 3 files changed, 10 insertions(+), 2 deletions(-)", either count may be missing
+_SHORTSTAT_PATTERN = re.compile(
+    r'^\s*(\d+) files? changed(?:, (\d+) insertions?\(\+\))?(?:, (\d+) deletions?\(-\))?\s*$'
+)
+
+# "dir/{old => new}/file" and "old => new" in rename paths without -z
+_BRACE_RENAME_PATTERN = re.compile(r'^(.*)\{(.*) => (.*)\}(.*)$')
+
+
+def _as_text(output: Union[str, bytes]) -> str:
+    if output is None:
+        return ""
+    if isinstance(output, str):
+        return output
+    return bytes(output).decode('utf-8', errors='replace')
+
+
+def _rename_destination(path: str) -> str:
+    """Return the new path of a numstat rename entry such as "src/{a => b}/x.py"."""
+    match = _BRACE_RENAME_PATTERN.match(path)
+    if match:
+        prefix, _, new, suffix = match.groups()
+        if not new:
+            # "src/{ => sub}/x.py" -> "src/sub/x.py", "src/{sub => }/x.py" -> "src/x.py"
+            suffix = suffix[1:] if suffix.startswith('/') else suffix
+        return prefix + new + suffix
+    if ' => ' in path:
+        return path.split(' => ', 1)[1]
+    return path
+
+
+class _StatCollector:
+    """Collects file-level stats from numstat, raw and summary records."""
+
+    def __init__(self):
+        self.files = {}
+
+    def _file(self, path: str) -> Dict:
+        file_stats = self.files.get(path)
+        if file_stats is None:
+            file_stats = self.files[path] = {
+                'added': 0,
+                'removed': 0,
+                'change_type': "modified",
+                'hunks': []
+            }
+        return file_stats
+
+    def numstat(self, added: str, removed: str, path: str) -> None:
+        file_stats = self._file(path)
+        if added == '-' and removed == '-':
+            file_stats['binary'] = True
+            return
+        file_stats['added'] = int(added)
+        file_stats['removed'] = int(removed)
+
+    def raw(self, status: str, path: str) -> None:
+        change_type = _RAW_CHANGE_TYPES.get(status[:1])
+        file_stats = self._file(path)
+        if change_type is not None:
+            file_stats['change_type'] = change_type
+
+    def summary(self, action: str, path: str) -> None:
+        self._file(path)['change_type'] = _SUMMARY_CHANGE_TYPES[action]
+
+    def result(self) -> Dict:
+        return _result_dict(len(self.files), sum(file_stats['added'] for file_stats in self.files.values()),
+                            sum(file_stats['removed'] for file_stats in self.files.values()), self.files)
+
+
+def _collect_lines(collector: _StatCollector, text: str) -> None:
+    for line in text.splitlines():
+        if line.startswith(':'):
+            # :100644 100644 1111111 2222222 M<TAB>path[<TAB>new path]
+            meta, _, paths = line.partition('\t')
+            paths = paths.split('\t')
+            collector.raw(meta.rsplit(' ', 1)[-1], _unquote_path(paths[-1]))
+            continue
+
+        summary = _SUMMARY_PATTERN.match(line)
+        if summary:
+            collector.summary(summary.group(1), _unquote_path(summary.group(2)))
+            continue
+
+        fields = line.split('\t', 2)
+        if len(fields) == 3 and (fields[0].isdigit() or fields[0] == '-'):
+            path = fields[2]
+            if path.startswith('"'):
+                collector.numstat(fields[0], fields[1], _unquote_path(path))
+            else:
+                collector.numstat(fields[0], fields[1], _rename_destination(path))
+        # Anything else (--shortstat totals, --summary mode changes) adds nothing
+
+
+def _collect_nul_separated(collector: _StatCollector, text: str) -> None:
+    fields = text.split('\0')
+    i = 0
+    count = len(fields)
+    while i < count:
+        field = fields[i].lstrip('\n')
+        i += 1
+        if not field:
+            continue
+
+        if field.startswith(':'):
+            # :100644 100644 1111111 2222222 R100 NUL old NUL new NUL
+            status = field.rsplit(' ', 1)[-1]
+            paths = 2 if status[:1] in ('R', 'C') else 1
+            if i + paths > count:
+                break
+            collector.raw(status, fields[i + paths - 1])
+            i += paths
+            continue
+
+        numbers = field.split('\t', 2)
+        if len(numbers) == 3 and (numbers[0].isdigit() or numbers[0] == '-'):
+            path = numbers[2]
+            if not path:
+                # Renames: added TAB removed TAB NUL old NUL new NUL
+                if i + 2 > count:
+                    break
+                path = fields[i + 1]
+                i += 2
+            collector.numstat(numbers[0], numbers[1], path)
+            continue
+
+        # --summary lines come last, separated by newlines even with -z
+        for line in field.splitlines():
+            summary = _SUMMARY_PATTERN.match(line)
+            if summary:
+                collector.summary(summary.group(1), _unquote_path(summary.group(2)))
+
+
+def _parse_stat_output(output: Union[str, bytes]) -> Dict:
+    text = _as_text(output)
+    collector = _StatCollector()
+    if '\0' in text:
+        _collect_nul_separated(collector, text)
+    else:
+        _collect_lines(collector, text)
+    return collector.result()
+
+
+def parse_numstat(output: Union[str, bytes]) -> Dict:
+    """
+    Parse `git diff --numstat` output (with or without -z) into parse_git_diff's file-level shape.
+
+    Binary files ("-<TAB>-<TAB>path") get 'binary': True and no line counts. Renamed
+    files are listed under their new path. numstat does not tell added and deleted
+    files apart from modified ones; add --summary (or --raw) to the same git command
+    and those lines set 'change_type' too.
+
+    Args:
+        output (Union[str, bytes]): The output of git diff --numstat.
+
+    Returns:
+        Dict: The same dictionary parse_git_diff(diff, detail="files") returns for the diff.
+    """
+    return _parse_stat_output(output)
+
+
+def parse_raw(output: Union[str, bytes]) -> Dict:
+    """
+    Parse `git diff --raw` output (with or without -z) into parse_git_diff's file-level shape.
+
+    --raw lists every changed path with its change type but no line counts, so 'added'
+    and 'removed' stay 0 unless --numstat output is included as well.
+
+    Args:
+        output (Union[str, bytes]): The output of git diff --raw (optionally with --numstat).
+
+    Returns:
+        Dict: A dictionary with total stats and per-file stats, like parse_git_diff's.
+    """
+    return _parse_stat_output(output)
+
+
+def parse_shortstat(output: Union[str, bytes]) -> Dict:
+    """
+    Parse `git diff --shortstat` (or the last line of --stat) output into overall totals.
+
+    Args:
+        output (Union[str, bytes]): The output of git diff --shortstat.
+
+    Returns:
+        Dict: The same dictionary parse_git_diff(diff, detail="totals") returns for the
+            diff: the totals, with an empty 'files'.
+    """
+    files_changed = added = removed = 0
+    for line in _as_text(output).splitlines():
+        match = _SHORTSTAT_PATTERN.match(line)
+        if match:
+            files_changed = int(match.group(1))
+            added = int(match.group(2) or 0)
+            removed = int(match.group(3) or 0)
+
+    return _result_dict(files_changed, added, removed, {})
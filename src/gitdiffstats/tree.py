@@ -0,0 +1,304 @@
+import heapq
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+from .diffstats import DETAIL_FILES, DETAIL_FULL, DETAIL_TOTALS, _files_detail, _iter_records, _result_dict
+from .filters import FileFilter
+from .model import DiffResult, DiffTotals, FileDiff
+
+# What top() can rank directories by
+_RANKINGS = ('churn', 'added', 'removed', 'files')
+
+
+class _Node:
+    """One directory: its subdirectories, the names of changed files directly in it and its totals."""
+    __slots__ = ('dirs', 'names', 'files', 'added', 'removed')
+
+    def __init__(self):
+        self.dirs: Dict[str, '_Node'] = {}
+        self.names: Set[str] = set()
+        self.files = 0
+        self.added = 0
+        self.removed = 0
+
+    def stats(self) -> Dict:
+        return {'files': self.files, 'added': self.added, 'removed': self.removed}
+
+    def copy(self) -> '_Node':
+        node = _Node()
+        node.dirs = {name: child.copy() for name, child in self.dirs.items()}
+        node.names = set(self.names)
+        node.files = self.files
+        node.added = self.added
+        node.removed = self.removed
+        return node
+
+    def merge(self, other: '_Node') -> int:
+        """Add other's totals and files into this node, returning how many files were new to it."""
+        new = 0
+        for name in other.names:
+            if name not in self.names:
+                self.names.add(name)
+                new += 1
+        for name, other_child in other.dirs.items():
+            child = self.dirs.get(name)
+            if child is None:
+                self.dirs[name] = other_child.copy()
+                new += other_child.files
+            else:
+                new += child.merge(other_child)
+        self.files += new
+        self.added += other.added
+        self.removed += other.removed
+        return new
+
+
+class DirectoryTree:
+    """
+    Added, removed and changed-file counts of every directory, kept in a path trie.
+
+    Each added file walks its path once, adding its counts to every directory on
+    the way, so the totals of all levels are ready without re-splitting paths.
+    Directories are named with a trailing slash ("services/billing/"); the root,
+    "", holds the totals of the whole tree.
+
+    'files' counts distinct paths: a file seen again, in the same diff or in a
+    merged tree, adds its lines but is not counted twice. Trees pickle, so they
+    can be built in worker processes and merged afterwards.
+    """
+    __slots__ = ('_root',)
+
+    def __init__(self):
+        self._root = _Node()
+
+    def add(self, path: str, added: int = 0, removed: int = 0) -> None:
+        """
+        Add the counts of one changed file.
+
+        Args:
+            path (str): The file's path, e.g. "services/billing/api.py".
+            added (int): Lines added to the file.
+            removed (int): Lines removed from the file.
+        """
+        *parts, name = path.split('/')
+        nodes = [self._root]
+        node = self._root
+        for part in parts:
+            child = node.dirs.get(part)
+            if child is None:
+                child = node.dirs[part] = _Node()
+            nodes.append(child)
+            node = child
+
+        is_new = name not in node.names
+        if is_new:
+            node.names.add(name)
+        for node in nodes:
+            node.added += added
+            node.removed += removed
+            if is_new:
+                node.files += 1
+
+    def add_file(self, record: FileDiff) -> None:
+        """Add a FileDiff record, as iter_git_diff yields them."""
+        self.add(record.path, record.added, record.removed)
+
+    def update(self, result: Union[DiffResult, Dict]) -> 'DirectoryTree':
+        """
+        Add every file of a parse result.
+
+        Args:
+            result (Union[DiffResult, Dict]): What parse_git_diff, parse_git_diff_compact or
+                parse_numstat returned. Results parsed at the "totals" detail level have
+                no files to add.
+
+        Returns:
+            DirectoryTree: This tree.
+        """
+        if isinstance(result, DiffResult):
+            for record in result.files.values():
+                self.add_file(record)
+        else:
+            for path, file_stats in result['files'].items():
+                self.add(path, file_stats['added'], file_stats['removed'])
+        return self
+
+    @classmethod
+    def from_results(cls, results: Iterable[Union[DiffResult, Dict]]) -> 'DirectoryTree':
+        """Return the tree of the files of all the given parse results."""
+        tree = cls()
+        for result in results:
+            tree.update(result)
+        return tree
+
+    def merge(self, other: 'DirectoryTree') -> 'DirectoryTree':
+        """
+        Add the counts of another tree into this one.
+
+        The cost follows the size of other, not of this tree. other is left unchanged.
+
+        Args:
+            other (DirectoryTree): The tree to merge in, e.g. one built by another worker.
+
+        Returns:
+            DirectoryTree: This tree.
+        """
+        self._root.merge(other._root)
+        return self
+
+    def _find(self, directory: str) -> Optional[_Node]:
+        node = self._root
+        for part in directory.strip('/').split('/') if directory.strip('/') else ():
+            node = node.dirs.get(part)
+            if node is None:
+                return None
+        return node
+
+    def stats(self, directory: str = "") -> Dict:
+        """
+        Return the totals of a directory.
+
+        Args:
+            directory (str): The directory, with or without a trailing slash; "" for the root.
+
+        Returns:
+            Dict: The 'files', 'added' and 'removed' counts of everything under the directory.
+
+        Raises:
+            KeyError: If no changed file is under the directory.
+        """
+        node = self._find(directory)
+        if node is None:
+            raise KeyError(directory)
+        return node.stats()
+
+    def __contains__(self, directory: str) -> bool:
+        return self._find(directory) is not None
+
+    def _walk(self, max_depth: Optional[int]) -> Iterator[Tuple[str, int, _Node]]:
+        """Yield (directory, depth, node) for every directory in sorted, depth-first order."""
+        stack = [('', 0, self._root)]
+        while stack:
+            prefix, depth, node = stack.pop()
+            if depth:
+                yield prefix, depth, node
+            if max_depth is not None and depth >= max_depth:
+                continue
+            for name in sorted(node.dirs, reverse=True):
+                stack.append((f"{prefix}{name}/", depth + 1, node.dirs[name]))
+
+    def rollup(self, max_depth: Optional[int] = None) -> Dict[str, Dict]:
+        """
+        Return the totals of every directory down to a depth.
+
+        Args:
+            max_depth (Optional[int]): 1 for the top-level directories only, 2 to add their
+                subdirectories, and so on; None for all of them.
+
+        Returns:
+            Dict[str, Dict]: The 'files', 'added' and 'removed' counts by directory name
+                ("services/", "services/billing/", ...), in sorted, depth-first order.
+        """
+        return {directory: node.stats() for directory, _, node in self._walk(max_depth)}
+
+    def top(self, n: int = 10, by: str = "churn", depth: Optional[int] = None) -> List[Tuple[str, Dict]]:
+        """
+        Return the directories with the most changes.
+
+        Args:
+            n (int): How many directories to return.
+            by (str): What to rank by: "churn" (added plus removed lines, the default),
+                "added", "removed" or "files".
+            depth (Optional[int]): Only rank directories at this depth (1 for top-level ones);
+                None ranks all of them, in which case parents outrank their subdirectories.
+
+        Returns:
+            List[Tuple[str, Dict]]: (directory, stats) pairs, largest first; ties keep the
+                order of rollup().
+
+        Raises:
+            ValueError: If by is not a known ranking.
+        """
+        if by not in _RANKINGS:
+            raise ValueError(f"Unknown ranking {by!r}, expected one of {', '.join(_RANKINGS)}")
+        if by == 'churn':
+            def key(entry):
+                return entry[2].added + entry[2].removed
+        else:
+            def key(entry):
+                return getattr(entry[2], by)
+
+        entries = self._walk(depth)
+        if depth is not None:
+            entries = (entry for entry in entries if entry[1] == depth)
+        return [(directory, node.stats()) for directory, _, node in heapq.nlargest(n, entries, key=key)]
+
+    def __len__(self) -> int:
+        """Return the number of directories."""
+        return sum(1 for _ in self._walk(None))
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, DirectoryTree):
+            return NotImplemented
+        return self.stats() == other.stats() and self.rollup() == other.rollup()
+
+    def __repr__(self) -> str:
+        root = self._root
+        return f"DirectoryTree(files={root.files}, added={root.added}, removed={root.removed})"
+
+
+def parse_git_diff_with_tree(diff_text: Union[str, bytes], detail: str = DETAIL_FULL,
+                             file_filter: Optional[FileFilter] = None) -> Tuple[Dict, DirectoryTree]:
+    """
+    Parse a diff like parse_git_diff and build its DirectoryTree in the same pass.
+
+    Every file is added to the tree as the parser emits it, so the directory
+    totals cost one walk down each path and no second pass over the result.
+
+    Args:
+        diff_text (Union[str, bytes]): A string or bytes-like object containing the git diff.
+        detail (str): How much to materialize: "totals", "files", "hunks" or "full". The tree
+            is complete at every level.
+        file_filter (Optional[FileFilter]): Which file sections to parse and how much of each
+            to keep. Excluded files are left out of the tree too.
+
+    Returns:
+        Tuple[Dict, DirectoryTree]: parse_git_diff's dictionary and the directory tree.
+    """
+    inner_detail = _files_detail(detail)
+    if diff_text is None:
+        diff_text = ""
+
+    tree = DirectoryTree()
+    files_stats = {}
+    totals = None
+    for record in _iter_records(diff_text, inner_detail, strip=True, file_filter=file_filter):
+        if isinstance(record, DiffTotals):
+            totals = record
+            continue
+        tree.add_file(record)
+        files_stats[record.path] = record.to_dict()
+
+    if detail == DETAIL_TOTALS:
+        files_stats = {}
+    return _result_dict(totals.total_files_changed, totals.total_lines_added, totals.total_lines_removed, files_stats), tree
+
+
+def build_tree(diff_text: Union[str, bytes], file_filter: Optional[FileFilter] = None) -> DirectoryTree:
+    """
+    Return the DirectoryTree of a diff without building its result dictionary.
+
+    Being a module-level function, it can be mapped over many diffs on a process
+    pool, with the trees combined by DirectoryTree.merge.
+
+    Args:
+        diff_text (Union[str, bytes]): A string or bytes-like object containing the git diff.
+        file_filter (Optional[FileFilter]): Which file sections to count.
+
+    Returns:
+        DirectoryTree: The directory totals of the diff.
+    """
+    tree = DirectoryTree()
+    for record in _iter_records(diff_text or "", DETAIL_FILES, strip=True, file_filter=file_filter):
+        if not isinstance(record, DiffTotals):
+            tree.add_file(record)
+    return tree
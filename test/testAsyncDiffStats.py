@@ -0,0 +1,87 @@
+import sys
+import os
+import subprocess
+import tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
+from gitdiffstats.aio import diff_stats, diff_stats_many
+from gitdiffstats.cache import DiffCache
+from gitdiffstats.diffstats import parse_git_diff
+import unittest
+
+
+def git(repo, *args):
+    return subprocess.run(['git', '-C', repo, *args], check=True, capture_output=True).stdout
+
+
+def make_repo(path):
+    git(path, 'init', '-q')
+    git(path, 'config', 'user.email', 'dev@example.com')
+    git(path, 'config', 'user.name', 'Dev')
+    with open(os.path.join(path, 'app.py'), 'w') as f:
+        f.write("import os\nprint('old')\n")
+    with open(os.path.join(path, 'gone.py'), 'w') as f:
+        f.write("x = 1\n")
+    git(path, 'add', '-A')
+    git(path, 'commit', '-q', '-m', 'first')
+
+    with open(os.path.join(path, 'app.py'), 'w') as f:
+        f.write("import os\nprint('new')\nprint('more')\n")
+    os.remove(os.path.join(path, 'gone.py'))
+    with open(os.path.join(path, 'naïve.py'), 'w') as f:
+        f.write("y = 2\n" * 50)
+    git(path, 'add', '-A')
+    git(path, 'commit', '-q', '-m', 'second')
+
+
+class TestAsyncDiffStats(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.repo = self.tmpdir.name
+        make_repo(self.repo)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    async def test_diff_stats(self):
+        result = await diff_stats(self.repo, 'HEAD~1..HEAD')
+        self.assertEqual(result['total_files_changed'], 3)
+        self.assertEqual(result['total_lines_added'], 52)
+        self.assertEqual(result['total_lines_removed'], 2)
+        self.assertEqual(result['files']['gone.py']['change_type'], 'deleted')
+        self.assertEqual(result['files']['naïve.py']['change_type'], 'added')
+
+        output = git(self.repo, '-c', 'core.quotePath=false', 'diff', 'HEAD~1..HEAD')
+        self.assertEqual(result, parse_git_diff(output))
+
+    async def test_small_reads_and_detail(self):
+        result = await diff_stats(self.repo, ['HEAD~1', 'HEAD'], detail='files', read_size=7)
+        self.assertEqual(result['files']['app.py'],
+                         {'added': 2, 'removed': 1, 'change_type': 'modified', 'hunks': []})
+
+    async def test_git_error(self):
+        with self.assertRaises(subprocess.CalledProcessError):
+            await diff_stats(self.repo, 'no-such-revision')
+
+    async def test_cache(self):
+        cache = DiffCache()
+        first = await diff_stats(self.repo, 'HEAD~1..HEAD', cache=cache)
+        head = git(self.repo, 'rev-parse', 'HEAD').decode().strip()
+        second = await diff_stats(self.repo, f'HEAD~1..{head}', cache=cache)
+        self.assertIs(first, second)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+        # Working tree diffs are never cached
+        await diff_stats(self.repo, 'HEAD', cache=cache)
+        await diff_stats(self.repo, 'HEAD~1', git_args=['--cached'], cache=cache)
+        self.assertEqual(len(cache), 1)
+
+    async def test_diff_stats_many(self):
+        jobs = [(self.repo, 'HEAD~1..HEAD'), (self.repo, 'HEAD..HEAD'), (self.repo, 'bad-rev')]
+        results = await diff_stats_many(jobs, concurrency=2, detail='totals', return_exceptions=True)
+        self.assertEqual(results[0]['total_lines_added'], 52)
+        self.assertEqual(results[1]['total_files_changed'], 0)
+        self.assertIsInstance(results[2], subprocess.CalledProcessError)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../benchmarks'))
+from gitdiffstats.diffstats import parse_git_diff
+from synthetic import generate_diff
+from run import compare, run
+import unittest
+
+
+class TestSyntheticDiff(unittest.TestCase):
+    def test_reproducible(self):
+        self.assertEqual(generate_diff(files=5, seed=7), generate_diff(files=5, seed=7))
+        self.assertNotEqual(generate_diff(files=5, seed=7), generate_diff(files=5, seed=8))
+
+    def test_hunk_headers_match_content(self):
+        diff = generate_diff(files=20, hunks_per_file=3, lines_per_hunk=12, tab_ratio=0.3,
+                             trailing_space_ratio=0.3, new_file_ratio=0.2, deleted_file_ratio=0.2)
+        result = parse_git_diff(diff)
+        self.assertEqual(result['total_files_changed'], 20)
+        change_types = {file_stats['change_type'] for file_stats in result['files'].values()}
+        self.assertEqual(change_types, {'added', 'deleted', 'modified'})
+        for file_stats in result['files'].values():
+            for hunk in file_stats['hunks']:
+                kinds = [change['type'] for change in hunk['changes']]
+                self.assertEqual(hunk['old_count'], kinds.count('remove') + kinds.count('context'))
+                self.assertEqual(hunk['new_count'], kinds.count('add') + kinds.count('context'))
+
+    def test_ratios(self):
+        result = parse_git_diff(generate_diff(files=10, add_ratio=1, remove_ratio=0, context_ratio=0))
+        self.assertEqual(result['total_lines_removed'], 0)
+        self.assertEqual(result['total_lines_added'], 10 * 5 * 20)
+
+
+class TestRegressionCheck(unittest.TestCase):
+    def results(self, mb_per_s, peak_bytes):
+        return {'results': {'case/parser': {'mb_per_s': mb_per_s, 'peak_bytes': peak_bytes,
+                                            'lines_per_s': 0, 'seconds': 0}}}
+
+    def test_within_threshold(self):
+        self.assertEqual(compare(self.results(100, 1000), self.results(90, 1100), threshold=0.15), [])
+
+    def test_throughput_regression(self):
+        regressions = compare(self.results(100, 1000), self.results(80, 1000), threshold=0.15)
+        self.assertEqual(len(regressions), 1)
+        self.assertIn('throughput', regressions[0])
+
+    def test_memory_regression(self):
+        regressions = compare(self.results(100, 1000), self.results(100, 1200), threshold=0.15)
+        self.assertEqual(len(regressions), 1)
+        self.assertIn('peak memory', regressions[0])
+
+    def test_run(self):
+        results = run(['mixed'], ['dict-files'], scale=0.01, repeat=1)
+        measured = results['results']['mixed/dict-files']
+        self.assertGreater(measured['mb_per_s'], 0)
+        self.assertGreater(measured['lines_per_s'], 0)
+        self.assertEqual(compare(results, results), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
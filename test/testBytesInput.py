@@ -0,0 +1,86 @@
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
+from gitdiffstats.diffstats import parse_git_diff, parse_git_diff_compact, parse_git_diff_file
+import unittest
+
+DIFF = (
+    "diff --git a/added.py b/added.py\n"
+    "new file mode 100644\n"
+    "--- /dev/null\n"
+    "+++ b/added.py\n"
+    "@@ -0,0 +1,2 @@\n"
+    "+print('new')\n"
+    "+print('file')\n"
+    "diff --git a/complex.py b/complex.py\n"
+    "--- a/complex.py\n"
+    "+++ b/complex.py\n"
+    "@@ -15,4 +15,5 @@ class ExampleClass:\n"
+    "     def method_one(self):\n"
+    "-        return value * 2\n"
+    "+        multiplier = 2\n"
+    "+        return value * multiplier\n"
+    "     \n"
+    "\\ No newline at end of file\n"
+)
+
+
+class TestBytesInput(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, data):
+        path = os.path.join(self.tmpdir.name, 'changes.diff')
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def test_bytes_match_str(self):
+        expected = parse_git_diff(DIFF)
+        data = DIFF.encode('utf-8')
+        self.assertEqual(parse_git_diff(data), expected)
+        self.assertEqual(parse_git_diff(bytearray(data)), expected)
+        self.assertEqual(parse_git_diff(memoryview(data)), expected)
+        self.assertEqual(parse_git_diff(("\n\n" + DIFF + "\n  ").encode('utf-8')), expected)
+
+    def test_crlf(self):
+        data = DIFF.replace("\n", "\r\n").encode('utf-8')
+        self.assertEqual(parse_git_diff(data), parse_git_diff(DIFF))
+
+    def test_file(self):
+        path = self.write(DIFF.encode('utf-8'))
+        for detail in ("totals", "files", "hunks", "full"):
+            result = parse_git_diff_file(path, detail=detail)
+            self.assertEqual(result.to_dict(), parse_git_diff(DIFF, detail=detail))
+
+    def test_empty_file(self):
+        path = self.write(b"")
+        self.assertEqual(parse_git_diff_file(path).to_dict(), parse_git_diff(""))
+
+    def test_content_is_decoded_on_access(self):
+        data = (
+            b"diff --git a/latin1.txt b/latin1.txt\n"
+            b"--- a/latin1.txt\n"
+            b"+++ b/latin1.txt\n"
+            b"@@ -1 +1 @@\n"
+            b"-caf\xe9\n"
+            b"+caf\xc3\xa9\n"
+        )
+        result = parse_git_diff_file(self.write(data))
+        self.assertEqual(result.total_lines_added, 1)
+        self.assertEqual(result.total_lines_removed, 1)
+        hunk = result.files['latin1.txt'].hunks[0]
+        self.assertEqual(hunk.raw_content(0), b"caf\xe9")
+        self.assertEqual(hunk.content(0), "caf�")
+        self.assertEqual(hunk.content(1), "café")
+
+        compact = parse_git_diff_compact(data)
+        self.assertEqual(compact.to_dict(), result.to_dict())
+
+
+if __name__ == '__main__':
+    unittest.main()
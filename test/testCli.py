@@ -0,0 +1,133 @@
+import sys
+import os
+import io
+import json
+import shutil
+import subprocess
+import tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
+from gitdiffstats.cli import main
+from gitdiffstats.diffstats import parse_git_diff
+import unittest
+
+DIFF_A = (
+    "diff --git a/app.py b/app.py\n"
+    "index 1111111..2222222 100644\n"
+    "--- a/app.py\n"
+    "+++ b/app.py\n"
+    "@@ -1,2 +1,2 @@\n"
+    "-x = 1\n"
+    "+x = 2\n"
+    " print(x)\n"
+    "diff --git a/web/yarn.lock b/web/yarn.lock\n"
+    "--- a/web/yarn.lock\n"
+    "+++ b/web/yarn.lock\n"
+    "@@ -1 +1,2 @@\n"
+    " a\n"
+    "+b\n"
+)
+
+DIFF_B = (
+    "diff --git a/new file.txt b/new file.txt\n"
+    "new file mode 100644\n"
+    "--- /dev/null\n"
+    "+++ b/new file.txt\n"
+    "@@ -0,0 +1,3 @@\n"
+    "+one\n"
+    "+two\n"
+    "+three\n"
+)
+
+
+class TestCli(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.a = os.path.join(self.tmp, 'a.diff')
+        self.b = os.path.join(self.tmp, 'b.diff')
+        self.empty = os.path.join(self.tmp, 'empty.diff')
+        for path, text in ((self.a, DIFF_A), (self.b, DIFF_B), (self.empty, "")):
+            with open(path, 'w') as diff_file:
+                diff_file.write(text)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def run_cli(self, *argv):
+        out = io.StringIO()
+        self.assertEqual(main(list(argv), out=out), 0)
+        return out.getvalue()
+
+    def test_jsonl(self):
+        lines = [json.loads(line) for line in self.run_cli(self.a).splitlines()]
+        expected = parse_git_diff(DIFF_A, "files")
+        self.assertEqual(lines[:-1], [dict(path=path, **stats) for path, stats in expected['files'].items()])
+        self.assertEqual(lines[-1], {key: value for key, value in expected.items() if key != 'files'})
+
+    def test_json_matches_parse_git_diff(self):
+        for detail in ("files", "hunks", "full"):
+            document = json.loads(self.run_cli('--format', 'json', '--detail', detail, self.a))
+            self.assertEqual(document, parse_git_diff(DIFF_A, detail))
+        document = json.loads(self.run_cli('--format', 'json', '--stats-only', self.a))
+        self.assertEqual(document, parse_git_diff(DIFF_A, "totals"))
+
+    def test_stats_only(self):
+        lines = self.run_cli('--stats-only', self.a, self.b).splitlines()
+        self.assertEqual([json.loads(line) for line in lines], [
+            {'total_files_changed': 3, 'total_lines_added': 5, 'total_lines_removed': 1}
+        ])
+        self.assertEqual(self.run_cli('--stats-only', '--format', 'tsv', self.empty),
+                         "path\tadded\tremoved\tchange_type\n\t0\t0\ttotal\n")
+
+    def test_tsv(self):
+        self.assertEqual(self.run_cli('--format', 'tsv', '--exclude', '*.lock', self.a), (
+            "path\tadded\tremoved\tchange_type\n"
+            "app.py\t1\t1\tmodified\n"
+            "\t1\t1\ttotal\n"
+        ))
+
+    def test_several_inputs_with_workers(self):
+        for workers in ('1', '2'):
+            lines = [json.loads(line) for line in
+                     self.run_cli('--workers', workers, self.a, self.b, self.empty).splitlines()]
+            self.assertEqual([(line.get('input'), line.get('path')) for line in lines], [
+                (self.a, 'app.py'), (self.a, 'web/yarn.lock'), (self.b, 'new file.txt'), (None, None)
+            ])
+            self.assertEqual(lines[-1]['total_lines_added'], 5)
+
+        document = json.loads(self.run_cli('--format', 'json', '--workers', '2', self.a, self.b))
+        self.assertEqual(document['inputs'][self.b], parse_git_diff(DIFF_B, "files"))
+        self.assertEqual(document['total_files_changed'], 3)
+
+    def test_missing_file(self):
+        stderr = io.StringIO()
+        sys.stderr, saved = stderr, sys.stderr
+        try:
+            self.assertEqual(main([os.path.join(self.tmp, 'missing.diff')], out=io.StringIO()), 1)
+        finally:
+            sys.stderr = saved
+        self.assertIn("missing.diff", stderr.getvalue())
+
+    def test_stdin(self):
+        env = dict(os.environ, PYTHONPATH=os.path.join(os.path.dirname(__file__), '../src'))
+        process = subprocess.run([sys.executable, '-m', 'gitdiffstats', '--format', 'tsv'],
+                                 input=DIFF_B.encode('utf-8'), capture_output=True, env=env, check=True)
+        self.assertEqual(process.stdout.decode('utf-8').splitlines()[1:], [
+            "new file.txt\t3\t0\tadded", "\t3\t0\ttotal"
+        ])
+
+    def test_stdin_with_files_and_workers(self):
+        env = dict(os.environ, PYTHONPATH=os.path.join(os.path.dirname(__file__), '../src'))
+        outputs = {}
+        for workers in ('1', '2'):
+            process = subprocess.run([sys.executable, '-m', 'gitdiffstats', '--workers', workers, '-', self.a],
+                                     input=DIFF_B.encode('utf-8'), capture_output=True, env=env, check=True)
+            outputs[workers] = [json.loads(line) for line in process.stdout.decode('utf-8').splitlines()]
+        self.assertEqual(outputs['2'], outputs['1'])
+        self.assertEqual([(line.get('input'), line.get('path')) for line in outputs['2']], [
+            ('-', 'new file.txt'), (self.a, 'app.py'), (self.a, 'web/yarn.lock'), (None, None)
+        ])
+        self.assertEqual(outputs['2'][-1]['total_lines_added'], 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
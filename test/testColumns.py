@@ -0,0 +1,123 @@
+import sys
+import os
+import io
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
+from gitdiffstats.diffstats import parse_git_diff, parse_git_diff_compact
+from gitdiffstats.columns import CHANGE_TYPES, parse_many_to_columns, to_columns
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+FIRST = (
+    "diff --git a/added.py b/added.py\n"
+    "new file mode 100644\n"
+    "--- /dev/null\n"
+    "+++ b/added.py\n"
+    "@@ -0,0 +1,2 @@\n"
+    "+print('new')\n"
+    "+print('file')\n"
+    "diff --git a/shared.py b/shared.py\n"
+    "--- a/shared.py\n"
+    "+++ b/shared.py\n"
+    "@@ -1,2 +1,2 @@\n"
+    " import os\n"
+    "-x = 1\n"
+    "+x = 2\n"
+    "@@ -10 +10,2 @@\n"
+    " y = 3\n"
+    "+z = 4\n"
+)
+
+SECOND = (
+    "diff --git a/shared.py b/shared.py\n"
+    "--- a/shared.py\n"
+    "+++ b/shared.py\n"
+    "@@ -4,2 +4 @@\n"
+    "-a\n"
+    "-b\n"
+    "+c\n"
+    "diff --git a/gone.py b/gone.py\n"
+    "deleted file mode 100644\n"
+    "--- a/gone.py\n"
+    "+++ /dev/null\n"
+    "@@ -1 +0,0 @@\n"
+    "-bye\n"
+)
+
+
+@unittest.skipUnless(numpy, "NumPy is not installed")
+class TestColumns(unittest.TestCase):
+    def test_parse_many(self):
+        columns = parse_many_to_columns([FIRST, SECOND.encode('utf-8'), ""])
+
+        self.assertEqual(columns.diffs['files_changed'].tolist(), [2, 2, 0])
+        self.assertEqual(columns.diffs['lines_added'].tolist(), [4, 1, 0])
+        self.assertEqual(columns.diffs['lines_removed'].tolist(), [1, 3, 0])
+
+        self.assertEqual(columns.paths, ['added.py', 'shared.py', 'gone.py'])
+        self.assertEqual(columns.file_paths(), ['added.py', 'shared.py', 'shared.py', 'gone.py'])
+        files = columns.files
+        self.assertEqual(files['diff'].tolist(), [0, 0, 1, 1])
+        self.assertEqual(files['path'].tolist(), [0, 1, 1, 2])
+        self.assertEqual([CHANGE_TYPES[code] for code in files['change_type']],
+                         ['added', 'modified', 'modified', 'deleted'])
+        self.assertEqual(files['added'].tolist(), [2, 2, 1, 0])
+        self.assertEqual(files['removed'].tolist(), [0, 1, 2, 1])
+        self.assertEqual(files['hunks'].tolist(), [1, 2, 1, 1])
+        self.assertEqual(files['binary'].tolist(), [0, 0, 0, 0])
+
+        hunks = columns.hunks
+        self.assertEqual(hunks['file'].tolist(), [0, 1, 1, 2, 3])
+        self.assertEqual(hunks['old_start'].tolist(), [0, 1, 10, 4, 1])
+        self.assertEqual(hunks['old_count'].tolist(), [0, 2, 1, 2, 1])
+        self.assertEqual(hunks['new_start'].tolist(), [1, 1, 10, 4, 0])
+        self.assertEqual(hunks['new_count'].tolist(), [2, 2, 2, 1, 0])
+
+    def test_vectorized_rollup(self):
+        columns = parse_many_to_columns([FIRST, SECOND])
+        per_path = numpy.bincount(columns.files['path'], weights=columns.files['added'])
+        self.assertEqual(per_path.tolist(), [2.0, 3.0, 0.0])
+
+    def test_lower_detail_levels(self):
+        files_only = parse_many_to_columns([FIRST, SECOND], detail="files")
+        self.assertEqual(len(files_only.files['path']), 4)
+        self.assertEqual(len(files_only.hunks['file']), 0)
+        self.assertEqual(files_only.files['hunks'].tolist(), [0, 0, 0, 0])
+
+        totals_only = parse_many_to_columns([FIRST, SECOND], detail="totals")
+        self.assertEqual(len(totals_only.files['path']), 0)
+        self.assertEqual(totals_only.diffs['lines_added'].tolist(), [4, 1])
+
+    def test_file_objects(self):
+        columns = parse_many_to_columns([io.StringIO(FIRST)])
+        self.assertEqual(columns.files['added'].tolist(), [2, 2])
+
+    def test_to_columns_from_dict_and_compact(self):
+        from_dict = to_columns(parse_git_diff(FIRST))
+        from_compact = parse_git_diff_compact(FIRST).to_columns()
+        many = parse_many_to_columns([FIRST])
+        for columns in (from_dict, from_compact):
+            self.assertEqual(columns.paths, many.paths)
+            for table in ('diffs', 'files', 'hunks'):
+                for name, column in getattr(many, table).items():
+                    self.assertEqual(getattr(columns, table)[name].tolist(), column.tolist())
+
+    def test_empty(self):
+        columns = parse_many_to_columns([])
+        self.assertEqual(columns.paths, [])
+        self.assertEqual(len(columns.diffs['files_changed']), 0)
+        self.assertEqual(columns.files['path'].dtype, numpy.int64)
+
+
+@unittest.skipIf(numpy, "NumPy is installed")
+class TestColumnsWithoutNumpy(unittest.TestCase):
+    def test_helpful_error(self):
+        with self.assertRaisesRegex(ImportError, "NumPy"):
+            parse_many_to_columns([FIRST])
+
+
+if __name__ == '__main__':
+    unittest.main()
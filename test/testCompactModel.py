@@ -0,0 +1,61 @@
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
+from gitdiffstats.diffstats import parse_git_diff, parse_git_diff_compact
+from gitdiffstats.model import KIND_ADD, KIND_CONTEXT, KIND_REMOVE, DiffResult, FileDiff, Hunk
+import unittest
+
+DIFF = (
+    "diff --git a/added.py b/added.py\n"
+    "new file mode 100644\n"
+    "--- /dev/null\n"
+    "+++ b/added.py\n"
+    "@@ -0,0 +1,2 @@\n"
+    "+print('new')\n"
+    "+print('file')\n"
+    "diff --git a/complex.py b/complex.py\n"
+    "--- a/complex.py\n"
+    "+++ b/complex.py\n"
+    "@@ -15,5 +15,6 @@ class ExampleClass:\n"
+    "     def method_one(self):\n"
+    "-        return value * 2\n"
+    "+        multiplier = 2\n"
+    "+        return value * multiplier\n"
+    "     \n"
+    "@@ -40,2 +41,1 @@ def other():\n"
+    "-    pass\n"
+    "     return\n"
+)
+
+
+class TestCompactModel(unittest.TestCase):
+    def test_to_dict_matches_parse_git_diff(self):
+        for detail in ("totals", "files", "hunks", "full"):
+            result = parse_git_diff_compact(DIFF, detail=detail)
+            self.assertIsInstance(result, DiffResult)
+            self.assertEqual(result.to_dict(), parse_git_diff(DIFF, detail=detail))
+
+    def test_empty(self):
+        self.assertEqual(parse_git_diff_compact("").to_dict(), parse_git_diff(""))
+        self.assertEqual(parse_git_diff_compact(None).to_dict(), parse_git_diff(None))
+
+    def test_columns(self):
+        result = parse_git_diff_compact(DIFF)
+        file_diff = result.files['complex.py']
+        self.assertIsInstance(file_diff, FileDiff)
+        hunk = file_diff.hunks[0]
+        self.assertIsInstance(hunk, Hunk)
+        self.assertEqual(list(hunk.kinds), [KIND_CONTEXT, KIND_REMOVE, KIND_ADD, KIND_ADD, KIND_CONTEXT])
+        self.assertEqual(list(hunk.old_lines), [15, 16, 17, 17, 17])
+        self.assertEqual(list(hunk.new_lines), [15, 16, 16, 17, 18])
+        self.assertEqual(hunk.content(2), '        multiplier = 2')
+        self.assertEqual(len(hunk), 5)
+
+    def test_slots(self):
+        result = parse_git_diff_compact(DIFF)
+        for obj in (result, result.files['added.py'], result.files['added.py'].hunks[0]):
+            self.assertFalse(hasattr(obj, '__dict__'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
+from gitdiffstats.diffstats import parse_git_diff
+import unittest
+
+DIFF = (
+    "diff --git a/added.py b/added.py\n"
+    "new file mode 100644\n"
+    "--- /dev/null\n"
+    "+++ b/added.py\n"
+    "@@ -0,0 +1,2 @@\n"
+    "+print('new')\n"
+    "+print('file')\n"
+    "diff --git a/modified.py b/modified.py\n"
+    "--- a/modified.py\n"
+    "+++ b/modified.py\n"
+    "@@ -1,3 +1,3 @@\n"
+    " import os\n"
+    "-print('old')\n"
+    "+print('new')\n"
+    " print('done')\n"
+)
+
+
+class TestDetailLevels(unittest.TestCase):
+    def test_totals(self):
+        result = parse_git_diff(DIFF, detail="totals")
+        self.assertEqual(result['total_files_changed'], 2)
+        self.assertEqual(result['total_lines_added'], 3)
+        self.assertEqual(result['total_lines_removed'], 1)
+        self.assertEqual(result['files'], {})
+
+    def test_files(self):
+        result = parse_git_diff(DIFF, detail="files")
+        self.assertEqual(result['files']['added.py'],
+                         {'added': 2, 'removed': 0, 'change_type': 'added', 'hunks': []})
+        self.assertEqual(result['files']['modified.py'],
+                         {'added': 1, 'removed': 1, 'change_type': 'modified', 'hunks': []})
+
+    def test_hunks(self):
+        result = parse_git_diff(DIFF, detail="hunks")
+        hunk = result['files']['modified.py']['hunks'][0]
+        self.assertEqual((hunk['old_start'], hunk['old_count'], hunk['new_start'], hunk['new_count']),
+                         (1, 3, 1, 3))
+        self.assertEqual(hunk['changes'], [])
+
+    def test_lower_levels_agree_with_full(self):
+        full = parse_git_diff(DIFF)
+        self.assertEqual(full, parse_git_diff(DIFF, detail="full"))
+        for detail in ("totals", "files", "hunks"):
+            result = parse_git_diff(DIFF, detail=detail)
+            for key in ('total_files_changed', 'total_lines_added', 'total_lines_removed'):
+                self.assertEqual(result[key], full[key])
+            for path, file_stats in result['files'].items():
+                self.assertEqual(file_stats['added'], full['files'][path]['added'])
+                self.assertEqual(file_stats['removed'], full['files'][path]['removed'])
+
+    def test_unknown_detail(self):
+        with self.assertRaises(ValueError):
+            parse_git_diff(DIFF, detail="everything")
+
+
+if __name__ == '__main__':
+    unittest.main()
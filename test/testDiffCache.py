@@ -0,0 +1,74 @@
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
+from gitdiffstats.cache import DiffCache
+from gitdiffstats.diffstats import parse_git_diff
+import unittest
+
+
+def make_diff(name, lines=3):
+    return (
+        f"diff --git a/{name} b/{name}\n"
+        f"--- a/{name}\n"
+        f"+++ b/{name}\n"
+        f"@@ -1,{lines} +1,{lines} @@\n"
+        + "-old\n+new\n" * lines
+    )
+
+
+class TestDiffCache(unittest.TestCase):
+    def test_hits_and_misses(self):
+        cache = DiffCache()
+        diff = make_diff("a.py")
+        first = cache.parse(diff)
+        self.assertEqual(first, parse_git_diff(diff))
+        self.assertIs(cache.parse(diff), first)
+        self.assertEqual(cache.parse(diff.encode('utf-8')), first)
+        cache.parse(diff, detail="totals")
+        self.assertEqual(cache.stats(), {'hits': 2, 'disk_hits': 0, 'misses': 2, 'evictions': 0,
+                                         'entries': 2, 'bytes': cache.current_bytes})
+
+    def test_lru_by_entries(self):
+        cache = DiffCache(max_entries=2)
+        a, b, c = make_diff("a.py"), make_diff("b.py"), make_diff("c.py")
+        cache.parse(a)
+        cache.parse(b)
+        cache.parse(a)  # a is now most recently used
+        cache.parse(c)  # evicts b
+        self.assertEqual(cache.evictions, 1)
+        self.assertIsNotNone(cache.get(DiffCache.key_for_text(a)))
+        self.assertIsNone(cache.get(DiffCache.key_for_text(b)))
+
+    def test_lru_by_bytes(self):
+        small = make_diff("a.py")
+        cache = DiffCache(max_bytes=10_000)
+        cache.parse(small)
+        cache.parse(make_diff("big.py", lines=40))  # larger than the whole cache, not kept
+        self.assertEqual(len(cache), 1)
+        for i in range(10):
+            cache.parse(make_diff(f"f{i}.py"))
+        self.assertLessEqual(cache.current_bytes, 10_000)
+        self.assertGreater(cache.evictions, 0)
+
+    def test_disk_tier(self):
+        diff = make_diff("a.py")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            first = DiffCache(directory=tmpdir)
+            expected = first.parse(diff)
+
+            second = DiffCache(directory=tmpdir)
+            self.assertEqual(second.parse(diff), expected)
+            self.assertEqual((second.disk_hits, second.misses), (1, 0))
+            second.parse(diff)
+            self.assertEqual(second.hits, 1)
+
+    def test_keys(self):
+        self.assertEqual(DiffCache.key_for_text("x"), DiffCache.key_for_text(b"x"))
+        self.assertNotEqual(DiffCache.key_for_text("x"), DiffCache.key_for_text("x", "files"))
+        self.assertNotEqual(DiffCache.key_for_revisions("repo", ["a", "^b"]),
+                            DiffCache.key_for_revisions("repo", ["a", "^c"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
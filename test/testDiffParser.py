@@ -0,0 +1,96 @@
+import sys
+import os
+import random
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
+from gitdiffstats.diffstats import parse_git_diff, DiffParser, DiffTotals
+import unittest
+
+DIFF = (
+    "diff --git a/added.py b/added.py\n"
+    "new file mode 100644\n"
+    "--- /dev/null\n"
+    "+++ b/added.py\n"
+    "@@ -0,0 +1,2 @@\n"
+    "+print('né')\n"
+    "+print('文件')\n"
+    "diff --git a/modified.py b/modified.py\n"
+    "--- a/modified.py\n"
+    "+++ b/modified.py\n"
+    "@@ -1,3 +1,3 @@\n"
+    " import os\n"
+    "-print('old')\n"
+    "+print('new')\n"
+    " print('done')"
+)
+
+
+def chunks(data, seed):
+    rng = random.Random(seed)
+    pos = 0
+    while pos < len(data):
+        size = rng.randint(1, 7)
+        yield data[pos:pos + size]
+        pos += size
+
+
+class TestDiffParser(unittest.TestCase):
+    def parse(self, pieces, **kwargs):
+        parser = DiffParser(**kwargs)
+        files = {}
+        for piece in pieces:
+            parser.feed(piece)
+            for record in parser.drain():
+                files[record.path] = record.to_dict()
+        totals = parser.close()
+        for record in parser.drain():
+            files[record.path] = record.to_dict()
+        return totals, files
+
+    def assertMatchesParse(self, totals, files):
+        expected = parse_git_diff(DIFF)
+        self.assertEqual(totals, DiffTotals(expected['total_files_changed'],
+                                            expected['total_lines_added'],
+                                            expected['total_lines_removed']))
+        self.assertEqual(files, expected['files'])
+
+    def test_str_chunks(self):
+        for seed in range(5):
+            self.assertMatchesParse(*self.parse(chunks(DIFF, seed)))
+
+    def test_bytes_chunks_split_utf8(self):
+        data = DIFF.replace("\n", "\r\n").encode('utf-8')
+        for seed in range(5):
+            self.assertMatchesParse(*self.parse(chunks(data, seed)))
+
+    def test_callback(self):
+        seen = []
+        parser = DiffParser(on_file=lambda record: seen.append(record.path))
+        split = DIFF.index("diff --git a/modified.py")
+        parser.feed(DIFF[:split + 5])
+        # The header line is not complete yet
+        self.assertEqual(seen, [])
+        self.assertEqual(parser.current_file.path, 'added.py')
+        parser.feed(DIFF[split + 5:split + 50])
+        self.assertEqual(seen, ['added.py'])
+        parser.feed(DIFF[split + 50:])
+        self.assertEqual(parser.current_file.path, 'modified.py')
+        self.assertEqual(parser.new_line_pos, 3)
+        parser.close()
+        self.assertEqual(seen, ['added.py', 'modified.py'])
+        self.assertEqual(len(parser.completed), 0)
+
+    def test_detail(self):
+        totals, files = self.parse([DIFF], detail="files")
+        self.assertEqual(files['modified.py']['hunks'], [])
+        self.assertEqual(totals.total_lines_added, 3)
+
+    def test_feed_after_close(self):
+        parser = DiffParser()
+        parser.feed(DIFF)
+        parser.close()
+        with self.assertRaises(ValueError):
+            parser.feed("+more\n")
+
+
+if __name__ == '__main__':
+    unittest.main()
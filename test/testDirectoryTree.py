@@ -0,0 +1,95 @@
+import sys
+import os
+import pickle
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
+from gitdiffstats.diffstats import parse_git_diff, parse_git_diff_compact
+from gitdiffstats.filters import FileFilter
+from gitdiffstats.tree import DirectoryTree, build_tree, parse_git_diff_with_tree
+import unittest
+
+
+def file_diff(path, added, removed):
+    lines = "".join(f"+a{i}\n" for i in range(added)) + "".join(f"-r{i}\n" for i in range(removed))
+    return (f"diff --git a/{path} b/{path}\n"
+            f"--- a/{path}\n"
+            f"+++ b/{path}\n"
+            f"@@ -1,{removed} +1,{added} @@\n" + lines)
+
+
+DIFF = (file_diff("services/billing/api.py", 3, 1)
+        + file_diff("services/billing/models/invoice.py", 2, 2)
+        + file_diff("services/auth/login.py", 1, 0)
+        + file_diff("docs/index.md", 0, 5)
+        + file_diff("README.md", 1, 1))
+
+
+class TestDirectoryTree(unittest.TestCase):
+    def test_rollups(self):
+        result, tree = parse_git_diff_with_tree(DIFF)
+        self.assertEqual(result, parse_git_diff(DIFF))
+        self.assertEqual(tree.stats(), {'files': 5, 'added': 7, 'removed': 9})
+        self.assertEqual(tree.rollup(1), {
+            'docs/': {'files': 1, 'added': 0, 'removed': 5},
+            'services/': {'files': 3, 'added': 6, 'removed': 3},
+        })
+        self.assertEqual(list(tree.rollup()), ['docs/', 'services/', 'services/auth/', 'services/billing/',
+                                               'services/billing/models/'])
+        self.assertEqual(tree.stats('services/billing'), {'files': 2, 'added': 5, 'removed': 3})
+        self.assertEqual(tree.stats('services/billing/'), tree.stats('services/billing'))
+        self.assertIn('services/auth/', tree)
+        self.assertNotIn('services/auth/login.py', tree)
+        self.assertEqual(len(tree), 5)
+        with self.assertRaises(KeyError):
+            tree.stats('nowhere')
+
+    def test_top(self):
+        tree = build_tree(DIFF)
+        self.assertEqual([directory for directory, _ in tree.top(2)], ['services/', 'services/billing/'])
+        self.assertEqual(tree.top(1, depth=1), [('services/', {'files': 3, 'added': 6, 'removed': 3})])
+        self.assertEqual([directory for directory, _ in tree.top(2, by="removed", depth=1)], ['docs/', 'services/'])
+        self.assertEqual([directory for directory, _ in tree.top(3, depth=2)],
+                         ['services/billing/', 'services/auth/'])
+        with self.assertRaises(ValueError):
+            tree.top(by="size")
+
+    def test_details_and_filters(self):
+        for detail in ("totals", "files", "hunks", "full"):
+            result, tree = parse_git_diff_with_tree(DIFF.encode('utf-8'), detail)
+            self.assertEqual(result, parse_git_diff(DIFF, detail))
+            self.assertEqual(tree, build_tree(DIFF))
+
+        docs_only = FileFilter(include=['docs/*'])
+        result, tree = parse_git_diff_with_tree(DIFF, file_filter=docs_only)
+        self.assertEqual(list(tree.rollup()), ['docs/'])
+        self.assertEqual(tree.stats(), {'files': 1, 'added': 0, 'removed': 5})
+
+        self.assertEqual(DirectoryTree().update(parse_git_diff(DIFF)), build_tree(DIFF))
+        self.assertEqual(DirectoryTree().update(parse_git_diff_compact(DIFF)), build_tree(DIFF))
+        self.assertEqual(build_tree(""), DirectoryTree())
+
+    def test_merge(self):
+        first = DIFF[:DIFF.index("diff --git a/docs/")]
+        second = DIFF[len(first):]
+        merged = build_tree(first).merge(build_tree(second))
+        self.assertEqual(merged, build_tree(DIFF))
+
+        # The same file in two diffs adds its lines but counts once
+        again = build_tree(file_diff("services/auth/login.py", 4, 0))
+        merged.merge(again)
+        self.assertEqual(merged.stats('services/'), {'files': 3, 'added': 10, 'removed': 3})
+        self.assertEqual(again.stats(), {'files': 1, 'added': 4, 'removed': 0})
+        self.assertEqual(DirectoryTree.from_results([parse_git_diff(DIFF), parse_git_diff_compact(
+            file_diff("services/auth/login.py", 4, 0))]), merged)
+
+        # Merged subtrees are copies
+        empty = DirectoryTree().merge(again)
+        empty.add("services/auth/logout.py", 1)
+        self.assertEqual(again.stats(), {'files': 1, 'added': 4, 'removed': 0})
+
+    def test_pickle(self):
+        tree = build_tree(DIFF)
+        self.assertEqual(pickle.loads(pickle.dumps(tree)), tree)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,170 @@
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
+from gitdiffstats.diffstats import parse_git_diff, parse_git_diff_file, DiffParser, iter_git_diff
+from gitdiffstats.filters import FileFilter
+from gitdiffstats.log import iter_git_log
+from gitdiffstats.parallel import parse_git_diff_parallel
+import unittest
+
+DIFF = (
+    "diff --git a/src/app.py b/src/app.py\n"
+    "index 1111111..2222222 100644\n"
+    "--- a/src/app.py\n"
+    "+++ b/src/app.py\n"
+    "@@ -1,3 +1,4 @@\n"
+    " import os\n"
+    "-x = 1\n"
+    "+x = 2\n"
+    "+y = 3\n"
+    " print(x)\n"
+    "diff --git a/web/yarn.lock b/web/yarn.lock\n"
+    "index 3333333..4444444 100644\n"
+    "--- a/web/yarn.lock\n"
+    "+++ b/web/yarn.lock\n"
+    "@@ -1,2 +1,2 @@\n"
+    "-diff --git a/fake b/fake\n"
+    "+lodash@4.17.21\n"
+    " left-pad@1.0.0\n"
+    "diff --git a/vendor/lib/util.c b/vendor/lib/util.c\n"
+    "new file mode 100644\n"
+    "--- /dev/null\n"
+    "+++ b/vendor/lib/util.c\n"
+    "@@ -0,0 +1,2 @@\n"
+    "+int a;\n"
+    "+int b;\n"
+    "diff --git a/src/big.py b/src/big.py\n"
+    "--- a/src/big.py\n"
+    "+++ b/src/big.py\n"
+    "@@ -1,2 +1,5 @@\n"
+    "-one\n"
+    "-two\n"
+    "+first line\n"
+    "+second line\n"
+    "+third line\n"
+    "+fourth line\n"
+    "+fifth line\n"
+)
+
+EXCLUDE = FileFilter(exclude=["*.lock", "vendor/*"])
+
+
+def _without(result, *paths):
+    """The unfiltered result with paths removed, totals included."""
+    files = {path: stats for path, stats in result['files'].items() if path not in paths}
+    return {
+        'total_files_changed': len(files),
+        'total_lines_added': sum(stats['added'] for stats in files.values()),
+        'total_lines_removed': sum(stats['removed'] for stats in files.values()),
+        'files': files
+    }
+
+
+class TestFileFilter(unittest.TestCase):
+    def test_accepts(self):
+        file_filter = FileFilter(include="src/*", exclude="*_pb2.py", predicate=lambda path: "tmp" not in path)
+        self.assertTrue(file_filter.accepts("src/app.py"))
+        self.assertTrue(file_filter.accepts("src/deep/app.py"))
+        self.assertFalse(file_filter.accepts("docs/index.md"))
+        self.assertFalse(file_filter.accepts("src/api_pb2.py"))
+        self.assertFalse(file_filter.accepts("src/tmp.py"))
+        self.assertTrue(FileFilter().accepts("anything"))
+        self.assertFalse(FileFilter().capped)
+        self.assertTrue(FileFilter(max_lines_per_file=1).capped)
+
+    def test_excluded_sections_are_skipped(self):
+        for detail in ("totals", "files", "hunks", "full"):
+            expected = _without(parse_git_diff(DIFF, "files" if detail == "totals" else detail),
+                                "web/yarn.lock", "vendor/lib/util.c")
+            if detail == "totals":
+                expected['files'] = {}
+            self.assertEqual(parse_git_diff(DIFF, detail, file_filter=EXCLUDE), expected)
+            self.assertEqual(parse_git_diff(DIFF.encode('utf-8'), detail, file_filter=EXCLUDE), expected)
+
+    def test_include_and_predicate(self):
+        result = parse_git_diff(DIFF, file_filter=FileFilter(include="src/*", predicate=lambda p: p != "src/big.py"))
+        self.assertEqual(list(result['files']), ["src/app.py"])
+        self.assertEqual(result['total_files_changed'], 1)
+        self.assertEqual(result['total_lines_added'], 2)
+        self.assertEqual(result['total_lines_removed'], 1)
+
+    def test_streaming_sources_agree(self):
+        expected = parse_git_diff(DIFF, file_filter=EXCLUDE)
+
+        parser = DiffParser(file_filter=EXCLUDE)
+        for i in range(0, len(DIFF), 7):
+            parser.feed(DIFF[i:i + 7])
+        totals = parser.close()
+        self.assertEqual({record.path: record.to_dict() for record in parser.completed}, expected['files'])
+        self.assertEqual(totals.total_lines_added, expected['total_lines_added'])
+
+        records = list(iter_git_diff(DIFF.splitlines(keepends=True), file_filter=EXCLUDE))
+        self.assertEqual([record.path for record in records[:-1]], ["src/app.py", "src/big.py"])
+
+        with tempfile.NamedTemporaryFile('wb', suffix='.diff', delete=False) as diff_file:
+            diff_file.write(DIFF.encode('utf-8'))
+        try:
+            self.assertEqual(parse_git_diff_file(diff_file.name, file_filter=EXCLUDE).to_dict(), expected)
+        finally:
+            os.unlink(diff_file.name)
+
+        self.assertEqual(parse_git_diff_parallel(DIFF, workers=1, file_filter=EXCLUDE), expected)
+
+    def test_snippet_without_diff_git_headers(self):
+        snippet = "".join(line for line in DIFF.splitlines(keepends=True)
+                          if not line.startswith(("diff --git", "index ", "new file")))
+        result = parse_git_diff(snippet, "files", file_filter=EXCLUDE)
+        self.assertEqual(sorted(result['files']), ["src/app.py", "src/big.py"])
+        self.assertEqual(result['total_lines_added'], 7)
+        self.assertEqual(result['total_lines_removed'], 3)
+
+    def test_excluded_snippet_section_keeps_next_file_header(self):
+        # The section started by '+++ b/x' ends before y's header lines, not at y's '+++ b/'
+        excluded = FileFilter(exclude=["x"])
+        with_diff_git = ("--- a/x\n+++ b/x\n@@ -1 +1 @@\n-o\n+n\n"
+                         "diff --git a/y b/y\nnew file mode 100644\n--- /dev/null\n+++ b/y\n@@ -0,0 +1 @@\n+n\n")
+        # x removes a line that reads '--- x' while its hunk still expects one
+        plain = ("--- a/x\n+++ b/x\n@@ -1,2 +1,1 @@\n-o\n---- x\n+n\n"
+                 "--- /dev/null\n+++ b/y\n@@ -0,0 +1 @@\n+n\n")
+        for diff in (with_diff_git, plain):
+            for source in (diff, diff.encode('utf-8')):
+                result = parse_git_diff(source, file_filter=excluded)
+                self.assertEqual(result['files'], parse_git_diff(source, file_filter=FileFilter(include=["y"]))['files'])
+                self.assertEqual(result['files']['y']['change_type'], 'added')
+                self.assertEqual((result['total_files_changed'], result['total_lines_added'],
+                                  result['total_lines_removed']), (1, 1, 0))
+
+            parser = DiffParser(file_filter=excluded)
+            for char in diff:
+                parser.feed(char)
+            parser.close()
+            self.assertEqual([(record.path, record.change_type) for record in parser.completed], [('y', 'added')])
+
+    def test_caps_keep_counts_exact(self):
+        full = parse_git_diff(DIFF)
+        for source in (DIFF, DIFF.encode('utf-8')):
+            result = parse_git_diff(source, file_filter=FileFilter(max_lines_per_file=5))
+            big = result['files']['src/big.py']
+            self.assertTrue(big['truncated'])
+            self.assertEqual((big['added'], big['removed']), (5, 2))
+            self.assertEqual(big['hunks'][0]['changes'], full['files']['src/big.py']['hunks'][0]['changes'][:5])
+            # app.py has exactly five change lines (context included), so it is complete
+            self.assertNotIn('truncated', result['files']['src/app.py'])
+            self.assertEqual(result['files']['src/app.py'], full['files']['src/app.py'])
+            self.assertEqual(result['total_lines_added'], full['total_lines_added'])
+
+            result = parse_git_diff(source, file_filter=FileFilter(max_content_bytes=15))
+            changes = result['files']['src/big.py']['hunks'][0]['changes']
+            self.assertEqual([change['content'] for change in changes], ["one", "two"])
+            self.assertTrue(result['files']['src/big.py']['truncated'])
+
+    def test_git_log(self):
+        log = "commit " + "a" * 40 + "\nAuthor: A <a@example.com>\n\n    Update\n\n" + DIFF
+        commit, = iter_git_log(log, file_filter=EXCLUDE)
+        self.assertEqual(sorted(commit.files), ["src/app.py", "src/big.py"])
+        self.assertEqual(commit.total_files_changed, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,218 @@
+import sys
+import os
+import io
+import subprocess
+import tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
+from gitdiffstats.diffstats import parse_git_diff
+from gitdiffstats.log import iter_git_log
+from gitdiffstats.model import CommitDiff
+import unittest
+
+LOG = (
+    "commit 1111111111111111111111111111111111111111 (HEAD -> main)\n"
+    "Merge: 2222222 3333333\n"
+    "Author: Dev One <one@example.com>\n"
+    "Date:   Mon Jan 1 10:00:00 2024 +0000\n"
+    "\n"
+    "    Merge branch 'feature'\n"
+    "\n"
+    "diff --cc app.py\n"
+    "index 1111111,2222222..3333333\n"
+    "@@@ -1,1 -1,1 +1,2 @@@\n"
+    "- old\n"
+    " -other\n"
+    "++merged\n"
+    "\n"
+    "commit 2222222222222222222222222222222222222222\n"
+    "Author: Dev Two <two@example.com>\n"
+    "Date:   Sun Dec 31 09:00:00 2023 +0000\n"
+    "\n"
+    "    Change app\n"
+    "\n"
+    "    - adds a line\n"
+    "    +++ keeps the message indented\n"
+    "\n"
+    "diff --git a/app.py b/app.py\n"
+    "index 1111111..2222222 100644\n"
+    "--- a/app.py\n"
+    "+++ b/app.py\n"
+    "@@ -1,2 +1,3 @@\n"
+    " import os\n"
+    "-print('old')\n"
+    "+print('new')\n"
+    "+print('again')\n"
+    "\n"
+    "commit 3333333333333333333333333333333333333333\n"
+    "Author: Dev One <one@example.com>\n"
+    "Date:   Sat Dec 30 08:00:00 2023 +0000\n"
+    "\n"
+    "    Add app\n"
+    "\n"
+    "diff --git a/app.py b/app.py\n"
+    "new file mode 100644\n"
+    "--- /dev/null\n"
+    "+++ b/app.py\n"
+    "@@ -0,0 +1,2 @@\n"
+    "+import os\n"
+    "+print('old')\n"
+)
+
+PATCHES = (
+    "From 4444444444444444444444444444444444444444 Mon Sep 17 00:00:00 2001\n"
+    "From: Dev One <one@example.com>\n"
+    "Date: Sat, 30 Dec 2023 08:00:00 +0000\n"
+    "Subject: [PATCH 1/2] Add a config file with a rather long subject that git\n"
+    " folds onto a second line\n"
+    "\n"
+    "- a bullet in the body\n"
+    "---\n"
+    " config.yml | 2 ++\n"
+    " 1 file changed, 2 insertions(+)\n"
+    "\n"
+    "diff --git a/config.yml b/config.yml\n"
+    "new file mode 100644\n"
+    "--- /dev/null\n"
+    "+++ b/config.yml\n"
+    "@@ -0,0 +1,2 @@\n"
+    "+---\n"
+    "+name: demo\n"
+    "-- \n"
+    "2.39.5\n"
+    "\n"
+    "From 5555555555555555555555555555555555555555 Mon Sep 17 00:00:00 2001\n"
+    "From: Dev Two <two@example.com>\n"
+    "Date: Sun, 31 Dec 2023 09:00:00 +0000\n"
+    "Subject: [PATCH 2/2] Drop the marker\n"
+    "\n"
+    "---\n"
+    " config.yml | 2 +-\n"
+    "\n"
+    "diff --git a/config.yml b/config.yml\n"
+    "--- a/config.yml\n"
+    "+++ b/config.yml\n"
+    "@@ -1,2 +1,2 @@\n"
+    "-- \n"
+    "+--\n"
+    " name: demo\n"
+    "-- \n"
+    "2.39.5\n"
+)
+
+
+class TestGitLog(unittest.TestCase):
+    def test_git_log(self):
+        commits = list(iter_git_log(io.StringIO(LOG)))
+        self.assertEqual([c.sha[:7] for c in commits], ['1111111', '2222222', '3333333'])
+        self.assertTrue(all(isinstance(c, CommitDiff) for c in commits))
+
+        merge, change, add = commits
+        self.assertEqual(merge.message, "Merge branch 'feature'")
+        self.assertEqual(merge.files, {})
+        self.assertEqual(merge.total_lines_added, 0)
+
+        self.assertEqual(change.author, "Dev Two <two@example.com>")
+        self.assertEqual(change.date, "Sun Dec 31 09:00:00 2023 +0000")
+        self.assertEqual(change.message, "Change app\n\n- adds a line\n+++ keeps the message indented")
+        self.assertEqual((change.total_files_changed, change.total_lines_added,
+                          change.total_lines_removed), (1, 2, 1))
+        self.assertEqual(change.files['app.py'].change_type, 'modified')
+
+        # The same file in another commit is its own entry
+        self.assertEqual(add.files['app.py'].change_type, 'added')
+        self.assertEqual(add.files['app.py'].added, 2)
+
+    def test_format_patch(self):
+        first, second = iter_git_log(PATCHES.encode('utf-8'))
+        self.assertEqual(first.sha, "4" * 40)
+        self.assertEqual(first.author, "Dev One <one@example.com>")
+        self.assertEqual(first.date, "Sat, 30 Dec 2023 08:00:00 +0000")
+        self.assertEqual(first.message, "Add a config file with a rather long subject that git "
+                                        "folds onto a second line\n\n- a bullet in the body")
+        self.assertEqual((first.total_lines_added, first.total_lines_removed), (2, 0))
+
+        # "-- " is a removed line while the hunk still expects one, then the signature
+        self.assertEqual(second.message, "Drop the marker")
+        self.assertEqual((second.files['config.yml'].added, second.files['config.yml'].removed), (1, 1))
+
+    def test_format_patch_blank_context_line(self):
+        # The blank context line lost its trailing space, e.g. in a mail client
+        patch = (
+            "From 6666666666666666666666666666666666666666 Mon Sep 17 00:00:00 2001\n"
+            "From: Dev One <one@example.com>\n"
+            "Date: Mon, 1 Jan 2024 10:00:00 +0000\n"
+            "Subject: [PATCH] Edit the script\n"
+            "\n"
+            "---\n"
+            "diff --git a/run.sh b/run.sh\n"
+            "--- a/run.sh\n"
+            "+++ b/run.sh\n"
+            "@@ -1,3 +1,3 @@\n"
+            " set -e\n"
+            "\n"
+            "-echo old\n"
+            "+echo new\n"
+            "-- \n"
+            "2.40.0\n"
+        )
+        for source in (patch, patch.encode('utf-8')):
+            commit, = iter_git_log(source)
+            self.assertEqual((commit.total_lines_added, commit.total_lines_removed), (1, 1))
+            self.assertEqual((commit.files['run.sh'].added, commit.files['run.sh'].removed), (1, 1))
+
+    def test_detail_and_to_dict(self):
+        commits = list(iter_git_log(LOG, detail="full"))
+        section = LOG[LOG.index("diff --git"):LOG.index("commit 3333")]
+        expected = parse_git_diff(section)
+        as_dict = commits[1].to_dict()
+        self.assertEqual(as_dict['sha'], "2" * 40)
+        self.assertEqual(as_dict['files'], expected['files'])
+        self.assertEqual(as_dict['total_lines_added'], expected['total_lines_added'])
+
+        totals_only = list(iter_git_log(LOG, detail="totals"))
+        self.assertEqual(totals_only[1].files, {})
+        self.assertEqual(totals_only[1].total_lines_added, 2)
+
+    def test_streams_one_commit_at_a_time(self):
+        consumed = []
+
+        def lines():
+            for line in LOG.splitlines():
+                consumed.append(line)
+                yield line
+
+        commits = iter_git_log(lines())
+        next(commits)
+        next(commits)
+        self.assertTrue(consumed[-1].startswith("commit 3333"))
+
+    def test_empty(self):
+        self.assertEqual(list(iter_git_log("")), [])
+
+    def test_real_repository(self):
+        with tempfile.TemporaryDirectory() as repo:
+            def git(*args):
+                return subprocess.run(['git', '-C', repo, *args], check=True,
+                                      capture_output=True).stdout
+
+            git('init', '-q')
+            git('config', 'user.email', 'dev@example.com')
+            git('config', 'user.name', 'Dev')
+            for i in range(3):
+                with open(os.path.join(repo, 'notes.txt'), 'a') as f:
+                    f.write(f"line {i}\n")
+                git('add', '-A')
+                git('commit', '-q', '-m', f'commit {i}')
+
+            process = subprocess.Popen(['git', '-C', repo, 'log', '-p'], stdout=subprocess.PIPE)
+            with process.stdout:
+                commits = list(iter_git_log(process.stdout))
+            process.wait()
+
+        self.assertEqual([c.message for c in commits], ['commit 2', 'commit 1', 'commit 0'])
+        self.assertEqual([c.files['notes.txt'].added for c in commits], [1, 1, 1])
+        self.assertEqual([c.author for c in commits], ['Dev <dev@example.com>'] * 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
+from gitdiffstats.diffstats import parse_git_diff
+from gitdiffstats.filters import FileFilter
+from gitdiffstats.incremental import parse_git_diff_incremental
+import unittest
+
+
+def section(path, removed, added):
+    return (
+        f"diff --git a/{path} b/{path}\n"
+        f"--- a/{path}\n"
+        f"+++ b/{path}\n"
+        f"@@ -1 +1 @@\n"
+        f"-{removed}\n"
+        f"+{added}\n"
+    )
+
+
+V1 = section("a.py", "x = 1", "x = 2") + section("b.py", "y = 1", "y = 2") + section("c.py", "z", "zz")
+V2 = section("a.py", "x = 1", "x = 3") + section("b.py", "y = 1", "y = 2") + section("d.py", "w", "ww")
+
+
+class TestIncremental(unittest.TestCase):
+    def test_reuses_unchanged_sections(self):
+        first = parse_git_diff_incremental(V1)
+        self.assertEqual(first.result, parse_git_diff(V1))
+        self.assertEqual((first.sections, first.reused, first.parsed), (3, 0, 3))
+
+        second = parse_git_diff_incremental(V2, first)
+        self.assertEqual(second.result, parse_git_diff(V2))
+        self.assertEqual((second.sections, second.reused, second.parsed), (3, 1, 2))
+        # The unchanged file's entry is the very same object
+        self.assertIs(second.result['files']['b.py'], first.result['files']['b.py'])
+        self.assertNotIn('c.py', second.result['files'])
+
+        third = parse_git_diff_incremental(V2, second)
+        self.assertEqual(third.parsed, 0)
+        self.assertEqual(third.result, second.result)
+
+    def test_totals_are_recomputed(self):
+        preamble = "+stray line\n"
+        first = parse_git_diff_incremental(V1, detail="totals")
+        second = parse_git_diff_incremental(preamble + V1 + V1, first, detail="totals")
+        self.assertEqual(second.result, parse_git_diff(preamble + V1 + V1, "totals"))
+        self.assertEqual(second.parsed, 1)
+
+    def test_bytes_and_options(self):
+        data = V2.encode('utf-8')
+        file_filter = FileFilter(exclude="d.py")
+        first = parse_git_diff_incremental(V1.encode('utf-8'), detail="files", file_filter=file_filter)
+        second = parse_git_diff_incremental(data, first, detail="files", file_filter=file_filter)
+        self.assertEqual(second.result, parse_git_diff(data, "files", file_filter=file_filter))
+        self.assertEqual(second.reused, 1)
+
+        # A different detail level or filter parses everything again
+        self.assertEqual(parse_git_diff_incremental(data, second, detail="full").parsed, 3)
+        self.assertEqual(parse_git_diff_incremental(data, second, detail="files").parsed, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import sys
+import os
+import io
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
+from gitdiffstats.diffstats import parse_git_diff, iter_git_diff, FileDiff, DiffTotals
+import unittest
+
+DIFF = (
+    "diff --git a/added.py b/added.py\n"
+    "new file mode 100644\n"
+    "index 0000000..e69de29\n"
+    "--- /dev/null\n"
+    "+++ b/added.py\n"
+    "@@ -0,0 +1 @@\n"
+    "+print('new')\n"
+    "diff --git a/deleted.py b/deleted.py\n"
+    "deleted file mode 100644\n"
+    "--- a/deleted.py\n"
+    "+++ /dev/null\n"
+    "@@ -1 +0,0 @@\n"
+    "-print('bye')\n"
+    "diff --git a/modified.py b/modified.py\n"
+    "index 1111111..2222222 100644\n"
+    "--- a/modified.py\n"
+    "+++ b/modified.py\n"
+    "@@ -1,2 +1,3 @@\n"
+    " import os\n"
+    "-print('old')\n"
+    "+print('new')\n"
+    "+print('again')\n"
+)
+
+
+class TestIterGitDiff(unittest.TestCase):
+    def test_records_from_file_object(self):
+        records = list(iter_git_diff(io.StringIO(DIFF)))
+        self.assertEqual(len(records), 4)
+        self.assertTrue(all(isinstance(r, FileDiff) for r in records[:3]))
+        self.assertEqual([r.path for r in records[:3]], ['added.py', 'deleted.py', 'modified.py'])
+        self.assertEqual([r.change_type for r in records[:3]], ['added', 'deleted', 'modified'])
+
+        totals = records[-1]
+        self.assertIsInstance(totals, DiffTotals)
+        self.assertEqual(totals, DiffTotals(3, 3, 2))
+
+    def test_bytes_lines(self):
+        lines = io.BytesIO(DIFF.replace("\n", "\r\n").encode('utf-8'))
+        records = list(iter_git_diff(lines))
+        modified = records[2]
+        self.assertEqual(modified.added, 2)
+        self.assertEqual(modified.removed, 1)
+        self.assertEqual(modified.hunks[0].content(1), "print('old')")
+
+    def test_records_yielded_before_input_is_exhausted(self):
+        consumed = []
+
+        def lines():
+            for line in DIFF.splitlines():
+                consumed.append(line)
+                yield line
+
+        iterator = iter_git_diff(lines())
+        first = next(iterator)
+        self.assertEqual(first.path, 'added.py')
+        # Only read up to the header of the following file
+        self.assertEqual(consumed[-1], "diff --git a/deleted.py b/deleted.py")
+
+    def test_headers_do_not_leak_into_previous_hunk(self):
+        records = list(iter_git_diff(DIFF.splitlines()))
+        deleted_hunk = records[1].hunks[0]
+        self.assertEqual(len(deleted_hunk), 1)
+
+    def test_matches_parse_git_diff(self):
+        result = parse_git_diff(DIFF)
+        records = list(iter_git_diff(io.StringIO(DIFF)))
+        self.assertEqual(result['total_files_changed'], records[-1].total_files_changed)
+        for record in records[:-1]:
+            self.assertEqual(result['files'][record.path], record.to_dict())
+
+    def test_empty_source(self):
+        self.assertEqual(list(iter_git_diff(io.StringIO(""))), [DiffTotals(0, 0, 0)])
+
+
+if __name__ == '__main__':
+    unittest.main()
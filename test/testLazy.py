@@ -0,0 +1,92 @@
+import sys
+import os
+import json
+import pathlib
+import tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
+from gitdiffstats.diffstats import parse_git_diff
+from gitdiffstats.filters import FileFilter
+from gitdiffstats.lazy import parse_git_diff_lazy, LazyFileStats
+import unittest
+
+DIFF = (
+    "diff --git a/app.py b/app.py\n"
+    "index 1111111..2222222 100644\n"
+    "--- a/app.py\n"
+    "+++ b/app.py\n"
+    "@@ -1,3 +1,3 @@\n"
+    " import os\n"
+    "-x = 1\n"
+    "+x = 2\n"
+    " print(x)\n"
+    "diff --git a/logo.png b/logo.png\n"
+    "Binary files a/logo.png and b/logo.png differ\n"
+    "diff --git a/notes.txt b/notes.txt\n"
+    "new file mode 100644\n"
+    "--- /dev/null\n"
+    "+++ b/notes.txt\n"
+    "@@ -0,0 +1,2 @@\n"
+    "+diff --git a/fake b/fake\n"
+    "+second\n"
+    "diff --git a/app.py b/app.py\n"
+    "--- a/app.py\n"
+    "+++ b/app.py\n"
+    "@@ -10 +10 @@\n"
+    "-y\n"
+    "+z\n"
+)
+
+
+class TestLazy(unittest.TestCase):
+    def test_equal_to_parse_git_diff(self):
+        for source in (DIFF, DIFF.encode('utf-8')):
+            for detail in ("hunks", "full"):
+                expected = parse_git_diff(source, detail)
+                result = parse_git_diff_lazy(source, detail)
+                self.assertEqual(result, expected)
+                self.assertEqual(list(result['files']), list(expected['files']))
+                for path, stats in result['files'].items():
+                    self.assertEqual(list(stats), list(expected['files'][path]))
+                    self.assertEqual(stats.to_dict(), expected['files'][path])
+
+    def test_hunks_are_parsed_on_access(self):
+        result = parse_git_diff_lazy(DIFF)
+        notes = result['files']['notes.txt']
+        self.assertIsInstance(notes, LazyFileStats)
+        self.assertFalse(notes.hunks_loaded)
+        self.assertEqual((notes['added'], notes['removed'], notes['change_type']), (2, 0, "added"))
+        self.assertIn('hunks', notes)
+        self.assertFalse(notes.hunks_loaded)
+
+        hunks = notes['hunks']
+        self.assertTrue(notes.hunks_loaded)
+        self.assertIs(notes['hunks'], hunks)
+        self.assertEqual(hunks[0]['changes'][0]['content'], "diff --git a/fake b/fake")
+        self.assertFalse(result['files']['logo.png'].hunks_loaded)
+
+        # The later section for app.py replaced the first, as in parse_git_diff
+        self.assertEqual(result['files']['app.py']['hunks'][0]['old_start'], 10)
+        self.assertTrue(result['files']['logo.png']['binary'])
+        self.assertEqual(json.loads(json.dumps(notes.to_dict())), parse_git_diff(DIFF)['files']['notes.txt'])
+
+    def test_path_and_filters(self):
+        with tempfile.NamedTemporaryFile('wb', suffix='.diff', delete=False) as diff_file:
+            diff_file.write(DIFF.encode('utf-8'))
+        try:
+            file_filter = FileFilter(exclude="*.png", max_lines_per_file=1)
+            result = parse_git_diff_lazy(pathlib.Path(diff_file.name), file_filter=file_filter)
+            self.assertEqual(result, parse_git_diff(DIFF, file_filter=file_filter))
+            self.assertTrue(result['files']['notes.txt']['truncated'])
+            self.assertNotIn('logo.png', result['files'])
+        finally:
+            os.unlink(diff_file.name)
+
+    def test_empty_and_invalid_detail(self):
+        self.assertEqual(parse_git_diff_lazy(""), parse_git_diff(""))
+        self.assertEqual(parse_git_diff_lazy(None), parse_git_diff(None))
+        with self.assertRaises(ValueError):
+            parse_git_diff_lazy(DIFF, "files")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
+from gitdiffstats.diffstats import parse_git_diff, parse_git_diff_compact
+from gitdiffstats.lineindex import LineIndex, build_line_indexes
+import unittest
+
+# Old file: lines 1-20. Line 3 is replaced by two lines, line 12 is removed,
+# two lines are inserted after line 17 and the last line loses its newline.
+DIFF = (
+    "diff --git a/app.py b/app.py\n"
+    "--- a/app.py\n"
+    "+++ b/app.py\n"
+    "@@ -2,3 +2,4 @@\n"
+    " two\n"
+    "-three\n"
+    "+three a\n"
+    "+three b\n"
+    " four\n"
+    "@@ -11,3 +12,2 @@\n"
+    " eleven\n"
+    "-twelve\n"
+    " thirteen\n"
+    "@@ -17,0 +18,2 @@\n"
+    "+inserted 1\n"
+    "+inserted 2\n"
+    "@@ -20 +22 @@\n"
+    "-twenty\n"
+    "\\ No newline at end of file\n"
+    "+twenty!\n"
+    "\\ No newline at end of file\n"
+)
+
+
+class TestLineIndex(unittest.TestCase):
+    def setUp(self):
+        self.indexes = [
+            LineIndex(parse_git_diff(DIFF)['files']['app.py']),
+            build_line_indexes(parse_git_diff_compact(DIFF))['app.py'],
+            build_line_indexes(parse_git_diff_compact(DIFF.encode('utf-8')))['app.py'],
+        ]
+
+    def test_map_old_to_new(self):
+        expected = {1: 1, 2: 2, 3: None, 4: 5, 5: 6, 10: 11, 11: 12, 12: None, 13: 13,
+                    16: 16, 17: 17, 18: 20, 19: 21, 20: None, 21: 23}
+        for index in self.indexes:
+            self.assertEqual({line: index.map_old_to_new(line) for line in expected}, expected)
+
+    def test_map_new_to_old(self):
+        expected = {1: 1, 2: 2, 3: None, 4: None, 5: 4, 12: 11, 13: 13, 17: 17,
+                    18: None, 19: None, 20: 18, 21: 19, 22: None, 23: 21}
+        for index in self.indexes:
+            self.assertEqual({line: index.map_new_to_old(line) for line in expected}, expected)
+
+    def test_hunk_at(self):
+        def header(hunk):
+            if hunk is None or isinstance(hunk, dict):
+                return hunk and hunk['header']
+            return hunk.header
+
+        for index in self.indexes:
+            headers = [header(index.hunk_at(line)) for line in (1, 4, 12, 19, 22)]
+            self.assertEqual(headers, [None, "@@ -2,3 +2,4 @@", "@@ -11,3 +12,2 @@",
+                                       "@@ -17,0 +18,2 @@", "@@ -20 +22 @@"])
+            self.assertIsNone(index.hunk_at(18, side="old"))
+            self.assertIsNotNone(index.hunk_at(12, side="old"))
+            with self.assertRaises(ValueError):
+                index.hunk_at(1, side="both")
+
+    def test_hunks_detail_maps_outside_lines_only(self):
+        index = LineIndex(parse_git_diff(DIFF, detail="hunks")['files']['app.py'])
+        self.assertEqual(index.map_old_to_new(8), 9)
+        self.assertEqual(index.map_old_to_new(19), 21)
+        self.assertIsNone(index.map_old_to_new(2))
+        self.assertEqual(len(index), 4)
+
+    def test_added_and_deleted_files(self):
+        diff = (
+            "diff --git a/new.py b/new.py\n"
+            "new file mode 100644\n"
+            "--- /dev/null\n"
+            "+++ b/new.py\n"
+            "@@ -0,0 +1,2 @@\n"
+            "+a\n"
+            "+b\n"
+            "diff --git a/old.py b/old.py\n"
+            "deleted file mode 100644\n"
+            "--- a/old.py\n"
+            "+++ /dev/null\n"
+            "@@ -1,2 +0,0 @@\n"
+            "-a\n"
+            "-b\n"
+        )
+        indexes = build_line_indexes(parse_git_diff(diff))
+        self.assertIsNone(indexes['new.py'].map_new_to_old(2))
+        self.assertIsNotNone(indexes['new.py'].hunk_at(1))
+        self.assertIsNone(indexes['old.py'].map_old_to_new(1))
+        self.assertIsNotNone(indexes['old.py'].hunk_at(2, side="old"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
+from gitdiffstats.diffstats import parse_git_diff, parse_git_diff_compact
+from gitdiffstats.filters import FileFilter
+from gitdiffstats.moves import detect_moves
+import unittest
+
+
+def file_diff(path, removed, added, old_start=1, new_start=1):
+    return (f"diff --git a/{path} b/{path}\n"
+            f"--- a/{path}\n"
+            f"+++ b/{path}\n"
+            f"@@ -{old_start},{len(removed)} +{new_start},{len(added)} @@\n"
+            + "".join(f"-{line}\n" for line in removed)
+            + "".join(f"+{line}\n" for line in added))
+
+
+FUNCTION = ["def total(items):", "    result = 0", "    for item in items:", "        result += item",
+            "    return result"]
+
+# total() moves from util.py to math/sums.py, indented into a class
+DIFF = (file_diff("util.py", ["import os"] + FUNCTION, ["import os, sys"])
+        + file_diff("math/sums.py", [], ["class Sums:"] + [f"    {line}" for line in FUNCTION], 1, 3))
+
+
+class TestMovedCode(unittest.TestCase):
+    def test_move_between_files(self):
+        moves = detect_moves(DIFF)
+        self.assertEqual(moves['blocks'], [{'from_path': 'util.py', 'from_line': 2, 'to_path': 'math/sums.py',
+                                            'to_line': 4, 'lines': 5}])
+        self.assertEqual(moves['moved_lines'], 5)
+        self.assertEqual((moves['total_lines_added'], moves['total_lines_removed']), (7, 6))
+        self.assertEqual((moves['net_lines_added'], moves['net_lines_removed']), (2, 1))
+        self.assertEqual(moves['files'], {
+            'util.py': {'moved_in': 0, 'moved_out': 5, 'net_added': 1, 'net_removed': 1},
+            'math/sums.py': {'moved_in': 5, 'moved_out': 0, 'net_added': 1, 'net_removed': 0},
+        })
+
+    def test_inputs(self):
+        expected = detect_moves(DIFF)
+        self.assertEqual(detect_moves(DIFF.encode('utf-8')), expected)
+        self.assertEqual(detect_moves(parse_git_diff(DIFF)), expected)
+        self.assertEqual(detect_moves(parse_git_diff_compact(DIFF.encode('utf-8'))), expected)
+        self.assertEqual(detect_moves("")['moved_lines'], 0)
+        for detail in ("totals", "files", "hunks"):
+            with self.assertRaises(ValueError):
+                detect_moves(parse_git_diff(DIFF, detail))
+        with self.assertRaises(ValueError):
+            detect_moves(DIFF, k=0)
+
+        only_util = detect_moves(DIFF, file_filter=FileFilter(include=['util.py']))
+        self.assertEqual(only_util['moved_lines'], 0)
+        self.assertEqual(list(only_util['files']), ['util.py'])
+
+    def test_capped_filter(self):
+        # The cap ends within util.py's first hunk, leaving its second hunk without changes
+        diff = DIFF.replace("diff --git a/math/", "@@ -50,1 +50,1 @@\n-old\n+new\ndiff --git a/math/")
+        capped = FileFilter(max_lines_per_file=5)
+        result = parse_git_diff(diff, file_filter=capped)
+        self.assertTrue(result['files']['util.py']['truncated'])
+        self.assertEqual([len(hunk['changes']) for hunk in result['files']['util.py']['hunks']], [5, 0])
+
+        moves = detect_moves(diff, file_filter=capped)
+        self.assertEqual(moves, detect_moves(result))
+        self.assertEqual(moves['blocks'], [{'from_path': 'util.py', 'from_line': 2, 'to_path': 'math/sums.py',
+                                            'to_line': 4, 'lines': 4}])
+        self.assertEqual((moves['total_lines_added'], moves['total_lines_removed']), (8, 7))
+
+    def test_whitespace_and_window(self):
+        self.assertEqual(detect_moves(DIFF, ignore_whitespace=False)['moved_lines'], 0)
+        self.assertEqual(detect_moves(DIFF, min_lines=6)['blocks'], [])
+        self.assertEqual(detect_moves(DIFF, k=6)['blocks'], [])
+        self.assertEqual(detect_moves(DIFF, k=5)['moved_lines'], 5)
+
+    def test_move_within_file(self):
+        block = ["x = load()", "y = parse(x)", "z = render(y)"]
+        diff = (file_diff("app.py", block, [])
+                + "@@ -40,0 +37,3 @@\n" + "".join(f"+{line}\n" for line in block))
+        moves = detect_moves(parse_git_diff_compact(diff))
+        self.assertEqual(moves['blocks'], [{'from_path': 'app.py', 'from_line': 1, 'to_path': 'app.py',
+                                            'to_line': 37, 'lines': 3}])
+
+    def test_each_line_moves_once(self):
+        block = ["a = 1", "b = 2", "c = 3"]
+        diff = file_diff("old.py", block, []) + file_diff("one.py", [], block) + file_diff("two.py", [], block)
+        moves = detect_moves(diff)
+        self.assertEqual([(block['to_path'], block['lines']) for block in moves['blocks']], [('one.py', 3)])
+        self.assertEqual(moves['files']['two.py']['net_added'], 3)
+
+    def test_blank_and_punctuation_lines_do_not_move(self):
+        noise = ["", "}", "", "};", ""]
+        moves = detect_moves(file_diff("a.c", noise, []) + file_diff("b.c", [], noise))
+        self.assertEqual(moves['moved_lines'], 0)
+
+    def test_repetitive_code(self):
+        lines = ["x += 1"] * 1000
+        moves = detect_moves(file_diff("a.py", lines, []) + file_diff("b.py", [], lines))
+        self.assertEqual(moves['moved_lines'], 1000)
+        self.assertEqual(len(moves['blocks']), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import sys
+import os
+import pathlib
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
+from gitdiffstats.diffstats import parse_git_diff
+from gitdiffstats.parallel import parse_git_diff_parallel, _chunk_bounds
+import unittest
+
+
+def make_diff(files):
+    parts = []
+    for i in range(files):
+        path = f"pkg/file_{i}.py"
+        parts.append(
+            f"diff --git a/{path} b/{path}\n"
+            "index 1111111..2222222 100644\n"
+            f"--- a/{path}\n"
+            f"+++ b/{path}\n"
+            f"@@ -{i + 1},3 +{i + 1},{3 + i % 3} @@ def f():\n"
+            "     x = 1\n"
+            "-    y = 2\n"
+            + "+    y = 3\n" * (1 + i % 3) +
+            "     return x\n"
+        )
+    # A header the parser does not treat as a new file must never become a cut
+    parts.insert(files // 2, 'diff --git "a/quoted name" "b/quoted name"\n')
+    return "".join(parts)
+
+
+class TestParallel(unittest.TestCase):
+    def setUp(self):
+        self.diff = make_diff(40)
+
+    def test_matches_serial_with_threads(self):
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            for detail in ("totals", "files", "hunks", "full"):
+                result = parse_git_diff_parallel(self.diff, workers=3, detail=detail, executor=executor)
+                self.assertEqual(result, parse_git_diff(self.diff, detail=detail))
+
+    def test_matches_serial_with_processes(self):
+        self.assertEqual(parse_git_diff_parallel(self.diff, workers=2), parse_git_diff(self.diff))
+
+    def test_bytes_and_path(self):
+        expected = parse_git_diff(self.diff)
+        self.assertEqual(parse_git_diff_parallel(self.diff.encode('utf-8'), workers=1), expected)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = pathlib.Path(tmpdir, 'changes.diff')
+            path.write_text(self.diff)
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                self.assertEqual(parse_git_diff_parallel(path, workers=4, executor=executor), expected)
+
+            path.write_text("")
+            self.assertEqual(parse_git_diff_parallel(path), parse_git_diff(""))
+
+    def test_empty_text(self):
+        self.assertEqual(parse_git_diff_parallel("", workers=4), parse_git_diff(""))
+
+    def test_chunk_bounds_cut_at_file_headers(self):
+        bounds = _chunk_bounds(self.diff, 0, len(self.diff), 8)
+        self.assertEqual(bounds[0], 0)
+        self.assertEqual(bounds[-1], len(self.diff))
+        self.assertGreater(len(bounds), 2)
+        for cut in bounds[1:-1]:
+            self.assertTrue(self.diff.startswith("diff --git a/", cut))
+            self.assertEqual(self.diff[cut - 1], "\n")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
+from gitdiffstats.diffstats import parse_git_diff
+from gitdiffstats.filters import FileFilter
+from gitdiffstats.profiling import parse_git_diff_with_stats, ParseStats, LINE_CLASSES, PHASES
+import unittest
+
+DIFF = (
+    "diff --git a/app.py b/app.py\n"          # header
+    "index 1111111..2222222 100644\n"         # header
+    "--- a/app.py\n"                          # header
+    "+++ b/app.py\n"                          # header
+    "@@ -1,3 +1,3 @@\n"                       # hunk_header
+    " import os\n"                            # context
+    "--- not a header\n"                      # removed
+    "+x = 2\n"                                # added
+    " print(x)\n"                             # context
+    "\\ No newline at end of file\n"          # context
+    "diff --git a/gen.lock b/gen.lock\n"      # header
+    "--- a/gen.lock\n"                        # skipped
+    "+++ b/gen.lock\n"                        # skipped
+    "@@ -1 +1 @@\n"                           # skipped
+    "-a\n"                                    # skipped
+    "+b\n"                                    # skipped
+    "diff --git a/new.txt b/new.txt\n"        # header
+    "new file mode 100644\n"                  # header
+    "--- /dev/null\n"                         # header
+    "+++ b/new.txt\n"                         # header
+    "@@ -0,0 +1,2 @@\n"                       # hunk_header
+    "+one\n"                                  # added
+    "+two\n"                                  # added
+)
+
+
+class TestProfiling(unittest.TestCase):
+    def test_result_matches_parse_git_diff(self):
+        for source in (DIFF, DIFF.encode('utf-8')):
+            for detail in ("totals", "files", "hunks", "full"):
+                result, stats = parse_git_diff_with_stats(source, detail)
+                self.assertEqual(result, parse_git_diff(source, detail))
+                self.assertIsInstance(stats, ParseStats)
+
+    def test_line_classes(self):
+        _, stats = parse_git_diff_with_stats(DIFF, file_filter=FileFilter(exclude="*.lock"))
+        self.assertEqual(stats.lines, 23)
+        self.assertEqual(stats.bytes, len(DIFF.strip()))
+        self.assertEqual(stats.line_classes, {
+            'header': 9, 'hunk_header': 2, 'added': 3, 'removed': 1, 'context': 3, 'skipped': 5
+        })
+        self.assertEqual(tuple(stats.line_classes), LINE_CLASSES)
+
+        _, stats = parse_git_diff_with_stats(DIFF)
+        self.assertEqual(stats.line_classes['skipped'], 0)
+        self.assertEqual(stats.line_classes['hunk_header'], 3)
+        self.assertEqual(stats.line_classes['added'], 4)
+        self.assertEqual(sum(stats.line_classes.values()), stats.lines)
+
+    def test_timings_and_largest_files(self):
+        _, stats = parse_git_diff_with_stats(DIFF, top=2)
+        self.assertEqual(tuple(stats.timings), PHASES)
+        self.assertTrue(all(seconds >= 0 for seconds in stats.timings.values()))
+        self.assertEqual(stats.largest_files, [("app.py", 2), ("gen.lock", 2)])
+
+        _, stats = parse_git_diff_with_stats(DIFF, "totals")
+        self.assertEqual(stats.largest_files, [])
+
+        report = stats.format()
+        self.assertIn("23 lines", report)
+        self.assertIn("hunk_header", report)
+        self.assertEqual(stats.to_dict()['line_classes'], stats.line_classes)
+
+    def test_empty_input(self):
+        result, stats = parse_git_diff_with_stats(None)
+        self.assertEqual(result, parse_git_diff(None))
+        self.assertEqual(stats.lines, 0)
+        self.assertIn("0 lines", stats.format())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import sys
+import os
+import shutil
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
+from gitdiffstats import repo
+from gitdiffstats.diffstats import parse_git_diff
+from gitdiffstats.filters import FileFilter
+from gitdiffstats.repo import repo_stats
+import unittest
+
+
+@unittest.skipIf(shutil.which('git') is None, "git is not installed")
+class TestRepoStats(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.repo = tempfile.mkdtemp()
+
+        def write(path, content):
+            with open(os.path.join(cls.repo, path), 'w') as f:
+                f.write(content)
+
+        cls.git('init', '-q', '-b', 'main')
+        cls.git('config', 'user.email', 'dev@example.com')
+        cls.git('config', 'user.name', 'Dev')
+        write('a.txt', "one\ntwo\n")
+        write('naïve.py', "x = 1\n")
+        cls.git('add', '-A')
+        cls.git('commit', '-q', '-m', 'root')
+        cls.git('checkout', '-q', '-b', 'side')
+        write('side.txt', "side\n")
+        cls.git('add', '-A')
+        cls.git('commit', '-q', '-m', 'side')
+        cls.git('checkout', '-q', 'main')
+        write('a.txt', "one\n2\nthree\n")
+        cls.git('rm', '-q', 'naïve.py')
+        cls.git('add', '-A')
+        cls.git('commit', '-q', '-m', 'edit\n\nwith a body')
+        cls.git('merge', '-q', '--no-ff', '-m', 'merge side', 'side')
+        cls.git('commit', '-q', '--allow-empty', '-m', 'empty')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.repo)
+
+    @classmethod
+    def git(cls, *args):
+        return subprocess.run(['git', '-C', cls.repo, *args], check=True, capture_output=True).stdout
+
+    def expected(self, sha, detail="files"):
+        return parse_git_diff(self.git('show', '--format=', '--no-color', sha), detail)
+
+    def test_matches_git_show(self):
+        commits = list(repo_stats(self.repo, workers=1, detail="full"))
+        self.assertEqual([commit.message for commit in commits],
+                         ["empty", "merge side", "edit\n\nwith a body", "side", "root"])
+        shas = self.git('rev-list', 'HEAD').decode('ascii').split()
+        self.assertEqual([commit.sha for commit in commits], shas)
+        for commit in commits:
+            self.assertEqual(commit.author, "Dev <dev@example.com>")
+            if commit.message == "merge side":
+                self.assertEqual(commit.files, {})
+            else:
+                self.assertEqual(commit.to_dict()['files'], self.expected(commit.sha, "full")['files'])
+        edit = commits[2].to_dict()
+        self.assertEqual((edit['total_files_changed'], edit['total_lines_added'], edit['total_lines_removed']),
+                         (2, 2, 2))
+        self.assertEqual(edit['files']['naïve.py']['change_type'], 'deleted')
+
+    def test_batches_on_a_pool(self):
+        serial = [commit.to_dict() for commit in repo_stats(self.repo, workers=1)]
+        with mock.patch.object(repo, '_BATCH_SIZE', 2):
+            with ThreadPoolExecutor(2) as executor:
+                pooled = [commit.to_dict() for commit in repo_stats(self.repo, executor=executor)]
+            self.assertEqual(pooled, serial)
+            self.assertEqual([commit.to_dict() for commit in repo_stats(self.repo, workers=2)], serial)
+
+    def test_ranges_and_arguments(self):
+        commits = list(repo_stats(self.repo, 'side..main', workers=1, rev_list_args=['--reverse', '--no-merges']))
+        self.assertEqual([commit.message for commit in commits], ["edit\n\nwith a body", "empty"])
+        self.assertEqual(list(commits[0].files), ['a.txt', 'naïve.py'])
+
+        merge = next(repo_stats(self.repo, ['main~1', '^main~2'], workers=1, rev_list_args=['--merges'],
+                                git_args=['-m']))
+        self.assertEqual(list(merge.files), ['side.txt', 'a.txt', 'naïve.py'])
+
+        filtered = list(repo_stats(self.repo, 'main~1', workers=1, detail="totals",
+                                   file_filter=FileFilter(include=['*.txt'])))
+        self.assertEqual([(commit.total_files_changed, commit.files) for commit in filtered],
+                         [(0, {}), (1, {}), (1, {}), (1, {})])
+
+    def test_errors(self):
+        with self.assertRaises(subprocess.CalledProcessError):
+            list(repo_stats(self.repo, 'no-such-branch'))
+        with self.assertRaises(ValueError):
+            list(repo_stats(self.repo, detail="everything"))
+
+
+if __name__ == '__main__':
+    unittest.main()
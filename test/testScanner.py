@@ -0,0 +1,120 @@
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
+from gitdiffstats.diffstats import parse_git_diff, DiffParser, DETAIL_FILES
+import unittest
+
+# Removes a YAML document marker and an SQL comment, adds a '+++' line
+DIFF = (
+    "diff --git a/config.yml b/config.yml\n"
+    "index 1111111..2222222 100644\n"
+    "--- a/config.yml\n"
+    "+++ b/config.yml\n"
+    "@@ -1,4 +1,3 @@\n"
+    "---\n"
+    "---- drop me\n"
+    "+++++ banner\n"
+    " name: demo\n"
+    "-old: 1\n"
+    "+new: 1\n"
+    "diff --git a/next.py b/next.py\n"
+    "--- a/next.py\n"
+    "+++ b/next.py\n"
+    "@@ -1 +1 @@\n"
+    "-a\n"
+    "+b\n"
+)
+
+
+class TestScanner(unittest.TestCase):
+    def test_content_lines_that_look_like_headers(self):
+        result = parse_git_diff(DIFF)
+        self.assertEqual(sorted(result['files']), ['config.yml', 'next.py'])
+
+        config = result['files']['config.yml']
+        self.assertEqual(config['added'], 2)
+        self.assertEqual(config['removed'], 3)
+        changes = config['hunks'][0]['changes']
+        self.assertEqual(changes[0], {'type': 'remove', 'line_number': 1, 'content': '--'})
+        self.assertEqual(changes[1], {'type': 'remove', 'line_number': 2, 'content': '--- drop me'})
+        self.assertEqual(changes[2], {'type': 'add', 'line_number': 1, 'content': '++++ banner'})
+        self.assertEqual(changes[3]['new_line_number'], 2)
+
+        self.assertEqual(result['total_lines_added'], 3)
+        self.assertEqual(result['total_lines_removed'], 4)
+
+    def test_bytes_and_str_agree(self):
+        data = DIFF.encode('utf-8')
+        for detail in ("totals", "files", "hunks", "full"):
+            self.assertEqual(parse_git_diff(data, detail), parse_git_diff(DIFF, detail))
+
+    def test_line_by_line_matches_whole_text(self):
+        parser = DiffParser(DETAIL_FILES)
+        for line in DIFF.splitlines():
+            parser.feed(line + "\n")
+        totals = parser.close()
+        files = {record.path: (record.added, record.removed) for record in parser.drain()}
+
+        self.assertEqual(tuple(totals), (2, 3, 4))
+        self.assertEqual(files, {'config.yml': (2, 3), 'next.py': (1, 1)})
+
+    def test_headers_after_exhausted_hunk(self):
+        # Snippets without 'diff --git' lines start files at '+++ b/' once the hunk is done
+        diff = (
+            "--- a/one.py\n"
+            "+++ b/one.py\n"
+            "@@ -1 +1 @@\n"
+            "-x\n"
+            "+y\n"
+            "--- a/two.py\n"
+            "+++ b/two.py\n"
+            "@@ -1 +1 @@\n"
+            "-x\n"
+            "+y\n"
+        )
+        result = parse_git_diff(diff)
+        self.assertEqual(sorted(result['files']), ['one.py', 'two.py'])
+        self.assertEqual(result['total_lines_removed'], 2)
+
+    def test_blank_context_line_uses_up_hunk_counts(self):
+        # The blank context line lost its ' ' prefix, as when trailing whitespace is stripped
+        diff = (
+            "--- a/x\n"
+            "+++ b/x\n"
+            "@@ -1,3 +1,3 @@\n"
+            " a\n"
+            "\n"
+            "-old\n"
+            "+new\n"
+            "--- a/y\n"
+            "+++ b/y\n"
+            "@@ -1,1 +1,1 @@\n"
+            "-o\n"
+            "+n\n"
+        )
+        for source in (diff, diff.encode('utf-8')):
+            result = parse_git_diff(source)
+            self.assertEqual({path: (stats['added'], stats['removed']) for path, stats in result['files'].items()},
+                             {'x': (1, 1), 'y': (1, 1)})
+            self.assertEqual(result['total_lines_added'], 2)
+            self.assertEqual([change['type'] for change in result['files']['x']['hunks'][0]['changes']],
+                             ['context', 'context', 'remove', 'add'])
+
+    def test_no_newline_marker_does_not_use_up_hunk_counts(self):
+        diff = (
+            "--- a/x\n"
+            "+++ b/x\n"
+            "@@ -1 +1,2 @@\n"
+            "-a\n"
+            "\\ No newline at end of file\n"
+            "+a\n"
+            "++++ b/x\n"
+        )
+        for source in (diff, diff.encode('utf-8')):
+            result = parse_git_diff(source)
+            self.assertEqual(result['files']['x']['added'], 2)
+            self.assertEqual(result['total_lines_added'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import sys
+import os
+import io
+import struct
+import shutil
+import tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
+from gitdiffstats.diffstats import parse_git_diff, parse_git_diff_compact
+from gitdiffstats.filters import FileFilter
+from gitdiffstats.lineindex import LineIndex
+from gitdiffstats.model import FileDiff
+from gitdiffstats.storage import write_result, open_result, FORMAT_VERSION, MAGIC
+import unittest
+
+DIFF = (
+    "diff --git a/src/app.py b/src/app.py\n"
+    "index 1111111..2222222 100644\n"
+    "--- a/src/app.py\n"
+    "+++ b/src/app.py\n"
+    "@@ -1,4 +1,4 @@ def main():\n"
+    " import os\n"
+    "-x = 1\n"
+    "+x = 2\n"
+    " print(x)\n"
+    " \n"
+    "@@ -20,2 +20,3 @@\n"
+    " a\n"
+    "+b\n"
+    " c\n"
+    "\\ No newline at end of file\n"
+    "diff --git a/café.txt b/café.txt\n"
+    "new file mode 100644\n"
+    "--- /dev/null\n"
+    "+++ b/café.txt\n"
+    "@@ -0,0 +1,2 @@\n"
+    "+crème brûlée\n"
+    "+\n"
+    "diff --git a/old.txt b/old.txt\n"
+    "deleted file mode 100644\n"
+    "--- a/old.txt\n"
+    "+++ /dev/null\n"
+    "@@ -1 +0,0 @@\n"
+    "-gone\n"
+    "diff --git a/logo.png b/logo.png\n"
+    "index 3333333..4444444 100644\n"
+    "Binary files a/logo.png and b/logo.png differ\n"
+)
+
+
+class TestStorage(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, 'result.gds')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def round_trip(self, result):
+        write_result(result, self.path)
+        with open_result(self.path) as stored:
+            return stored.to_dict()
+
+    def test_round_trip_parse_git_diff(self):
+        for detail in ("totals", "files", "hunks", "full"):
+            expected = parse_git_diff(DIFF, detail)
+            self.assertEqual(self.round_trip(expected), expected)
+            self.assertEqual(self.round_trip(parse_git_diff_compact(DIFF, detail)), expected)
+            self.assertEqual(self.round_trip(parse_git_diff_compact(DIFF.encode('utf-8'), detail)), expected)
+
+    def test_invalid_utf8_and_flags(self):
+        data = DIFF.replace("-gone", "-\xff").encode('latin-1', errors='replace').replace(
+            "café".encode('latin-1'), "café".encode('utf-8'))
+        expected = parse_git_diff(data, file_filter=FileFilter(max_lines_per_file=2))
+        self.assertTrue(expected['files']['src/app.py']['truncated'])
+        self.assertEqual(self.round_trip(parse_git_diff_compact(data, file_filter=FileFilter(max_lines_per_file=2))),
+                         expected)
+        self.assertTrue(self.round_trip(expected)['files']['logo.png']['binary'])
+
+    def test_lazy_files(self):
+        compact = parse_git_diff_compact(DIFF)
+        buffer = io.BytesIO()
+        write_result(compact, buffer)
+        with open(self.path, 'wb') as stored_file:
+            stored_file.write(buffer.getvalue())
+
+        with open_result(self.path) as stored:
+            self.assertEqual((stored.total_files_changed, stored.total_lines_added, stored.total_lines_removed),
+                             (4, 4, 2))
+            self.assertEqual(list(stored.files), ["src/app.py", "café.txt", "old.txt", "logo.png"])
+            self.assertEqual(len(stored.files), 4)
+            self.assertIn("old.txt", stored.files)
+            self.assertNotIn("new.txt", stored.files)
+
+            app = stored.files["src/app.py"]
+            self.assertIsInstance(app, FileDiff)
+            hunk = app.hunks[1]
+            self.assertEqual(hunk.header, "@@ -20,2 +20,3 @@")
+            self.assertEqual(list(hunk.kinds), list(compact.files["src/app.py"].hunks[1].kinds))
+            self.assertEqual(list(hunk.old_lines), list(compact.files["src/app.py"].hunks[1].old_lines))
+            self.assertEqual(hunk.content(1), "b")
+            self.assertEqual(hunk.raw_content(1), b"b")
+
+            index = LineIndex(app)
+            self.assertEqual(index.map_old_to_new(21), 22)
+            self.assertIsNone(index.map_new_to_old(21))
+
+            with self.assertRaises(KeyError):
+                stored.files["missing"]
+
+    def test_rejects_other_files(self):
+        with open(self.path, 'wb') as stored_file:
+            stored_file.write(b'{"total_files_changed": 0}' + bytes(100))
+        with self.assertRaises(ValueError):
+            open_result(self.path)
+
+        write_result(parse_git_diff(DIFF), self.path)
+        with open(self.path, 'r+b') as stored_file:
+            stored_file.seek(len(MAGIC))
+            stored_file.write(struct.pack('<H', FORMAT_VERSION + 1))
+        with self.assertRaises(ValueError):
+            open_result(self.path)
+
+        open(self.path, 'wb').close()
+        with self.assertRaises(ValueError):
+            open_result(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,161 @@
+import sys
+import os
+import subprocess
+import tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
+from gitdiffstats.diffstats import parse_git_diff
+from gitdiffstats.summary import parse_numstat, parse_raw, parse_shortstat
+import unittest
+
+NUMSTAT = (
+    "-\t-\tlogo.png\n"
+    "0\t1\tgone.py\n"
+    "3\t1\tapp.py\n"
+    "1\t0\t\"sp ace \\\"q\\\".py\"\n"
+    "2\t0\tsrc/{sub => }/mv.py\n"
+    "1\t1\told.txt => new.txt\n"
+    " delete mode 100644 gone.py\n"
+    " create mode 100644 logo.png\n"
+    " 6 files changed, 7 insertions(+), 3 deletions(-)\n"
+)
+
+NUMSTAT_Z = (
+    "-\t-\tlogo.png\0"
+    "0\t1\tgone.py\0"
+    "3\t1\tapp.py\0"
+    "1\t0\tsp ace \"q\".py\0"
+    "2\t0\t\0src/sub/mv.py\0src/mv.py\0"
+    "1\t1\t\0old.txt\0new.txt\0"
+    " delete mode 100644 gone.py\n"
+    " create mode 100644 logo.png\n"
+)
+
+RAW = (
+    ":000000 100644 0000000 1111111 A\tlogo.png\n"
+    ":100644 000000 2222222 0000000 D\tgone.py\n"
+    ":100644 100644 3333333 4444444 M\tapp.py\n"
+    ":100644 100644 5555555 6666666 R087\tsrc/sub/mv.py\tsrc/mv.py\n"
+)
+
+RAW_Z = (
+    ":000000 100644 0000000 1111111 A\0logo.png\0"
+    ":100644 000000 2222222 0000000 D\0gone.py\0"
+    ":100644 100644 3333333 4444444 M\0app.py\0"
+    ":100644 100644 5555555 6666666 R087\0src/sub/mv.py\0src/mv.py\0"
+)
+
+
+def file_summary(result):
+    return {path: (stats['added'], stats['removed'], stats['change_type'], stats.get('binary', False))
+            for path, stats in result['files'].items()}
+
+
+class TestSummaryFormats(unittest.TestCase):
+    def test_numstat(self):
+        expected = {
+            'logo.png': (0, 0, 'added', True),
+            'gone.py': (0, 1, 'deleted', False),
+            'app.py': (3, 1, 'modified', False),
+            'sp ace "q".py': (1, 0, 'modified', False),
+            'src/mv.py': (2, 0, 'modified', False),
+            'new.txt': (1, 1, 'modified', False),
+        }
+        for output in (NUMSTAT, NUMSTAT_Z, NUMSTAT_Z.encode('utf-8')):
+            result = parse_numstat(output)
+            self.assertEqual(file_summary(result), expected)
+            self.assertEqual((result['total_files_changed'], result['total_lines_added'],
+                              result['total_lines_removed']), (6, 7, 3))
+            self.assertEqual(result['files']['app.py']['hunks'], [])
+
+    def test_raw(self):
+        for output in (RAW, RAW_Z):
+            result = parse_raw(output)
+            self.assertEqual(file_summary(result), {
+                'logo.png': (0, 0, 'added', False),
+                'gone.py': (0, 0, 'deleted', False),
+                'app.py': (0, 0, 'modified', False),
+                'src/mv.py': (0, 0, 'modified', False),
+            })
+
+    def test_raw_with_numstat(self):
+        result = parse_raw(RAW + "3\t1\tapp.py\n")
+        self.assertEqual(result['files']['app.py']['added'], 3)
+        self.assertEqual(result['files']['logo.png']['change_type'], 'added')
+
+    def test_shortstat(self):
+        self.assertEqual(parse_shortstat(" 6 files changed, 7 insertions(+), 3 deletions(-)\n"), {
+            'total_files_changed': 6, 'total_lines_added': 7, 'total_lines_removed': 3, 'files': {}
+        })
+        self.assertEqual(parse_shortstat(b" 1 file changed, 1 deletion(-)\n")['total_lines_removed'], 1)
+        self.assertEqual(parse_shortstat(" 1 file changed, 2 insertions(+)")['total_lines_added'], 2)
+        self.assertEqual(parse_shortstat("")['total_files_changed'], 0)
+
+    def test_empty(self):
+        self.assertEqual(parse_numstat(""), parse_git_diff("", detail="files"))
+
+    def test_binary_and_quoted_paths_in_patches(self):
+        diff = (
+            "diff --git a/logo.png b/logo.png\n"
+            "new file mode 100644\n"
+            "index 0000000..1111111\n"
+            "Binary files /dev/null and b/logo.png differ\n"
+            "diff --git \"a/sp ace \\\"q\\\".py\" \"b/sp ace \\\"q\\\".py\"\n"
+            "--- \"a/sp ace \\\"q\\\".py\"\n"
+            "+++ \"b/sp ace \\\"q\\\".py\"\n"
+            "@@ -1 +1,2 @@\n"
+            " k\n"
+            "+l\n"
+        )
+        result = parse_git_diff(diff, detail="files")
+        self.assertEqual(file_summary(result), {
+            'logo.png': (0, 0, 'added', True),
+            'sp ace "q".py': (1, 0, 'modified', False),
+        })
+        self.assertNotIn('binary', result['files']['sp ace "q".py'])
+
+    def test_matches_patch_output(self):
+        with tempfile.TemporaryDirectory() as repo:
+            def git(*args):
+                return subprocess.run(['git', '-C', repo, *args], check=True,
+                                      capture_output=True).stdout
+
+            git('init', '-q')
+            git('config', 'user.email', 'dev@example.com')
+            git('config', 'user.name', 'Dev')
+            os.makedirs(os.path.join(repo, 'src', 'sub'))
+            files = {'src/sub/mv.py': "a\nb\nc\n", 'gone.py': "x\n", 'naïve.py': "k\n", 'gönë.py': "g\n",
+                     'tab\there.py': "k\n", 'bin.dat': "bin\0ary\0one"}
+            for path, content in files.items():
+                with open(os.path.join(repo, path), 'w') as f:
+                    f.write(content)
+            git('add', '-A')
+            git('commit', '-q', '-m', 'first')
+
+            git('mv', 'src/sub/mv.py', 'src/mv.py')
+            git('rm', '-q', 'gone.py', 'gönë.py')
+            for path, content in {'src/mv.py': "a\nb\nc\nd\n", 'new.py': "new\n", 'naïve.py': "k\nl\n",
+                                  'ünï.txt': "u\n",
+                                  'tab\there.py': "j\n", 'bin.dat': "bin\0ary\0two"}.items():
+                with open(os.path.join(repo, path), 'w') as f:
+                    f.write(content)
+            git('add', '-A')
+            git('commit', '-q', '-m', 'second')
+
+            expected = parse_git_diff(git('diff', '-M', 'HEAD~1', 'HEAD'), detail="files")
+            self.assertIn('tab\there.py', expected['files'])
+            self.assertTrue(expected['files']['bin.dat']['binary'])
+            # git C-quotes these paths in --summary lines, even with -z
+            self.assertEqual(expected['files']['ünï.txt']['change_type'], 'added')
+            self.assertEqual(expected['files']['gönë.py']['change_type'], 'deleted')
+            for args in (['--numstat', '--summary'], ['--numstat', '--summary', '-z'],
+                         ['--raw', '--numstat'], ['--raw', '--numstat', '-z']):
+                output = git('diff', '-M', *args, 'HEAD~1', 'HEAD')
+                self.assertEqual(parse_numstat(output), expected, args)
+
+            shortstat = parse_shortstat(git('diff', '--shortstat', 'HEAD~1', 'HEAD'))
+            for key in ('total_files_changed', 'total_lines_added', 'total_lines_removed'):
+                self.assertEqual(shortstat[key], expected[key])
+
+
+if __name__ == '__main__':
+    unittest.main()